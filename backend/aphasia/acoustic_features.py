@@ -0,0 +1,91 @@
+"""
+向量化声学特征：一次分帧、一次幅度谱，导出全部逐帧特征。
+
+与 librosa 默认参数（frame_length=2048, hop_length=512, center=True, hann 窗）对齐的
+rms / zero_crossing_rate / spectral_centroid，另外给出临床上常用的：
+- voiced_fraction: 浊音帧（有能量且过零率低）占全部帧的比例
+- pause_ratio: 从第一帧语音到最后一帧语音之间，停顿帧所占比例
+- speaking_rate: 每秒语音中的音节核数量（能量包络的局部峰值）
+"""
+from typing import Dict
+
+import numpy as np
+
+from pitch import frame_signal
+
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+# 帧 RMS 比最大帧 RMS 低超过该分贝数视为静音/停顿
+SILENCE_DB = -35.0
+# 过零率高于该值的有声帧视为清音（摩擦音等）
+VOICED_MAX_ZCR = 0.25
+# 相邻音节核之间的最小间隔（秒）
+MIN_SYLLABLE_GAP = 0.1
+
+_windows: Dict[int, np.ndarray] = {}
+
+
+def _hann(n: int) -> np.ndarray:
+    """周期 hann 窗（与 scipy.signal.get_window('hann', n) 一致）"""
+    window = _windows.get(n)
+    if window is None:
+        window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / n)).astype(np.float32)
+        _windows[n] = window
+    return window
+
+
+def extract_acoustic_features(y: np.ndarray, sr: int, frame_length: int = FRAME_LENGTH,
+                              hop_length: int = HOP_LENGTH) -> Dict[str, float]:
+    """计算整段音频的平均声学特征"""
+    y = np.asarray(y, dtype=np.float32)
+    duration = len(y) / sr
+    frames = frame_signal(y, frame_length, hop_length)
+    frame_seconds = hop_length / sr
+
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_length
+
+    magnitude = np.abs(np.fft.rfft(frames * _hann(frame_length), axis=1))
+    freqs = np.fft.rfftfreq(frame_length, 1.0 / sr)
+    total = magnitude.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        centroid = np.where(total > 0, magnitude @ freqs / total, 0.0)
+
+    # 语音/停顿/浊音判定
+    peak = rms.max() if len(rms) else 0.0
+    speech = rms > peak * 10 ** (SILENCE_DB / 20) if peak > 0 else np.zeros(len(rms), dtype=bool)
+    voiced = speech & (zcr < VOICED_MAX_ZCR)
+
+    speech_idx = np.flatnonzero(speech)
+    if len(speech_idx):
+        span = speech[speech_idx[0]:speech_idx[-1] + 1]
+        pause_ratio = 1.0 - span.mean()
+        speech_seconds = span.sum() * frame_seconds
+    else:
+        pause_ratio, speech_seconds = 1.0, 0.0
+
+    speaking_rate = 0.0
+    if speech_seconds > 0:
+        # 音节核：浊音段能量包络的局部峰值，且与前一峰间隔不小于 MIN_SYLLABLE_GAP
+        envelope = np.convolve(np.where(voiced, rms, 0.0), np.ones(3) / 3, mode="same")
+        is_peak = np.zeros(len(envelope), dtype=bool)
+        is_peak[1:-1] = (envelope[1:-1] > envelope[:-2]) & (envelope[1:-1] >= envelope[2:])
+        is_peak &= voiced
+        min_gap = max(1, int(MIN_SYLLABLE_GAP / frame_seconds))
+        peaks, last = 0, -min_gap
+        for idx in np.flatnonzero(is_peak):
+            if idx - last >= min_gap:
+                peaks += 1
+                last = idx
+        speaking_rate = peaks / speech_seconds
+
+    return {
+        "duration": duration,
+        "rms": float(rms.mean()) if len(rms) else 0.0,
+        "zero_crossing_rate": float(zcr.mean()) if len(zcr) else 0.0,
+        "spectral_centroid": float(centroid.mean()) if len(centroid) else 0.0,
+        "voiced_fraction": float(voiced.mean()) if len(voiced) else 0.0,
+        "pause_ratio": float(pause_ratio),
+        "speaking_rate": float(speaking_rate),
+    }
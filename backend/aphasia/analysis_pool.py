@@ -0,0 +1,200 @@
+"""
+发音分析进程池：把阻塞的音频解码/Vosk识别/特征提取移出事件循环。
+
+- 每个工作进程启动时预加载 Vosk 模型，之后复用
+- 在途请求数（执行中 + 排队）有上限，超出时立即拒绝，避免请求无限堆积
+- 单个请求有超时；统计排队等待时间与实际计算时间
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 工作进程数；0 表示不使用进程池，改为在线程池中执行（仍不阻塞事件循环）
+ANALYSIS_WORKERS = int(os.getenv("SPEECH_ANALYSIS_WORKERS", str(min(2, os.cpu_count() or 1))))
+# 除正在执行的请求外，最多允许排队的请求数
+ANALYSIS_QUEUE_SIZE = int(os.getenv("SPEECH_ANALYSIS_QUEUE_SIZE", "8"))
+# 单个请求的超时（秒），包含排队时间
+ANALYSIS_TIMEOUT = float(os.getenv("SPEECH_ANALYSIS_TIMEOUT", "30"))
+# 进程启动方式：主进程已加载 TensorFlow，默认用 spawn 避免 fork 带来的问题
+ANALYSIS_START_METHOD = os.getenv("SPEECH_ANALYSIS_START_METHOD", "spawn")
+# 统计窗口（最近 N 个请求）
+METRICS_WINDOW = 1000
+
+
+class AnalysisPoolBusy(RuntimeError):
+    """在途请求已达上限"""
+
+
+class AnalysisTimeout(RuntimeError):
+    """请求超时"""
+
+
+def _worker_init():
+    """工作进程初始化：预加载 SPEECH_PRELOAD_LANGUAGES 中的 Vosk 模型，其余语言首次使用时加载"""
+    import speech_rehab_api
+    speech_rehab_api.preload_models()
+    logger.info(f"发音分析工作进程就绪: pid={os.getpid()}")
+
+
+def _worker_run(submitted_at: float, audio_data: bytes, reference_text: str,
+                user_id: str, language: str):
+    """在工作进程中执行一次完整分析，返回 (结果, 开始时间, 计算耗时)"""
+    from speech_rehab_api import run_audio_analysis
+
+    started_at = time.time()
+    t0 = time.perf_counter()
+    result = run_audio_analysis(audio_data, reference_text, user_id, language)
+    return result, started_at, time.perf_counter() - t0
+
+
+def _percentiles(values) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": round(pick(0.5), 4), "p95": round(pick(0.95), 4), "max": round(ordered[-1], 4)}
+
+
+class AnalysisPoolMetrics:
+    """排队等待 / 计算耗时统计"""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self._lock = threading.Lock()
+        self.queue_wait = deque(maxlen=window)
+        self.compute = deque(maxlen=window)
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def record(self, queue_wait: float, compute: float):
+        with self._lock:
+            self.queue_wait.append(max(0.0, queue_wait))
+            self.compute.append(compute)
+            self.completed += 1
+
+    def increment(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "queue_wait_seconds": _percentiles(list(self.queue_wait)),
+                "compute_seconds": _percentiles(list(self.compute)),
+            }
+
+
+class AudioAnalysisPool:
+    """有界的发音分析进程池（进程在首次提交时才启动）"""
+
+    def __init__(self, workers: int = ANALYSIS_WORKERS, queue_size: int = ANALYSIS_QUEUE_SIZE,
+                 timeout: float = ANALYSIS_TIMEOUT, start_method: str = ANALYSIS_START_METHOD):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.start_method = start_method
+        self.metrics = AnalysisPoolMetrics()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(1, self.workers) + self.queue_size
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_worker_init
+                )
+                logger.info(f"发音分析进程池启动: workers={self.workers}, queue={self.queue_size}")
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def submit(self, audio_data: bytes, reference_text: str, user_id: str, language: str) -> Dict:
+        """提交一次分析；超出在途上限抛 AnalysisPoolBusy，超时抛 AnalysisTimeout"""
+        with self._lock:
+            busy = self._in_flight >= self.capacity
+            if not busy:
+                self._in_flight += 1
+        if busy:
+            self.metrics.increment("rejected")
+            raise AnalysisPoolBusy(f"发音分析队列已满（{self.capacity}）")
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        args = (submitted_at, audio_data, reference_text, user_id, language)
+        try:
+            if self.workers > 0:
+                future = self._get_executor().submit(_worker_run, *args)
+            else:
+                future = loop.run_in_executor(None, _worker_run, *args)
+        except Exception:
+            self._release()
+            raise
+        # 超时时仍在排队的任务会被取消；已在执行的任务会跑完，名额在真正结束时才释放
+        future.add_done_callback(self._release)
+
+        try:
+            result, started_at, compute = await asyncio.wait_for(
+                asyncio.wrap_future(future) if self.workers > 0 else future, self.timeout
+            )
+        except asyncio.TimeoutError:
+            self.metrics.increment("timeouts")
+            raise AnalysisTimeout(f"发音分析超时（{self.timeout}s）")
+        except BrokenProcessPool:
+            self.metrics.increment("errors")
+            logger.error("发音分析工作进程异常退出，重建进程池")
+            self._reset_executor()
+            raise
+        except Exception:
+            self.metrics.increment("errors")
+            raise
+
+        self.metrics.record(started_at - submitted_at, compute)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+            started = self._executor is not None
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "timeout_seconds": self.timeout,
+            "started": started,
+            "in_flight": in_flight,
+            **self.metrics.snapshot()
+        }
+
+    def shutdown(self):
+        self._reset_executor()
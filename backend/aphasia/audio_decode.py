@@ -0,0 +1,123 @@
+"""
+上传音频的内存解码：一次解码为 16kHz 单声道缓冲区，识别与特征提取共用。
+
+- WAV 直接用 wave 模块解析
+- 其他格式（浏览器录制的 webm/ogg 等）通过 ffmpeg 管道解码，不落盘
+- 识别器使用 16 位 PCM 字节，特征提取使用 float32 数组，两者来自同一次解码
+"""
+import io
+import logging
+import shutil
+import subprocess
+import wave
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+FFMPEG_TIMEOUT = 30
+
+
+class AudioDecodeError(RuntimeError):
+    """音频无法解码"""
+
+
+class DecodedAudio:
+    """16kHz 单声道音频：samples 为 [-1, 1] 的 float32"""
+
+    def __init__(self, samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE):
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sample_rate = sample_rate
+        self._pcm16: Optional[bytes] = None
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def pcm16(self) -> bytes:
+        """16 位小端 PCM 字节（供 KaldiRecognizer.AcceptWaveform 使用）"""
+        if self._pcm16 is None:
+            clipped = np.clip(self.samples, -1.0, 32767 / 32768)
+            self._pcm16 = (clipped * 32768).astype("<i2").tobytes()
+        return self._pcm16
+
+    def __len__(self):
+        return len(self.samples)
+
+
+def _resample(samples: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    if orig_sr == target_sr or len(samples) == 0:
+        return samples
+    try:
+        import librosa
+        return librosa.resample(samples, orig_sr=orig_sr, target_sr=target_sr)
+    except ImportError:
+        n_out = int(round(len(samples) * target_sr / orig_sr))
+        positions = np.arange(n_out) * (orig_sr / target_sr)
+        return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def _decode_wav(audio_data: bytes, target_sr: int) -> DecodedAudio:
+    with wave.open(io.BytesIO(audio_data), "rb") as wf:
+        channels = wf.getnchannels()
+        sample_width = wf.getsampwidth()
+        sample_rate = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+
+    if sample_width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise AudioDecodeError(f"不支持的WAV采样宽度: {sample_width}")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return DecodedAudio(_resample(samples, sample_rate, target_sr), target_sr)
+
+
+def _decode_ffmpeg(audio_data: bytes, target_sr: int) -> DecodedAudio:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise AudioDecodeError("未找到 ffmpeg")
+    proc = subprocess.run(
+        [ffmpeg, "-nostdin", "-hide_banner", "-loglevel", "error",
+         "-i", "pipe:0", "-f", "f32le", "-ac", "1", "-ar", str(target_sr), "pipe:1"],
+        input=audio_data, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        timeout=FFMPEG_TIMEOUT
+    )
+    if proc.returncode != 0:
+        raise AudioDecodeError(f"ffmpeg 解码失败: {proc.stderr.decode('utf-8', 'ignore').strip()}")
+    return DecodedAudio(np.frombuffer(proc.stdout, dtype="<f4"), target_sr)
+
+
+def _decode_soundfile(audio_data: bytes, target_sr: int) -> DecodedAudio:
+    import soundfile as sf
+
+    samples, sample_rate = sf.read(io.BytesIO(audio_data), dtype="float32", always_2d=True)
+    return DecodedAudio(_resample(samples.mean(axis=1), sample_rate, target_sr), target_sr)
+
+
+def decode_audio(audio_data: bytes, target_sr: int = TARGET_SAMPLE_RATE) -> DecodedAudio:
+    """将上传的音频字节解码为 16kHz 单声道缓冲区"""
+    if not audio_data:
+        raise AudioDecodeError("音频数据为空")
+
+    if audio_data[:4] == b"RIFF" and audio_data[8:12] == b"WAVE":
+        try:
+            return _decode_wav(audio_data, target_sr)
+        except (wave.Error, EOFError, AudioDecodeError) as e:
+            logger.warning(f"WAV解析失败，尝试其他解码方式: {e}")
+
+    errors = []
+    for decoder in (_decode_ffmpeg, _decode_soundfile):
+        try:
+            return decoder(audio_data, target_sr)
+        except Exception as e:
+            errors.append(f"{decoder.__name__}: {e}")
+    raise AudioDecodeError("; ".join(errors))
@@ -0,0 +1,168 @@
+"""
+基频估计：可选后端，用于计算 pitch_mean / pitch_std。
+
+- yin（默认）: 向量化 YIN，所有帧一次性分帧后用 FFT 计算差分函数
+- autocorr: 归一化自相关，取第一个高于阈值的峰（同 YIN 的取峰方式），更快但在低信噪比下更容易倍频/半频
+- pyin: librosa.pyin（概率 YIN + Viterbi），最准确也最慢，作为参考实现
+
+这里只需要整段的均值和标准差，不需要 pyin 的逐帧平滑轨迹。
+目标容差（相对 pyin，在合成浊音测试集上）：pitch_mean 相对误差 ≤ PITCH_MEAN_TOLERANCE，
+pitch_std 绝对误差 ≤ PITCH_STD_TOLERANCE_HZ；由 benchmarks/bench_pitch.py 校验并给出加速比。
+"""
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PITCH_BACKENDS = ("yin", "autocorr", "pyin")
+PITCH_BACKEND = os.getenv("SPEECH_PITCH_BACKEND", "yin")
+
+# 与 librosa.pyin 默认一致的分帧参数
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+# YIN 累积均值归一化差分的阈值
+YIN_THRESHOLD = 0.1
+# 最佳周期处的归一化差分高于该值视为清音/静音
+YIN_VOICING_THRESHOLD = 0.25
+# 自相关后端的候选峰阈值（相对零延迟 nacf(0) = 1）
+AUTOCORR_PEAK_THRESHOLD = 0.8
+# 自相关后端的浊音判定阈值
+AUTOCORR_VOICING_THRESHOLD = 0.5
+# 帧能量低于整段最大帧能量的该比例视为静音
+SILENCE_RATIO = 0.01
+
+PITCH_MEAN_TOLERANCE = 0.03
+PITCH_STD_TOLERANCE_HZ = 3.0
+
+
+def frame_signal(y: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """居中分帧（与 librosa center=True 一致），返回 (n_frames, frame_length) 视图"""
+    y = np.pad(np.asarray(y, dtype=np.float32), frame_length // 2, mode="constant")
+    if len(y) < frame_length:
+        y = np.pad(y, (0, frame_length - len(y)))
+    return np.lib.stride_tricks.sliding_window_view(y, frame_length)[::hop_length]
+
+
+def _lag_range(sr: int, fmin: float, fmax: float, frame_length: int):
+    min_lag = max(1, int(np.floor(sr / fmax)))
+    max_lag = min(int(np.ceil(sr / fmin)), frame_length // 2)
+    return min_lag, max_lag
+
+
+def _difference(frames: np.ndarray, max_lag: int):
+    """
+    YIN 差分函数 d(τ) = Σ (x_j - x_{j+τ})²，窗口长度 W = frame_length - max_lag。
+    同时返回自相关 r(τ) 与两段窗口能量，供自相关后端复用。
+    """
+    window = frames.shape[1] - max_lag
+    n_fft = 1 << int(np.ceil(np.log2(frames.shape[1] + window)))
+    spec = np.fft.rfft(frames, n_fft, axis=1)
+    head = np.fft.rfft(frames[:, :window], n_fft, axis=1)
+    acf = np.fft.irfft(spec * np.conj(head), n_fft, axis=1)[:, :max_lag + 1]
+
+    squares = np.cumsum(np.square(frames, dtype=np.float64), axis=1)
+    squares = np.concatenate([np.zeros((frames.shape[0], 1)), squares], axis=1)
+    lags = np.arange(max_lag + 1)
+    energy = squares[:, lags + window] - squares[:, lags]  # Σ_{j=τ}^{τ+W-1} x_j²
+    energy0 = energy[:, :1]
+    diff = np.maximum(energy0 + energy - 2 * acf, 0.0)
+    return diff, acf, energy0, energy
+
+
+def _parabolic(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """对每行在 idx 附近做抛物线插值，返回亚采样精度的位置"""
+    rows = np.arange(values.shape[0])
+    left = values[rows, np.maximum(idx - 1, 0)]
+    center = values[rows, idx]
+    right = values[rows, np.minimum(idx + 1, values.shape[1] - 1)]
+    denom = left - 2 * center + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / denom, 0.0)
+    return idx + np.clip(shift, -1.0, 1.0)
+
+
+def _voiced_energy_mask(frames: np.ndarray) -> np.ndarray:
+    energy = np.mean(np.square(frames), axis=1)
+    return energy > SILENCE_RATIO * (energy.max() if len(energy) else 0.0)
+
+
+def yin(y: np.ndarray, sr: int, fmin: float = 50, fmax: float = 300,
+        frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH) -> np.ndarray:
+    """向量化 YIN，返回逐帧 F0（清音帧为 NaN）"""
+    frames = frame_signal(y, frame_length, hop_length)
+    min_lag, max_lag = _lag_range(sr, fmin, fmax, frame_length)
+    diff, _, _, _ = _difference(frames, max_lag)
+
+    # 累积均值归一化差分 d'(τ) = d(τ) · τ / Σ_{k=1}^{τ} d(k)
+    cumulative = np.cumsum(diff[:, 1:], axis=1)
+    cmndf = np.ones_like(diff)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cmndf[:, 1:] = np.where(cumulative > 0, diff[:, 1:] * np.arange(1, max_lag + 1) / cumulative, 1.0)
+
+    search = cmndf[:, min_lag:max_lag + 1]
+    # 第一个低于阈值的局部极小值；没有则取全局最小值
+    local_min = np.ones_like(search, dtype=bool)
+    local_min[:, :-1] = search[:, :-1] <= search[:, 1:]
+    candidates = (search < YIN_THRESHOLD) & local_min
+    has_candidate = candidates.any(axis=1)
+    best = np.where(has_candidate, candidates.argmax(axis=1), search.argmin(axis=1)) + min_lag
+
+    period = _parabolic(cmndf, best)
+    rows = np.arange(len(best))
+    voiced = (cmndf[rows, best] < YIN_VOICING_THRESHOLD) & _voiced_energy_mask(frames)
+    return np.where(voiced, sr / period, np.nan)
+
+
+def autocorr(y: np.ndarray, sr: int, fmin: float = 50, fmax: float = 300,
+             frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH) -> np.ndarray:
+    """归一化自相关基频估计，返回逐帧 F0（清音帧为 NaN）"""
+    frames = frame_signal(y, frame_length, hop_length)
+    min_lag, max_lag = _lag_range(sr, fmin, fmax, frame_length)
+    _, acf, energy0, energy = _difference(frames, max_lag)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nacf = np.where(energy0 * energy > 0, acf / np.sqrt(energy0 * energy), 0.0)
+    search = nacf[:, min_lag:max_lag + 1]
+    # 与 YIN 相同取第一个达到阈值的峰（nacf(0) = 1），避免全局最大值落在周期整数倍上；没有则取全局最大值
+    local_max = np.ones_like(search, dtype=bool)
+    local_max[:, :-1] = search[:, :-1] >= search[:, 1:]
+    local_max[:, 1:] &= search[:, 1:] >= search[:, :-1]
+    candidates = (search >= AUTOCORR_PEAK_THRESHOLD) & local_max
+    has_candidate = candidates.any(axis=1)
+    best = np.where(has_candidate, candidates.argmax(axis=1), search.argmax(axis=1)) + min_lag
+    period = _parabolic(-nacf, best)
+    rows = np.arange(len(best))
+    voiced = (nacf[rows, best] > AUTOCORR_VOICING_THRESHOLD) & _voiced_energy_mask(frames)
+    return np.where(voiced, sr / period, np.nan)
+
+
+def pyin(y: np.ndarray, sr: int, fmin: float = 50, fmax: float = 300) -> np.ndarray:
+    import librosa
+
+    f0, _, _ = librosa.pyin(y, fmin=fmin, fmax=fmax, sr=sr)
+    return f0
+
+
+def estimate_pitch(y: np.ndarray, sr: int, fmin: float = 50, fmax: float = 300,
+                   backend: str = None) -> np.ndarray:
+    """按配置的后端估计逐帧 F0"""
+    backend = backend or PITCH_BACKEND
+    if backend == "pyin":
+        return pyin(y, sr, fmin, fmax)
+    if backend == "autocorr":
+        return autocorr(y, sr, fmin, fmax)
+    if backend != "yin":
+        logger.warning(f"未知的基频后端 {backend}，使用 yin")
+    return yin(y, sr, fmin, fmax)
+
+
+def pitch_statistics(y: np.ndarray, sr: int, fmin: float = 50, fmax: float = 300,
+                     backend: str = None):
+    """返回 (pitch_mean, pitch_std)；没有浊音帧时返回 None"""
+    f0 = estimate_pitch(y, sr, fmin, fmax, backend)
+    f0 = f0[~np.isnan(f0)]
+    if len(f0) == 0:
+        return None
+    return float(np.mean(f0)), float(np.std(f0))
@@ -0,0 +1,88 @@
+"""
+按语言复用的 KaldiRecognizer 池。
+
+每个请求显式指定语言，从对应语言的池中取出一个识别器，用完 Reset 后归还，
+避免每次请求重新构建识别器，也不再依赖模块级的“当前语言”状态。
+"""
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 每种语言最多保留的空闲识别器数量
+MAX_IDLE_PER_LANGUAGE = 4
+
+
+class RecognizerPool:
+    """线程安全的识别器池；model_provider(language) 返回 Vosk 模型或 None"""
+
+    def __init__(self, model_provider: Callable[[str], Optional[object]], sample_rate: int = 16000,
+                 max_idle_per_language: int = MAX_IDLE_PER_LANGUAGE):
+        self.model_provider = model_provider
+        self.sample_rate = sample_rate
+        self.max_idle_per_language = max_idle_per_language
+        # language -> [(model, recognizer)]；记录模型以便模型被替换/卸载后丢弃旧识别器
+        self._idle: Dict[str, List[Tuple[object, object]]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def _create(self, model):
+        import vosk
+
+        rec = vosk.KaldiRecognizer(model, self.sample_rate)
+        rec.SetWords(True)
+        return rec
+
+    def acquire(self, language: str):
+        """取出一个识别器，返回 (model, recognizer)；该语言模型不可用时返回 (None, None)"""
+        model = self.model_provider(language)
+        if model is None:
+            return None, None
+        with self._lock:
+            idle = self._idle[language]
+            while idle:
+                idle_model, rec = idle.pop()
+                if idle_model is model:
+                    self.reused += 1
+                    return model, rec
+            self.created += 1
+        return model, self._create(model)
+
+    def release(self, language: str, model, rec):
+        """重置识别器并归还到池中"""
+        try:
+            rec.Reset()
+        except Exception as e:
+            logger.warning(f"识别器重置失败，丢弃: {e}")
+            return
+        with self._lock:
+            idle = self._idle[language]
+            if len(idle) < self.max_idle_per_language:
+                idle.append((model, rec))
+
+    @contextmanager
+    def recognizer(self, language: str):
+        """with pool.recognizer(language) as rec: ...；模型不可用时 rec 为 None"""
+        model, rec = self.acquire(language)
+        try:
+            yield rec
+        finally:
+            if rec is not None:
+                self.release(language, model, rec)
+
+    def discard(self, language: str):
+        """丢弃某语言的空闲识别器（模型卸载时调用）"""
+        with self._lock:
+            self._idle.pop(language, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "idle": {language: len(idle) for language, idle in self._idle.items()},
+                "created": self.created,
+                "reused": self.reused
+            }
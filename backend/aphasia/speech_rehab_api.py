@@ -1,19 +1,28 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, APIRouter
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, APIRouter, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
 import json
 import numpy as np
-import librosa
 import io
-import tempfile
 import os
-from typing import Dict, Any, Optional
+import time
+import zipfile
+from typing import Dict, Any, List, Optional, Tuple
 import uuid
 from datetime import datetime
 import logging
-import wave
 import struct
 
+from analysis_pool import AnalysisPoolBusy, AnalysisTimeout, AudioAnalysisPool
+from acoustic_features import extract_acoustic_features
+from audio_decode import TARGET_SAMPLE_RATE, AudioDecodeError, DecodedAudio, decode_audio
+from pitch import pitch_statistics
+from recognizer_pool import RecognizerPool
+from text_alignment import Alignment, align_texts, describe_errors
+from vad import VAD_ENABLED, split_segments, trim_silence
+from vosk_registry import VoskModelRegistry
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,96 +38,113 @@ except ImportError:
     logger.warning("Vosk 未安装，将使用模拟识别")
     VOSK_AVAILABLE = False
 
-# 初始化Vosk模型
-vosk_models = {}  # 存储不同语言的模型
 current_language = "zh-CN"  # 默认语言
 
-def load_vosk_model(language: str, model_path: str) -> bool:
-    """加载指定语言的Vosk模型"""
-    try:
-        if os.path.exists(model_path):
-            vosk_models[language] = vosk.Model(model_path)
-            logger.info(f"Vosk {language} 模型加载成功: {model_path}")
-            return True
-        else:
-            logger.warning(f"Vosk {language} 模型路径不存在: {model_path}")
-            return False
-    except Exception as e:
-        logger.error(f"Vosk {language} 模型初始化失败: {e}")
-        return False
+def _model_paths(model_dir_name: str) -> list:
+    """模型目录的候选位置"""
+    return [
+        model_dir_name,
+        f"model/{model_dir_name}",
+        f"backend/ml_models/vosk-models/{model_dir_name}",
+        f"../backend/ml_models/vosk-models/{model_dir_name}",
+        f"ml_models/vosk-models/{model_dir_name}",
+    ]
 
-# 模型配置
+# 模型配置：每种语言分小模型/大模型两种规格
 MODEL_CONFIGS = {
     "zh-CN": {
         "name": "中文模型",
-        "paths": [
-            "vosk-model-small-cn-0.22",
-            "model/vosk-model-small-cn-0.22",
-            "backend/ml_models/vosk-models/vosk-model-small-cn-0.22",
-            "../backend/ml_models/vosk-models/vosk-model-small-cn-0.22",
-            "ml_models/vosk-models/vosk-model-small-cn-0.22",
-        ]
+        "variants": {
+            "small": _model_paths("vosk-model-small-cn-0.22"),
+            "large": _model_paths("vosk-model-cn-0.22"),
+        }
     },
     "en-US": {
         "name": "英文模型", 
-        "paths": [
-            "vosk-model-small-en-us-0.15",
-            "vosk-model-en-us-0.15", 
-            "model/vosk-model-small-en-us-0.15",
-            "backend/ml_models/vosk-models/vosk-model-small-en-us-0.15",
-            "../backend/ml_models/vosk-models/vosk-model-small-en-us-0.15",
-            "ml_models/vosk-models/vosk-model-small-en-us-0.15",
-        ]
+        "variants": {
+            "small": _model_paths("vosk-model-small-en-us-0.15"),
+            "large": _model_paths("vosk-model-en-us-0.22") + ["vosk-model-en-us-0.15"],
+        }
     }
 }
 
-# 初始化所有可用模型
-if VOSK_AVAILABLE:
-    for lang, config in MODEL_CONFIGS.items():
-        model_loaded = False
-        for path in config["paths"]:
-            if load_vosk_model(lang, path):
-                model_loaded = True
-                break
-        
-        if not model_loaded:
-            logger.warning(f"未找到 {config['name']}，请下载并放置在指定目录")
-    
-    # 设置默认语言
-    if "zh-CN" in vosk_models:
-        current_language = "zh-CN"
-    elif "en-US" in vosk_models:
-        current_language = "en-US"
+# 模型按需加载：优先使用的规格、所有已加载模型的内存预算、启动时预加载的语言
+SPEECH_MODEL_SIZE = os.getenv("SPEECH_MODEL_SIZE", "small")
+SPEECH_MODEL_MEMORY_BUDGET_MB = int(os.getenv("SPEECH_MODEL_MEMORY_BUDGET_MB", "1024"))
+SPEECH_PRELOAD_LANGUAGES = [l.strip() for l in os.getenv("SPEECH_PRELOAD_LANGUAGES", "").split(",") if l.strip()]
+
+def _on_model_evicted(language: str, size: str):
+    recognizer_pool.discard(language)
+
+vosk_registry = VoskModelRegistry(
+    MODEL_CONFIGS,
+    memory_budget_bytes=SPEECH_MODEL_MEMORY_BUDGET_MB * 1024 * 1024,
+    preferred_size=SPEECH_MODEL_SIZE,
+    loader=vosk.Model,
+    on_evict=_on_model_evicted
+) if VOSK_AVAILABLE else None
+
+def preload_models(languages: Optional[list] = None):
+    """预加载指定语言的模型（工作进程启动时调用）"""
+    if vosk_registry is not None:
+        vosk_registry.preload(languages if languages is not None else SPEECH_PRELOAD_LANGUAGES)
+
+def available_languages() -> list:
+    """有模型文件的语言（不触发加载）"""
+    return vosk_registry.available_languages() if vosk_registry else []
+
+def loaded_languages() -> list:
+    """已加载模型的语言"""
+    return vosk_registry.loaded_languages() if vosk_registry else []
+
+# 设置默认语言
+if available_languages() and "zh-CN" not in available_languages():
+    current_language = available_languages()[0]
 
 def set_current_language(language: str):
-    """设置当前使用的语言"""
+    """设置默认语言（仅影响状态展示，识别时语言由每个请求显式指定）"""
     global current_language
-    if language in vosk_models:
+    if language in available_languages():
         current_language = language
         logger.info(f"切换到 {language} 模型")
         return True
     else:
-        logger.warning(f"语言 {language} 的模型未加载")
+        logger.warning(f"语言 {language} 的模型不可用")
         return False
 
-def get_current_model():
-    """获取当前语言模型"""
-    return vosk_models.get(current_language)
+def get_model(language: str):
+    """获取指定语言的模型（首次使用时加载）"""
+    return vosk_registry.get(language) if vosk_registry else None
+
+# 按语言复用的识别器池
+recognizer_pool = RecognizerPool(get_model, sample_rate=TARGET_SAMPLE_RATE)
+
+# 发音分析进程池（首次请求时启动工作进程）
+analysis_pool = AudioAnalysisPool()
 
 @router.get("/health")
 async def health_check():
     """健康检查接口"""
-    available_models = list(vosk_models.keys())
     return {
         "status": "ok",
         "message": "后端服务正常运行",
         "version": "4.0",
         "vosk_available": VOSK_AVAILABLE,
-        "available_models": available_models,
+        "available_models": available_languages(),
+        "loaded_models": loaded_languages(),
         "current_language": current_language,
         "features": "多语言Vosk语音识别 + 音频分析"
     }
 
+@router.get("/analysis-pool/stats")
+async def get_analysis_pool_stats():
+    """发音分析进程池状态：在途请求、排队等待与计算耗时"""
+    return analysis_pool.stats()
+
+@router.on_event("shutdown")
+async def shutdown_analysis_pool():
+    analysis_pool.shutdown()
+
 @router.post("/set-language")
 async def set_language(language: str = Form(...)):
     """设置识别语言"""
@@ -146,10 +172,6 @@ async def analyze_pronunciation(
     try:
         logger.info(f"收到分析请求，用户: {user_id}, 语言: {language}, 参考文本: '{reference_text}'")
         
-        # 设置语言
-        if language in ["zh-CN", "en-US"]:
-            set_current_language(language)
-        
         # 读取音频文件
         audio_data = await audio.read()
         logger.info(f"音频文件大小: {len(audio_data)} 字节")
@@ -159,6 +181,12 @@ async def analyze_pronunciation(
         
         return analysis_result
     
+    except AnalysisPoolBusy as e:
+        logger.warning(f"发音分析繁忙: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except AnalysisTimeout as e:
+        logger.warning(f"发音分析超时: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"发音分析错误: {e}")
         import traceback
@@ -185,162 +213,392 @@ async def analyze_pronunciation(
             "next_exercise_recommendation": "基础练习"
         }
 
+# 批量评分：单批最多片段数、zip 内单个文件与整批解压后的大小上限、单个片段在进程池繁忙时的重试次数
+BATCH_MAX_CLIPS = int(os.getenv("SPEECH_BATCH_MAX_CLIPS", "200"))
+BATCH_MAX_CLIP_MB = int(os.getenv("SPEECH_BATCH_MAX_CLIP_MB", "20"))
+BATCH_MAX_TOTAL_MB = int(os.getenv("SPEECH_BATCH_MAX_TOTAL_MB", "200"))
+BATCH_BUSY_RETRIES = 20
+AUDIO_EXTENSIONS = (".wav", ".webm", ".ogg", ".mp3", ".m4a", ".flac", ".aac")
+
+def parse_reference_texts(raw: Optional[str], filenames: List[str]) -> Dict[str, str]:
+    """
+    解析参考文本：JSON 对象 {文件名: 文本}、与文件顺序对应的 JSON 数组，
+    或每行 “文件名,文本” 的纯文本。
+    """
+    if not raw:
+        return {}
+    try:
+        parsed = json.loads(raw)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, dict):
+        return {str(k): str(v) for k, v in parsed.items()}
+    if isinstance(parsed, list):
+        return {name: str(text) for name, text in zip(filenames, parsed)}
+
+    references = {}
+    for line in raw.splitlines():
+        if "," in line:
+            name, text = line.split(",", 1)
+            references[name.strip()] = text.strip()
+    return references
+
+def read_zip_clips(archive_data: bytes):
+    """
+    读取 zip 中的音频片段，返回 ([(文件名, 音频字节)], 包内清单文本)。
+    解压前按目录中的文件数与解压后大小检查上限，防止压缩炸弹耗尽内存
+    （zipfile 读取时不会超出目录中声明的 file_size）。
+    """
+    clip_limit = BATCH_MAX_CLIP_MB * 1024 * 1024
+    total_limit = BATCH_MAX_TOTAL_MB * 1024 * 1024
+    with zipfile.ZipFile(io.BytesIO(archive_data)) as archive:
+        clip_infos, manifest_info = [], None
+        for info in archive.infolist():
+            if info.is_dir() or os.path.basename(info.filename).startswith("."):
+                continue
+            lower = info.filename.lower()
+            if lower.endswith(AUDIO_EXTENSIONS):
+                clip_infos.append(info)
+            elif os.path.basename(lower) in ("manifest.json", "references.csv", "references.txt"):
+                manifest_info = info
+
+        if len(clip_infos) > BATCH_MAX_CLIPS:
+            raise HTTPException(status_code=400, detail=f"单批最多 {BATCH_MAX_CLIPS} 个音频文件")
+        total = 0
+        for info in clip_infos + ([manifest_info] if manifest_info else []):
+            if info.file_size > clip_limit:
+                raise HTTPException(status_code=413, detail=f"{info.filename} 解压后超过 {BATCH_MAX_CLIP_MB}MB")
+            total += info.file_size
+            if total > total_limit:
+                raise HTTPException(status_code=413, detail=f"压缩包解压后超过 {BATCH_MAX_TOTAL_MB}MB")
+
+        clips = [(info.filename, archive.read(info)) for info in clip_infos]
+        manifest = archive.read(manifest_info).decode("utf-8-sig") if manifest_info else None
+    clips.sort(key=lambda clip: clip[0])
+    return clips, manifest
+
+def summarize_batch(results: List[Dict]) -> Dict[str, Any]:
+    """批量结果的汇总统计"""
+    scores = [r["overall_score"] for r in results]
+    similarities = [r["similarity_score"] for r in results]
+    issue_counts: Dict[str, int] = {}
+    for r in results:
+        for issue in r.get("issues", []):
+            issue_counts[issue["type"]] = issue_counts.get(issue["type"], 0) + 1
+    if not scores:
+        return {"scored": 0, "issue_counts": issue_counts}
+    return {
+        "scored": len(scores),
+        "mean_score": round(float(np.mean(scores)), 1),
+        "min_score": int(min(scores)),
+        "max_score": int(max(scores)),
+        "mean_similarity": round(float(np.mean(similarities)), 1),
+        "passed": sum(1 for s in scores if s >= 70),
+        "issue_counts": issue_counts
+    }
+
+async def analyze_clip_for_batch(audio_data: bytes, reference_text: str, user_id: str, language: str) -> Dict:
+    """批量中的单个片段：进程池繁忙时退避重试，而不是直接失败"""
+    for attempt in range(BATCH_BUSY_RETRIES):
+        try:
+            return await analyze_audio(audio_data, reference_text, user_id, language)
+        except AnalysisPoolBusy:
+            await asyncio.sleep(min(0.1 * (attempt + 1), 1.0))
+    return await analyze_audio(audio_data, reference_text, user_id, language)
+
+@router.post("/analyze-batch")
+async def analyze_pronunciation_batch(
+    archive: Optional[UploadFile] = File(None),
+    audios: Optional[List[UploadFile]] = File(None),
+    reference_texts: Optional[str] = Form(None),
+    user_id: str = Form("default_user"),
+    language: str = Form("zh-CN")
+):
+    """
+    批量发音评分：上传 zip（可含 manifest.json / references.csv）或多个音频文件，
+    参考文本按文件名对应。结果以 NDJSON 流返回，每完成一个片段推送一行，最后推送汇总。
+    """
+    if archive is not None:
+        try:
+            clips, manifest = read_zip_clips(await archive.read())
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="无效的zip文件")
+    else:
+        clips = [(upload.filename, await upload.read()) for upload in (audios or [])]
+        manifest = None
+
+    if not clips:
+        raise HTTPException(status_code=400, detail="没有可评分的音频文件")
+    if len(clips) > BATCH_MAX_CLIPS:
+        raise HTTPException(status_code=400, detail=f"单批最多 {BATCH_MAX_CLIPS} 个音频文件")
+
+    filenames = [name for name, _ in clips]
+    references = parse_reference_texts(manifest, filenames)
+    references.update(parse_reference_texts(reference_texts, filenames))
+
+    def reference_for(name: str) -> Optional[str]:
+        # 允许只写不带目录/扩展名的文件名
+        base = os.path.basename(name)
+        return references.get(name) or references.get(base) or references.get(os.path.splitext(base)[0])
+
+    logger.info(f"收到批量分析请求，用户: {user_id}, 语言: {language}, 片段数: {len(clips)}")
+
+    # 同一批次最多占用与工作进程数相同的名额，给其他单条请求留出排队空间
+    batch_slots = asyncio.Semaphore(max(1, analysis_pool.workers))
+
+    async def run_clip(index: int, name: str, audio_data: bytes):
+        reference_text = reference_for(name)
+        if reference_text is None:
+            return index, name, None, "缺少参考文本"
+        try:
+            async with batch_slots:
+                result = await analyze_clip_for_batch(audio_data, reference_text, user_id, language)
+            return index, name, result, None
+        except Exception as e:
+            logger.error(f"批量分析片段 {name} 失败: {e}")
+            return index, name, None, str(e)
+
+    async def stream():
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(run_clip(i, name, data)) for i, (name, data) in enumerate(clips)]
+        results = []
+        failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, name, result, error = await finished
+                line = {"type": "clip", "index": index, "filename": name,
+                        "reference_text": reference_for(name)}
+                if error is None:
+                    results.append(result)
+                    line["result"] = result
+                else:
+                    failed += 1
+                    line["error"] = error
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+
+            summary = {"type": "summary", "total": len(clips), "failed": failed,
+                       "elapsed_seconds": round(time.perf_counter() - started, 2),
+                       **summarize_batch(results)}
+            yield json.dumps(summary, ensure_ascii=False) + "\n"
+        finally:
+            # 客户端中途断开时取消尚未完成的片段
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 async def analyze_audio(audio_data: bytes, reference_text: str, user_id: str, language: str) -> Dict[str, Any]:
-    """分析音频数据"""
+    """分析音频数据（在进程池中执行，不阻塞事件循环）"""
+    return await analysis_pool.submit(audio_data, reference_text, user_id, language)
+
+def run_audio_analysis(audio_data: bytes, reference_text: str, user_id: str, language: str) -> Dict[str, Any]:
+    """同步执行完整的分析流程：识别 + 特征提取 + 评分（在工作进程中调用）"""
+    # 内存中解码一次，识别与特征提取共用同一缓冲区
+    try:
+        audio = decode_audio(audio_data)
+        logger.info(f"音频分析: 时长={audio.duration:.2f}s, 采样率={audio.sample_rate}Hz")
+    except AudioDecodeError as e:
+        logger.warning(f"音频解码失败: {e}")
+        audio = None
     
-    # 保存临时文件
-    with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as temp_file:
-        temp_file.write(audio_data)
-        temp_file.flush()
-        temp_path = temp_file.name
+    # 语音活动检测：去掉静音，只把语音段送往识别与特征提取
+    speech, segments, vad = audio, [audio], None
+    if audio is not None and VAD_ENABLED:
+        vad = trim_silence(audio)
+        speech, segments = vad.audio, split_segments(audio, vad)
+        logger.info(f"VAD: {len(segments)}段语音，{vad.speech_duration:.2f}s / {audio.duration:.2f}s")
     
+    # 使用Vosk进行语音识别
+    recognized_text = ""
+    
+    if audio is None:
+        recognized_text = "识别失败"
+    elif not segments:
+        recognized_text = "未识别到语音"
+    elif get_model(language):
+        recognized_text = recognize_with_vosk(audio, language, segments)
+        logger.info(f"Vosk识别结果 ({language}): '{recognized_text}'")
+    else:
+        # Vosk不可用时使用模拟识别
+        recognized_text = simulate_recognition(speech, reference_text, language)
+        logger.info(f"模拟识别结果 ({language}): '{recognized_text}'")
+    
+    # 提取音频特征
+    features = {}
+    if speech is not None and len(speech) > 0:
+        features = extract_basic_features(speech.samples, speech.sample_rate)
+        if vad is not None:
+            # 语音段已拼接，停顿比例按 VAD 切分的段间间隔计算
+            features["pause_ratio"] = vad.pause_ratio
+            features["utterances"] = len(vad.segments)
+    elif audio is not None:
+        # 已解码但没有语音（静音/噪声被 VAD 全部去掉）：时长为 0，不编造浊音特征
+        features = no_speech_features()
+    else:
+        features = {
+            "duration": 2.0,
+            "rms": 0.1,
+            "spectral_centroid": 1000,
+            "pitch_std": 10
+        }
+    
+    # 生成分析结果
+    analysis_result = generate_analysis_result(
+        reference_text, recognized_text, features, user_id, language
+    )
+    
+    return analysis_result
+
+def no_speech_features() -> Dict[str, Any]:
+    """没有检测到语音时的特征：只有时长与能量，评分与诊断据 no_speech 标记处理"""
+    return {"duration": 0.0, "rms": 0.0, "voiced_fraction": 0.0, "no_speech": True}
+
+# 流式识别：单个连接最多接收的音频时长（秒）
+STREAM_MAX_SECONDS = int(os.getenv("SPEECH_STREAM_MAX_SECONDS", "60"))
+
+def accept_stream_chunk(rec, chunk: bytes) -> Tuple[bool, str]:
+    """送入一段 PCM，返回 (是否得到一句完整结果, 完整结果或部分结果文本)"""
+    if rec.AcceptWaveform(chunk):
+        return True, json.loads(rec.Result()).get("text", "")
+    return False, json.loads(rec.PartialResult()).get("partial", "")
+
+@router.websocket("/ws")
+async def speech_stream(
+    websocket: WebSocket,
+    reference_text: str = "",
+    user_id: str = "default_user",
+    language: str = "zh-CN"
+):
+    """
+    流式发音识别。
+    客户端持续发送 16kHz 单声道 16 位 PCM 二进制帧，说完后发送 {"type": "end"}；
+    服务端逐帧推送 {"type": "partial"} / {"type": "result"}，最后推送 {"type": "final", ...分析结果}。
+    """
+    await websocket.accept()
+    loop = asyncio.get_running_loop()
+
+    model, rec = None, None
+    max_bytes = STREAM_MAX_SECONDS * TARGET_SAMPLE_RATE * 2
+    pcm = bytearray()
+    pending = b""  # 不足一个采样的奇数字节留到下一帧
+    results = []
+
     try:
-        # 使用Vosk进行语音识别
-        recognized_text = ""
-        current_model = get_current_model()
-        
-        if current_model:
-            recognized_text = await recognize_with_vosk(temp_path, language)
-            logger.info(f"Vosk识别结果 ({language}): '{recognized_text}'")
+        # 连接期间独占一个识别器，结束后归还；创建识别器或首次加载模型可能耗时数秒，放到线程池执行
+        model, rec = await loop.run_in_executor(None, recognizer_pool.acquire, language)
+
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                logger.info(f"流式识别连接断开，用户: {user_id}")
+                return
+
+            if message.get("bytes"):
+                data = pending + message["bytes"]
+                usable = len(data) - len(data) % 2
+                chunk, pending = data[:usable], data[usable:]
+                if len(pcm) + len(chunk) > max_bytes:
+                    await websocket.send_json({"type": "error", "message": f"音频超过{STREAM_MAX_SECONDS}秒，已自动结束"})
+                    break
+                pcm.extend(chunk)
+                if rec is None or not chunk:
+                    continue
+
+                # 识别器调用均为阻塞调用，放到线程池执行
+                completed, text = await loop.run_in_executor(None, accept_stream_chunk, rec, chunk)
+                if completed:
+                    if text:
+                        results.append(text)
+                    await websocket.send_json({"type": "result", "text": text})
+                else:
+                    await websocket.send_json({"type": "partial", "partial": text})
+
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    control = {}
+                if control.get("type") == "end":
+                    break
+
+        # 说话结束：取最终结果，用已缓存的 PCM 计算特征并评分
+        audio = DecodedAudio(np.frombuffer(bytes(pcm), dtype="<i2").astype(np.float32) / 32768)
+        if rec is not None:
+            final_text = await loop.run_in_executor(None, lambda: json.loads(rec.FinalResult()).get("text", ""))
+            if final_text:
+                results.append(final_text)
+            recognized_text = " ".join(results).strip() or "未识别到语音"
         else:
-            # Vosk不可用时使用模拟识别
-            recognized_text = await simulate_recognition(temp_path, reference_text, language)
-            logger.info(f"模拟识别结果 ({language}): '{recognized_text}'")
-        
-        # 加载音频进行特征分析
-        try:
-            y, sr = librosa.load(temp_path, sr=16000)
-            duration = len(y) / sr
-            logger.info(f"音频分析: 时长={duration:.2f}s, 采样率={sr}Hz")
-        except Exception as e:
-            logger.warning(f"音频加载失败: {e}")
-            y, sr, duration = None, 16000, 2.0
-        
-        # 提取音频特征
-        features = {}
-        if y is not None:
-            features = extract_basic_features(y, sr)
+            recognized_text = simulate_recognition(audio, reference_text, language)
+
+        if len(audio) > 0:
+            features = await loop.run_in_executor(None, extract_basic_features, audio.samples, audio.sample_rate)
         else:
-            features = {
-                "duration": duration,
-                "rms": 0.1,
-                "spectral_centroid": 1000,
-                "pitch_std": 10
-            }
-        
-        # 生成分析结果
-        analysis_result = generate_analysis_result(
-            reference_text, recognized_text, features, user_id, language
+            features = no_speech_features()
+
+        # 评分时可能触发模型懒加载，同样放到线程池
+        analysis_result = await loop.run_in_executor(
+            None, generate_analysis_result, reference_text, recognized_text, features, user_id, language
         )
-        
-        return analysis_result
-        
+        await websocket.send_json({"type": "final", **analysis_result})
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logger.info(f"流式识别连接断开，用户: {user_id}")
+    except Exception as e:
+        logger.error(f"流式识别错误: {e}")
+        try:
+            await websocket.send_json({"type": "error", "message": str(e)})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
     finally:
-        # 清理临时文件
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+        if rec is not None:
+            recognizer_pool.release(language, model, rec)
 
-async def recognize_with_vosk(audio_path: str, language: str) -> str:
-    """使用Vosk进行语音识别"""
-    current_model = get_current_model()
-    if not current_model:
-        return f"Vosk {language} 模型不可用"
-    
+# 每次送入识别器的 PCM 字节数（4000 帧 16 位采样）
+RECOGNIZER_CHUNK_BYTES = 8000
+
+def recognize_with_vosk(audio: DecodedAudio, language: str,
+                        segments: Optional[List[DecodedAudio]] = None) -> str:
+    """使用Vosk进行语音识别（输入为已解码的 16kHz 单声道音频，可按语音段逐段识别）"""
     try:
-        # 转换音频为WAV格式
-        wav_path = convert_to_wav(audio_path)
-        if not wav_path:
-            return "音频转换失败"
-        
-        try:
-            wf = wave.open(wav_path, 'rb')
-            
-            # 检查音频格式
-            if wf.getnchannels() != 1:
-                logger.warning("音频不是单声道，可能影响识别准确性")
-            if wf.getsampwidth() != 2:
-                logger.warning("音频采样宽度不是16位，可能影响识别准确性")
-            if wf.getframerate() not in [8000, 16000]:
-                logger.warning(f"音频采样率{wf.getframerate()}Hz不是推荐值(8000或16000Hz)")
+        # 从该语言的池中取出识别器，用完重置归还
+        with recognizer_pool.recognizer(language) as rec:
+            if rec is None:
+                return f"Vosk {language} 模型不可用"
             
-            # 创建识别器
-            rec = vosk.KaldiRecognizer(current_model, wf.getframerate())
-            rec.SetWords(True)
-            
-            # 识别过程
+            # 识别过程：每个语音段结束时取一次最终结果
             results = []
-            while True:
-                data = wf.readframes(4000)
-                if len(data) == 0:
-                    break
-                if rec.AcceptWaveform(data):
-                    result = json.loads(rec.Result())
-                    if 'text' in result and result['text']:
-                        results.append(result['text'])
-                        logger.info(f"部分识别 ({language}): {result['text']}")
-            
-            # 获取最终结果
-            final_result = json.loads(rec.FinalResult())
-            if 'text' in final_result and final_result['text']:
-                results.append(final_result['text'])
-            
-            wf.close()
-            
-            # 合并所有识别结果
-            recognized_text = " ".join(results).strip()
-            return recognized_text if recognized_text else "未识别到语音"
-            
-        except Exception as e:
-            logger.error(f"Vosk识别过程错误: {e}")
-            return f"识别错误: {str(e)}"
-        finally:
-            if 'wf' in locals():
-                wf.close()
-            # 清理临时WAV文件
-            if os.path.exists(wav_path) and wav_path != audio_path:
-                os.unlink(wav_path)
+            for segment in segments or [audio]:
+                pcm = segment.pcm16
+                for start in range(0, len(pcm), RECOGNIZER_CHUNK_BYTES):
+                    if rec.AcceptWaveform(pcm[start:start + RECOGNIZER_CHUNK_BYTES]):
+                        result = json.loads(rec.Result())
+                        if 'text' in result and result['text']:
+                            results.append(result['text'])
+                            logger.info(f"部分识别 ({language}): {result['text']}")
+                
+                # 获取最终结果
+                final_result = json.loads(rec.FinalResult())
+                if 'text' in final_result and final_result['text']:
+                    results.append(final_result['text'])
+        
+        # 合并所有识别结果
+        recognized_text = " ".join(results).strip()
+        return recognized_text if recognized_text else "未识别到语音"
                 
     except Exception as e:
         logger.error(f"Vosk识别错误: {e}")
         return f"识别失败: {str(e)}"
 
-def convert_to_wav(audio_path: str) -> str:
-    """将音频转换为WAV格式"""
-    try:
-        # 如果已经是WAV格式，直接返回
-        if audio_path.lower().endswith('.wav'):
-            return audio_path
-            
-        # 尝试使用pydub转换
-        try:
-            from pydub import AudioSegment
-            audio = AudioSegment.from_file(audio_path)
-            # 转换为单声道，16kHz，16位
-            audio = audio.set_channels(1)
-            audio = audio.set_frame_rate(16000)
-            audio = audio.set_sample_width(2)
-            
-            wav_path = audio_path + '.wav'
-            audio.export(wav_path, format='wav')
-            return wav_path
-        except ImportError:
-            logger.warning("pydub未安装，音频转换功能受限")
-            return audio_path
-        except Exception as e:
-            logger.warning(f"pydub转换失败: {e}")
-            return audio_path
-            
-    except Exception as e:
-        logger.error(f"音频转换错误: {e}")
-        return audio_path
-
-async def simulate_recognition(audio_path: str, reference_text: str, language: str) -> str:
+def simulate_recognition(audio: DecodedAudio, reference_text: str, language: str) -> str:
     """Vosk不可用时的模拟识别"""
     import random
     
-    # 基于音频文件的存在性给出不同结果
-    if not os.path.exists(audio_path):
-        return "音频文件不存在"
+    # 基于音频是否有内容给出不同结果
+    if len(audio) == 0:
+        return "未识别到语音"
     
     # 80%概率正确，20%概率错误
     if random.random() < 0.8:
@@ -363,27 +621,14 @@ async def simulate_recognition(audio_path: str, reference_text: str, language: s
         return error_patterns.get(reference_text, reference_text + "?")
 
 def extract_basic_features(y, sr):
-    """提取基础音频特征"""
-    features = {
-        "duration": len(y) / sr,
-        "rms": float(np.mean(librosa.feature.rms(y=y))),
-        "zero_crossing_rate": float(np.mean(librosa.feature.zero_crossing_rate(y))),
-    }
-    
-    # 提取频谱特征
-    try:
-        spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
-        features["spectral_centroid"] = float(np.mean(spectral_centroid))
-    except:
-        features["spectral_centroid"] = 1000.0
+    """提取基础音频特征（一次分帧/一次幅度谱）"""
+    features = extract_acoustic_features(y, sr)
     
     # 提取基频特征
     try:
-        f0, voiced_flag, voiced_probs = librosa.pyin(y, fmin=50, fmax=300, sr=sr)
-        f0 = f0[~np.isnan(f0)]
-        if len(f0) > 0:
-            features["pitch_mean"] = float(np.mean(f0))
-            features["pitch_std"] = float(np.std(f0))
+        pitch = pitch_statistics(y, sr, fmin=50, fmax=300)
+        if pitch is not None:
+            features["pitch_mean"], features["pitch_std"] = pitch
         else:
             features["pitch_mean"] = 120.0
             features["pitch_std"] = 10.0
@@ -403,17 +648,21 @@ def generate_analysis_result(reference_text: str, recognized_text: str,
     reference_text = reference_text.strip().lower()
     
     # 计算相似度
-    similarity = calculate_text_similarity(recognized_text, reference_text)
+    # 对齐识别文本与参考文本：一次得到相似度与逐字错误
+    alignment = align_recognition(recognized_text, reference_text, language)
+    similarity = alignment.similarity
     
     # 计算基础分数
     base_score = int(similarity * 100)
     
     # 基于音频特征调整分数
+    no_speech = features.get("no_speech", False)
     audio_quality_score = calculate_audio_quality_score(features)
     final_score = int((base_score * 0.7) + (audio_quality_score * 0.3))
     
     # 生成问题列表
-    issues = generate_issues(recognized_text, reference_text, features, final_score, language)
+    issues = generate_issues(recognized_text, reference_text, features, final_score, language,
+                             alignment.errors)
     
     # 生成建议
     suggestions = generate_suggestions(issues, final_score, language)
@@ -427,29 +676,32 @@ def generate_analysis_result(reference_text: str, recognized_text: str,
         "suggestions": suggestions,
         "audio_features": {
             "duration": round(features.get("duration", 0), 2),
-            "pitch_stability": max(0, min(100, 100 - features.get("pitch_std", 10) * 3)),
-            "clarity_score": max(0, min(100, features.get("spectral_centroid", 1000) / 15))
+            "pitch_stability": 0 if no_speech else max(0, min(100, 100 - features.get("pitch_std", 10) * 3)),
+            "clarity_score": 0 if no_speech else max(0, min(100, features.get("spectral_centroid", 1000) / 15)),
+            "speaking_rate": round(features.get("speaking_rate", 0), 2),
+            "pause_ratio": round(features.get("pause_ratio", 0), 3),
+            "voiced_fraction": round(features.get("voiced_fraction", 0), 3)
         },
         "improvement_tip": get_improvement_tip(final_score, len(issues), language),
         "personalized_advice": get_personalized_advice(final_score, language),
         "next_exercise_recommendation": get_next_exercise_recommendation(reference_text, final_score, language),
-        "recognition_engine": "vosk" if get_current_model() else "simulated"
+        "recognition_engine": "vosk" if get_model(language) else "simulated"
     }
 
-def calculate_text_similarity(text1: str, text2: str) -> float:
+def align_recognition(recognized_text: str, reference_text: str, language: str) -> Alignment:
+    """识别失败时相似度为0，否则做加权编辑距离对齐"""
+    if not recognized_text or recognized_text in ["未识别到语音", "识别失败", "Vosk不可用"]:
+        return Alignment(0.0, float(len(reference_text)), [])
+    return align_texts(recognized_text, reference_text, language)
+
+def calculate_text_similarity(text1: str, text2: str, language: str = "zh-CN") -> float:
     """计算文本相似度"""
-    if not text1 or text1 in ["未识别到语音", "识别失败", "Vosk不可用"]:
-        return 0.0
-        
-    if text1 == text2:
-        return 1.0
-    
-    # 使用编辑距离计算相似度
-    from difflib import SequenceMatcher
-    return SequenceMatcher(None, text1, text2).ratio()
+    return align_recognition(text1, text2, language).similarity
 
 def calculate_audio_quality_score(features: Dict) -> float:
     """计算音频质量分数"""
+    if features.get("no_speech"):
+        return 0
     score = 70  # 基础分数
     
     # RMS能量
@@ -476,8 +728,23 @@ def calculate_audio_quality_score(features: Dict) -> float:
     return max(0, min(100, score))
 
 def generate_issues(recognized_text: str, reference_text: str, 
-                   features: Dict, score: int, language: str) -> list:
+                   features: Dict, score: int, language: str,
+                   alignment_errors: Optional[List[Dict]] = None) -> list:
     """生成问题诊断"""
+    # 没有检测到语音时其余诊断（音量、音调、语速、清晰度）都没有意义
+    if features.get("no_speech"):
+        if language == "zh-CN":
+            return [{
+                "type": "no_speech",
+                "description": "未检测到语音，录音中只有静音或噪声",
+                "severity": "high"
+            }]
+        return [{
+            "type": "no_speech",
+            "description": "No speech detected, the recording contains only silence or noise",
+            "severity": "high"
+        }]
+    
     issues = []
     
     # 规范化文本比较（忽略大小写和首尾空格）
@@ -501,17 +768,22 @@ def generate_issues(recognized_text: str, reference_text: str,
                 })
         else:
             if language == "zh-CN":
-                issues.append({
+                issue = {
                     "type": "pronunciation_accuracy",
                     "description": f"识别结果为'{recognized_text}'，与标准文本'{reference_text}'不一致",
                     "severity": "high"
-                })
+                }
             else:
-                issues.append({
+                issue = {
                     "type": "pronunciation_accuracy",
                     "description": f"Recognition result '{recognized_text}' does not match reference text '{reference_text}'",
                     "severity": "high"
-                })
+                }
+            # 逐字对齐结果
+            if alignment_errors:
+                issue["details"] = describe_errors(alignment_errors, language)
+                issue["errors"] = alignment_errors[:20]
+            issues.append(issue)
     else:
         # 即使文本匹配，也要检查大小写差异（作为低严重性问题）
         if recognized_text.strip() != reference_text.strip():
@@ -648,6 +920,9 @@ def generate_suggestions(issues: list, score: int, language: str) -> list:
         issue_types = [issue["type"] for issue in issues]
         
         if language == "zh-CN":
+            if "no_speech" in issue_types:
+                suggestions.append("未录到语音，请检查麦克风是否开启并靠近麦克风朗读")
+            
             if "recognition_failed" in issue_types:
                 suggestions.append("请检查录音设备，确保在安静环境下录音")
                 suggestions.append("录音时请靠近麦克风，发音清晰明确")
@@ -668,6 +943,9 @@ def generate_suggestions(issues: list, score: int, language: str) -> list:
                 suggestions.append("建议从基础发音开始，逐步提高难度")
                 suggestions.append("多听多模仿标准发音")
         else:
+            if "no_speech" in issue_types:
+                suggestions.append("No speech was recorded, check that the microphone is on and read close to it")
+            
             if "recognition_failed" in issue_types:
                 suggestions.append("Please check recording device and ensure quiet environment")
                 suggestions.append("Speak clearly and close to the microphone")
@@ -773,7 +1051,7 @@ async def get_user_progress(user_id: str):
         "user_id": user_id,
         "total_practices": 12,
         "overall_avg_score": 78,
-        "available_languages": list(vosk_models.keys()),
+        "available_languages": available_languages(),
         "current_language": current_language,
         "recent_history": [
             {"date": "2023-11-01", "type": "vowel", "avg_score": 75, "practices": 3},
@@ -792,14 +1070,18 @@ async def get_exercise_recommendations(user_id: str):
             {"type": "word", "reason": "提升日常词汇发音准确性"},
             {"type": "phrase", "reason": "加强连贯发音能力"}
         ],
-        "available_languages": list(vosk_models.keys())
+        "available_languages": available_languages()
     }
 
 @router.get("/available-languages")
 async def get_available_languages():
     """获取可用的语言列表"""
     return {
-        "available_languages": list(vosk_models.keys()),
+        "available_languages": available_languages(),
         "current_language": current_language,
-        "model_status": {lang: "loaded" for lang in vosk_models.keys()}
+        "model_status": {
+            lang: "loaded" if lang in loaded_languages() else "available"
+            for lang in available_languages()
+        },
+        "models": vosk_registry.status() if vosk_registry else {}
     }
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+识别文本与参考文本的加权编辑距离对齐。
+
+一次动态规划同时得到相似度和逐字错误列表（替换/漏读/多读）。
+替换代价按发音相近程度降低：
+- zh-CN: 同音不同调、同声母或同韵母的字代价更低（需要 pypinyin，未安装时退化为等代价）
+- en-US: 发音相近的字母类（b/p、d/t、m/n、元音等）代价更低
+
+DP 按行用 NumPy 向量化：插入代价为常数，行内依赖可化为一次前缀最小值（np.minimum.accumulate），
+整体仍是 O(n·m)，但每行只有常数次向量运算。
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from pypinyin import Style, pinyin
+    PYPINYIN_AVAILABLE = True
+except ImportError:
+    PYPINYIN_AVAILABLE = False
+
+INSERTION_COST = 1.0
+DELETION_COST = 1.0
+
+# zh-CN 替换代价
+SAME_SYLLABLE_COST = 0.25   # 仅声调不同
+SHARED_PART_COST = 0.6      # 声母或韵母相同
+
+# en-US 发音相近的字母类
+ENGLISH_SOUND_CLASSES = ("bp", "dt", "gkcq", "fvw", "szcx", "jg", "mn", "lr", "aeiouy")
+SIMILAR_LETTER_COST = 0.5
+
+_CJK = re.compile(r"[一-鿿]")
+
+
+@lru_cache(maxsize=8192)
+def _pinyin_parts(char: str):
+    """返回 (不带声调的音节, 声母, 韵母)；非汉字返回 None"""
+    if not PYPINYIN_AVAILABLE or not _CJK.match(char):
+        return None
+    syllable = pinyin(char, style=Style.NORMAL, strict=False)[0][0]
+    initial = pinyin(char, style=Style.INITIALS, strict=False)[0][0]
+    final = pinyin(char, style=Style.FINALS, strict=False)[0][0]
+    return syllable, initial, final
+
+
+def _zh_cost(a: str, b: str) -> float:
+    pa, pb = _pinyin_parts(a), _pinyin_parts(b)
+    if pa is None or pb is None:
+        return 1.0
+    if pa[0] == pb[0]:
+        return SAME_SYLLABLE_COST
+    if (pa[1] and pa[1] == pb[1]) or (pa[2] and pa[2] == pb[2]):
+        return SHARED_PART_COST
+    return 1.0
+
+
+def _en_cost(a: str, b: str) -> float:
+    for group in ENGLISH_SOUND_CLASSES:
+        if a in group and b in group:
+            return SIMILAR_LETTER_COST
+    return 1.0
+
+
+def substitution_cost(a: str, b: str, language: str) -> float:
+    if a == b:
+        return 0.0
+    return _zh_cost(a, b) if language == "zh-CN" else _en_cost(a, b)
+
+
+def normalize_text(text: str, language: str) -> str:
+    """中文去掉所有空白（识别结果按词分隔）；英文合并空白、转小写"""
+    text = text.strip().lower()
+    if language == "zh-CN":
+        return re.sub(r"\s+", "", text)
+    return re.sub(r"\s+", " ", text)
+
+
+def _cost_matrix(reference: str, hypothesis: str, language: str) -> np.ndarray:
+    """只对出现过的不同字符计算代价，再按下标展开"""
+    chars = sorted(set(reference) | set(hypothesis))
+    index = {c: i for i, c in enumerate(chars)}
+    pair = np.array([[substitution_cost(a, b, language) for b in chars] for a in chars])
+    ref_idx = np.array([index[c] for c in reference], dtype=np.intp)
+    hyp_idx = np.array([index[c] for c in hypothesis], dtype=np.intp)
+    return pair[np.ix_(ref_idx, hyp_idx)]
+
+
+class Alignment:
+    def __init__(self, similarity: float, distance: float, errors: List[Dict]):
+        self.similarity = similarity
+        self.distance = distance
+        self.errors = errors
+
+
+def align_texts(hypothesis: str, reference: str, language: str = "zh-CN") -> Alignment:
+    """对齐识别文本与参考文本，返回相似度（0~1）与错误列表"""
+    ref = normalize_text(reference, language)
+    hyp = normalize_text(hypothesis, language)
+    n, m = len(ref), len(hyp)
+    if n == 0 and m == 0:
+        return Alignment(1.0, 0.0, [])
+
+    dist = np.empty((n + 1, m + 1))
+    dist[0] = np.arange(m + 1) * INSERTION_COST
+    dist[:, 0] = np.arange(n + 1) * DELETION_COST
+    if n and m:
+        cost = _cost_matrix(ref, hyp, language)
+        offsets = np.arange(1, m + 1) * INSERTION_COST
+        for i in range(1, n + 1):
+            prev = dist[i - 1]
+            # 先取替换/删除，再用前缀最小值处理行内的插入
+            best = np.minimum(prev[:-1] + cost[i - 1], prev[1:] + DELETION_COST)
+            best = np.minimum.accumulate(np.concatenate(([dist[i, 0]], best)) - np.concatenate(([0.0], offsets)))
+            dist[i, 1:] = best[1:] + offsets
+
+    errors = _traceback(dist, ref, hyp, language)
+    distance = float(dist[n, m])
+    similarity = max(0.0, 1.0 - distance / max(n, m))
+    return Alignment(similarity, distance, errors)
+
+
+def _traceback(dist: np.ndarray, ref: str, hyp: str, language: str) -> List[Dict]:
+    errors = []
+    i, j = len(ref), len(hyp)
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            sub = substitution_cost(ref[i - 1], hyp[j - 1], language)
+            if np.isclose(dist[i, j], dist[i - 1, j - 1] + sub):
+                if sub > 0:
+                    errors.append({"type": "substitution", "position": i - 1,
+                                   "expected": ref[i - 1], "actual": hyp[j - 1], "cost": sub})
+                i, j = i - 1, j - 1
+                continue
+        if i > 0 and np.isclose(dist[i, j], dist[i - 1, j] + DELETION_COST):
+            errors.append({"type": "deletion", "position": i - 1, "expected": ref[i - 1], "actual": ""})
+            i -= 1
+        else:
+            errors.append({"type": "insertion", "position": i, "expected": "", "actual": hyp[j - 1]})
+            j -= 1
+    errors.reverse()
+    return errors
+
+
+def describe_errors(errors: List[Dict], language: str, limit: int = 5) -> Optional[str]:
+    """把前几个对齐错误转为可读描述"""
+    if not errors:
+        return None
+    parts = []
+    for error in errors[:limit]:
+        if language == "zh-CN":
+            if error["type"] == "substitution":
+                parts.append(f"第{error['position'] + 1}个字'{error['expected']}'读成了'{error['actual']}'")
+            elif error["type"] == "deletion":
+                parts.append(f"漏读了第{error['position'] + 1}个字'{error['expected']}'")
+            else:
+                parts.append(f"多读了'{error['actual']}'")
+        else:
+            if error["type"] == "substitution":
+                parts.append(f"'{error['expected']}' at position {error['position'] + 1} sounded like '{error['actual']}'")
+            elif error["type"] == "deletion":
+                parts.append(f"missed '{error['expected']}' at position {error['position'] + 1}")
+            else:
+                parts.append(f"extra '{error['actual']}'")
+    separator = "；" if language == "zh-CN" else "; "
+    suffix = "" if len(errors) <= limit else ("等" if language == "zh-CN" else " ...")
+    return separator.join(parts) + suffix
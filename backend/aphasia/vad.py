@@ -0,0 +1,113 @@
+"""
+基于能量 + 过零率的语音活动检测（VAD）。
+
+识别和特征提取之前先去掉首尾及较长的中间静音，并把多段发音切分开，
+只把有声段送往下游；duration 也因此只统计实际发音时长。
+"""
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+from audio_decode import DecodedAudio
+
+VAD_ENABLED = os.getenv("SPEECH_VAD_ENABLED", "true").lower() in ("1", "true", "yes")
+
+FRAME_MS = 30
+HOP_MS = 10
+# 能量高于噪声底该分贝数视为语音
+ENERGY_MARGIN_DB = 12.0
+# 能量略高于噪声底、过零率又高的帧（清辅音/摩擦音）也算语音
+WEAK_MARGIN_DB = 5.0
+FRICATIVE_MIN_ZCR = 0.25
+# 比全段峰值低超过该分贝数一律视为静音
+MAX_BELOW_PEAK_DB = 50.0
+# 噪声底估计的上限（dBFS），整段都在说话、没有静音帧时噪声底不会被抬高
+NOISE_FLOOR_MAX_DB = -55.0
+# 间隔短于该值的语音段合并；短于最小时长的语音段丢弃；每段前后保留的余量
+MIN_SILENCE_SECONDS = 0.3
+MIN_SPEECH_SECONDS = 0.1
+PADDING_SECONDS = 0.1
+
+
+class VadResult:
+    def __init__(self, audio: DecodedAudio, segments: List[Tuple[int, int]], original_duration: float):
+        self.audio = audio                  # 仅包含语音段的音频
+        self.segments = segments            # 原始音频中的 (起始采样, 结束采样)
+        self.original_duration = original_duration
+
+    @property
+    def speech_duration(self) -> float:
+        return self.audio.duration
+
+    @property
+    def pause_ratio(self) -> float:
+        """第一段开始到最后一段结束之间，段间停顿所占比例"""
+        if len(self.segments) < 2:
+            return 0.0
+        span = self.segments[-1][1] - self.segments[0][0]
+        speech = sum(end - start for start, end in self.segments)
+        return max(0.0, 1.0 - speech / span) if span > 0 else 0.0
+
+
+def detect_speech_segments(samples: np.ndarray, sr: int) -> List[Tuple[int, int]]:
+    """返回语音段 [(起始采样, 结束采样)]"""
+    frame = int(sr * FRAME_MS / 1000)
+    hop = int(sr * HOP_MS / 1000)
+    if len(samples) < frame:
+        return []
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, frame)[::hop]
+    energy_db = 10 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-12)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame
+
+    noise_floor = min(np.percentile(energy_db, 10), NOISE_FLOOR_MAX_DB)
+    audible = energy_db > energy_db.max() - MAX_BELOW_PEAK_DB
+    speech = audible & (
+        (energy_db > noise_floor + ENERGY_MARGIN_DB)
+        | ((energy_db > noise_floor + WEAK_MARGIN_DB) & (zcr > FRICATIVE_MIN_ZCR))
+    )
+    if not speech.any():
+        return []
+
+    # 帧序列 -> 连续段（帧下标）
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    min_gap = int(MIN_SILENCE_SECONDS * 1000 / HOP_MS)
+    merged = [[starts[0], ends[0]]]
+    for start, end in zip(starts[1:], ends[1:]):
+        if start - merged[-1][1] < min_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    pad = int(PADDING_SECONDS * sr)
+    min_len = int(MIN_SPEECH_SECONDS * sr)
+    segments = []
+    for start, end in merged:
+        s = max(0, start * hop - pad)
+        e = min(len(samples), (end - 1) * hop + frame + pad)
+        if (end - start) * hop < min_len:
+            continue
+        if segments and s <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], e)
+        else:
+            segments.append((s, e))
+    return segments
+
+
+def trim_silence(audio: DecodedAudio) -> VadResult:
+    """去除非语音部分，语音段按顺序拼接"""
+    segments = detect_speech_segments(audio.samples, audio.sample_rate)
+    if segments:
+        samples = np.concatenate([audio.samples[s:e] for s, e in segments])
+    else:
+        samples = audio.samples[:0]
+    return VadResult(DecodedAudio(samples, audio.sample_rate), segments, audio.duration)
+
+
+def split_segments(audio: DecodedAudio, result: VadResult) -> List[DecodedAudio]:
+    """按语音段切分原始音频（用于逐段识别）"""
+    return [DecodedAudio(audio.samples[s:e], audio.sample_rate) for s, e in result.segments]
@@ -0,0 +1,174 @@
+"""
+Vosk 模型的按需加载与内存预算管理。
+
+- 启动时只在候选路径中查找模型目录，不加载；每种语言/规格在首次使用时才加载
+- 以模型目录大小估算常驻内存，超出预算时按最近最少使用（LRU）卸载其他模型
+- 状态查询（已加载/可用）不会触发加载
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL_SIZES = ("small", "large")
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class _LoadedModel:
+    def __init__(self, model, path: str, size_bytes: int, load_seconds: float):
+        self.model = model
+        self.path = path
+        self.size_bytes = size_bytes
+        self.load_seconds = load_seconds
+
+
+class VoskModelRegistry:
+    """
+    configs 形如 {language: {"name": ..., "variants": {"small": [路径...], "large": [路径...]}}}。
+    on_evict(language, size) 在模型卸载后调用（用于丢弃该模型的空闲识别器）。
+    """
+
+    def __init__(self, configs: Dict, memory_budget_bytes: int, preferred_size: str = "small",
+                 loader: Optional[Callable[[str], object]] = None,
+                 on_evict: Optional[Callable[[str, str], None]] = None):
+        self.configs = configs
+        self.memory_budget_bytes = memory_budget_bytes
+        self.preferred_size = preferred_size if preferred_size in MODEL_SIZES else "small"
+        self.loader = loader
+        self.on_evict = on_evict
+        self._loaded: "OrderedDict[Tuple[str, str], _LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._failed: Dict[Tuple[str, str], str] = {}
+        self._available = self._discover()
+
+    def _discover(self) -> Dict[str, Dict[str, str]]:
+        """查找每种语言/规格的第一个存在的模型目录"""
+        available = {}
+        for language, config in self.configs.items():
+            for size, paths in config.get("variants", {}).items():
+                path = next((p for p in paths if os.path.isdir(p)), None)
+                if path:
+                    available.setdefault(language, {})[size] = path
+            if language not in available:
+                logger.warning(f"未找到 {config.get('name', language)}，请下载并放置在指定目录")
+        return available
+
+    def _size_order(self, size: Optional[str]) -> List[str]:
+        first = size if size in MODEL_SIZES else self.preferred_size
+        return [first] + [s for s in MODEL_SIZES if s != first]
+
+    def resolve(self, language: str, size: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """返回将要使用的 (规格, 路径)，优先请求的规格；不加载模型"""
+        variants = self._available.get(language, {})
+        for candidate in self._size_order(size):
+            if candidate in variants and (language, candidate) not in self._failed:
+                return candidate, variants[candidate]
+        return None
+
+    def is_available(self, language: str) -> bool:
+        return self.resolve(language) is not None
+
+    def get(self, language: str, size: Optional[str] = None):
+        """获取模型，未加载时加载；不可用时返回 None"""
+        resolved = self.resolve(language, size)
+        if resolved is None:
+            return None
+        key = (language, resolved[0])
+
+        with self._lock:
+            entry = self._loaded.get(key)
+            if entry is not None:
+                self._loaded.move_to_end(key)
+                return entry.model
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # 同一模型只加载一次，不同模型可并行加载
+        with key_lock:
+            with self._lock:
+                entry = self._loaded.get(key)
+                if entry is not None:
+                    self._loaded.move_to_end(key)
+                    return entry.model
+            return self._load(key, resolved[1])
+
+    def _load(self, key: Tuple[str, str], path: str):
+        size_bytes = _directory_size(path)
+        self._make_room(size_bytes, keep=key)
+
+        t0 = time.perf_counter()
+        try:
+            model = self.loader(path)
+        except Exception as e:
+            logger.error(f"Vosk {key[0]} ({key[1]}) 模型初始化失败: {e}")
+            self._failed[key] = str(e)
+            return None
+        entry = _LoadedModel(model, path, size_bytes, time.perf_counter() - t0)
+        logger.info(f"Vosk {key[0]} ({key[1]}) 模型加载成功: {path}，"
+                    f"约 {size_bytes / 1024 / 1024:.0f}MB，耗时 {entry.load_seconds:.1f}s")
+
+        with self._lock:
+            self._loaded[key] = entry
+            self._loaded.move_to_end(key)
+        return model
+
+    def _make_room(self, incoming_bytes: int, keep: Tuple[str, str]):
+        """按 LRU 卸载模型直到放得下新模型（单个模型超出预算时仍会加载）"""
+        evicted = []
+        with self._lock:
+            used = sum(e.size_bytes for e in self._loaded.values())
+            for key in list(self._loaded):
+                if used + incoming_bytes <= self.memory_budget_bytes:
+                    break
+                if key == keep:
+                    continue
+                used -= self._loaded.pop(key).size_bytes
+                evicted.append(key)
+        for language, size in evicted:
+            logger.info(f"内存预算不足，卸载 Vosk {language} ({size}) 模型")
+            if self.on_evict:
+                self.on_evict(language, size)
+
+    def preload(self, languages: List[str]):
+        for language in languages:
+            if self.get(language) is None:
+                logger.warning(f"预加载失败，语言 {language} 的模型不可用")
+
+    def loaded_languages(self) -> List[str]:
+        with self._lock:
+            return sorted({language for language, _ in self._loaded})
+
+    def available_languages(self) -> List[str]:
+        return [language for language in self.configs if self.is_available(language)]
+
+    def status(self) -> Dict:
+        """已加载/可用模型状态（不触发加载）"""
+        with self._lock:
+            loaded = {f"{language}/{size}": {
+                "path": e.path,
+                "size_mb": round(e.size_bytes / 1024 / 1024, 1),
+                "load_seconds": round(e.load_seconds, 2)
+            } for (language, size), e in self._loaded.items()}
+            used = sum(e.size_bytes for e in self._loaded.values())
+        return {
+            "preferred_size": self.preferred_size,
+            "memory_budget_mb": round(self.memory_budget_bytes / 1024 / 1024, 1),
+            "memory_used_mb": round(used / 1024 / 1024, 1),
+            "loaded": loaded,
+            "available": self._available,
+            "failed": {f"{language}/{size}": error for (language, size), error in self._failed.items()}
+        }
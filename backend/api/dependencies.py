@@ -3,20 +3,14 @@ from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
-import pyodbc
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+from db_access import DatabaseTimeout, run_blocking
+from db_pool import PoolTimeout, get_connection
+from user_cache import user_cache
 
-# 数据库配置  database-1.c12mwksy0ewr.me-central-1.rds.amazonaws.com,1433
-DATABASE_CONFIG = {
-    'server': os.getenv('DB_SERVER', ''),
-    'database': os.getenv('DB_NAME', ''),
-    'username': os.getenv('DB_USERNAME', ''),
-    'password': os.getenv('DB_PASSWORD', ''),
-    'driver': os.getenv('DB_DRIVER', '')
-}
+load_dotenv()
 
 # JWT配置
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
@@ -26,14 +20,21 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 
 def get_db_connection():
-    conn_str = f"""
-        DRIVER={DATABASE_CONFIG['driver']};
-        SERVER={DATABASE_CONFIG['server']};
-        DATABASE={DATABASE_CONFIG['database']};
-        UID={DATABASE_CONFIG['username']};
-        PWD={DATABASE_CONFIG['password']};
-    """
-    return pyodbc.connect(conn_str)
+    """从共享连接池借出连接，conn.close() 时归还"""
+    try:
+        return get_connection()
+    except PoolTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="数据库繁忙，请稍后重试"
+        )
+
+async def run_db(fn, *args, **kwargs):
+    """在数据库线程池中执行阻塞的数据库代码，避免阻塞事件循环"""
+    try:
+        return await run_blocking(fn, *args, **kwargs)
+    except DatabaseTimeout as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
@@ -54,6 +55,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except jwt.InvalidTokenError:
         raise credentials_exception
     
+    # 缓存命中（或信任令牌中的用户信息）时不查库
+    user = user_cache.lookup(payload)
+    if user is None:
+        generation = user_cache.generation(username)
+        user = await run_db(_find_user, username)
+        if user is None:
+            raise credentials_exception
+        user_cache.put(payload, user, generation)
+    return user
+
+def _find_user(username: str):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
@@ -62,8 +74,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             FROM Users WHERE Username = ?
         """, username)
         user = cursor.fetchone()
-        if user is None:
-            raise credentials_exception
+        if user is None or not user.IsActive:
+            return None
         return {
             "user_id": user.UserID,
             "username": user.Username,
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from typing import List, Optional
-from .dependencies import get_db_connection, get_current_user
+from .dependencies import get_db_connection, get_current_user, run_db
 from .models import JointROMCreate, JointROMUpdate, JointROMResponse
+from pagination import clamp_limit, decode_cursor, keyset_condition, make_page, order_by, set_next_cursor, top_rows
+from response_cache import response_cache
 
 import logging
 
@@ -11,25 +13,40 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/joint-rom", tags=["关节活动度管理"])
 
+JOINT_ROM_ORDER = [("RecordDate", "DESC"), ("RecordID", "DESC")]
+
 @router.get("/{patient_id}", response_model=List[JointROMResponse])
-async def get_joint_rom_records(patient_id: int, current_user: dict = Depends(get_current_user)):
-    """获取患者的关节活动度记录"""
+async def get_joint_rom_records(
+    patient_id: int,
+    response: Response,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """获取患者的关节活动度记录（按记录日期倒序，键集分页）"""
+    records, next_cursor = await run_db(_get_joint_rom_records, patient_id, clamp_limit(limit), after)
+    set_next_cursor(response, next_cursor)
+    return records
+
+def _get_joint_rom_records(patient_id: int, limit: int, after: Optional[str]):
+    condition, params = keyset_condition(JOINT_ROM_ORDER, decode_cursor(after, len(JOINT_ROM_ORDER)))
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        cursor.execute("""
-            SELECT RecordID, PatientID, RecordDate, LeftHip, RightHip,
+        cursor.execute(f"""
+            SELECT TOP (?) RecordID, PatientID, RecordDate, LeftHip, RightHip,
                    LeftKnee, RightKnee, LeftAnkle, RightAnkle, CreatedAt,
                    LeftHipChange, RightHipChange, LeftKneeChange, RightKneeChange,
                    LeftAnkleChange, RightAnkleChange
             FROM JointMobilityRecords 
-            WHERE PatientID = ?
-            ORDER BY RecordDate DESC
-        """, patient_id)
+            WHERE PatientID = ? AND {condition}
+            ORDER BY {order_by(JOINT_ROM_ORDER)}
+        """, top_rows(limit), patient_id, *params)
         
+        page = make_page(cursor.fetchall(), limit, lambda row: (row.RecordDate, row.RecordID))
         records = []
-        for row in cursor.fetchall():
+        for row in page.rows:
             records.append({
                 "id": row.RecordID,
                 "patient_id": row.PatientID,
@@ -49,7 +66,7 @@ async def get_joint_rom_records(patient_id: int, current_user: dict = Depends(ge
                 "created_at": row.CreatedAt.strftime("%Y-%m-%d %H:%M:%S") if row.CreatedAt else None
             })
         
-        return records
+        return records, page.next_cursor
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取关节活动度记录失败: {str(e)}")
     finally:
@@ -62,6 +79,9 @@ async def create_joint_rom_record(
     current_user: dict = Depends(get_current_user)
 ):
     """创建新的关节活动度记录"""
+    return await run_db(_create_joint_rom_record, record, current_user)
+
+def _create_joint_rom_record(record: JointROMCreate, current_user: dict):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -103,6 +123,7 @@ async def create_joint_rom_record(
         
         new_record = cursor.fetchone()
         conn.commit()
+        response_cache.invalidate()
         
         if not new_record:
             logger.error("插入成功但无法获取新记录")
@@ -163,6 +184,9 @@ async def update_joint_rom_record(
     current_user: dict = Depends(get_current_user)
 ):
     """更新关节活动度记录"""
+    return await run_db(_update_joint_rom_record, record_id, record)
+
+def _update_joint_rom_record(record_id: int, record: JointROMUpdate):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -226,6 +250,7 @@ async def update_joint_rom_record(
         cursor.execute(query, params)
         
         conn.commit()
+        response_cache.invalidate()
         
         # 获取更新后的记录
         cursor.execute("""
@@ -268,6 +293,9 @@ async def update_joint_rom_record(
 @router.delete("/{record_id}")
 async def delete_joint_rom_record(record_id: int, current_user: dict = Depends(get_current_user)):
     """删除关节活动度记录"""
+    return await run_db(_delete_joint_rom_record, record_id)
+
+def _delete_joint_rom_record(record_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -278,6 +306,7 @@ async def delete_joint_rom_record(record_id: int, current_user: dict = Depends(g
             raise HTTPException(status_code=404, detail="关节活动度记录不存在")
         
         conn.commit()
+        response_cache.invalidate()
         return {"message": "关节活动度记录删除成功"}
         
     except Exception as e:
@@ -290,6 +319,9 @@ async def delete_joint_rom_record(record_id: int, current_user: dict = Depends(g
 @router.get("/{patient_id}/trend")
 async def get_joint_rom_trend(patient_id: int, current_user: dict = Depends(get_current_user)):
     """获取关节活动度趋势数据"""
+    return await run_db(_get_joint_rom_trend, patient_id)
+
+def _get_joint_rom_trend(patient_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     
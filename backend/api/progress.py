@@ -1,11 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from typing import List, Optional
-from .dependencies import get_db_connection, get_current_user
+from .dependencies import get_db_connection, get_current_user, run_db
 from .models import (
     RehabilitationProgressCreate, 
     RehabilitationProgressUpdate, 
     RehabilitationProgressResponse
 )
+from pagination import clamp_limit, decode_cursor, keyset_condition, make_page, order_by, set_next_cursor, top_rows
+from response_cache import response_cache
 import logging
 
 # 设置日志
@@ -14,24 +16,39 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/rehabilitation-progress", tags=["康复进度管理"])
 
+PROGRESS_ORDER = [("WeekNumber", "DESC"), ("ProgressID", "DESC")]
+
 @router.get("/{patient_id}", response_model=List[RehabilitationProgressResponse])
-async def get_rehabilitation_progress(patient_id: int, current_user: dict = Depends(get_current_user)):
-    """获取患者的康复进度记录"""
+async def get_rehabilitation_progress(
+    patient_id: int,
+    response: Response,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """获取患者的康复进度记录（按周次倒序，键集分页）"""
+    records, next_cursor = await run_db(_get_rehabilitation_progress, patient_id, clamp_limit(limit), after)
+    set_next_cursor(response, next_cursor)
+    return records
+
+def _get_rehabilitation_progress(patient_id: int, limit: int, after: Optional[str]):
+    condition, params = keyset_condition(PROGRESS_ORDER, decode_cursor(after, len(PROGRESS_ORDER)))
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        cursor.execute("""
-            SELECT ProgressID, PatientID, RecordDate, WeekNumber, OverallProgress,
+        cursor.execute(f"""
+            SELECT TOP (?) ProgressID, PatientID, RecordDate, WeekNumber, OverallProgress,
                    JointMobilityProgress, MuscleStrengthProgress, BalanceAbilityProgress,
                    TrainingDuration, TrainingSteps, PerformanceScore, Notes, CreatedAt
             FROM RehabilitationProgress 
-            WHERE PatientID = ?
-            ORDER BY WeekNumber DESC
-        """, patient_id)
+            WHERE PatientID = ? AND {condition}
+            ORDER BY {order_by(PROGRESS_ORDER)}
+        """, top_rows(limit), patient_id, *params)
         
+        page = make_page(cursor.fetchall(), limit, lambda row: (row.WeekNumber, row.ProgressID))
         progress_records = []
-        for row in cursor.fetchall():
+        for row in page.rows:
             progress_records.append({
                 "id": row.ProgressID,
                 "patient_id": row.PatientID,
@@ -48,7 +65,7 @@ async def get_rehabilitation_progress(patient_id: int, current_user: dict = Depe
                 "created_at": row.CreatedAt.strftime("%Y-%m-%d %H:%M:%S") if row.CreatedAt else None
             })
         
-        return progress_records
+        return progress_records, page.next_cursor
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取康复进度记录失败: {str(e)}")
     finally:
@@ -61,6 +78,9 @@ async def create_rehabilitation_progress(
     current_user: dict = Depends(get_current_user)
 ):
     """创建新的康复进度记录"""
+    return await run_db(_create_rehabilitation_progress, progress, current_user)
+
+def _create_rehabilitation_progress(progress: RehabilitationProgressCreate, current_user: dict):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -101,6 +121,7 @@ async def create_rehabilitation_progress(
         
         new_progress = cursor.fetchone()
         conn.commit()
+        response_cache.invalidate()
         
         if not new_progress:
             logger.error("插入成功但无法获取新记录")
@@ -158,6 +179,9 @@ async def update_rehabilitation_progress(
     current_user: dict = Depends(get_current_user)
 ):
     """更新康复进度记录"""
+    return await run_db(_update_rehabilitation_progress, progress_id, progress)
+
+def _update_rehabilitation_progress(progress_id: int, progress: RehabilitationProgressUpdate):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -212,6 +236,7 @@ async def update_rehabilitation_progress(
         cursor.execute(query, params)
         
         conn.commit()
+        response_cache.invalidate()
         
         # 获取更新后的记录
         cursor.execute("""
@@ -250,6 +275,9 @@ async def update_rehabilitation_progress(
 @router.delete("/{progress_id}")
 async def delete_rehabilitation_progress(progress_id: int, current_user: dict = Depends(get_current_user)):
     """删除康复进度记录"""
+    return await run_db(_delete_rehabilitation_progress, progress_id)
+
+def _delete_rehabilitation_progress(progress_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -260,6 +288,7 @@ async def delete_rehabilitation_progress(progress_id: int, current_user: dict =
             raise HTTPException(status_code=404, detail="康复进度记录不存在")
         
         conn.commit()
+        response_cache.invalidate()
         return {"message": "康复进度记录删除成功"}
         
     except Exception as e:
@@ -272,6 +301,9 @@ async def delete_rehabilitation_progress(progress_id: int, current_user: dict =
 @router.get("/{patient_id}/statistics")
 async def get_progress_statistics(patient_id: int, current_user: dict = Depends(get_current_user)):
     """获取康复进度统计信息"""
+    return await run_db(_get_progress_statistics, patient_id)
+
+def _get_progress_statistics(patient_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 import json
-from .dependencies import get_db_connection, get_current_user
+from .dependencies import get_db_connection, get_current_user, run_db
 from .models import (
     RehabilitationStageCreate, 
     RehabilitationStageUpdate, 
     RehabilitationStageResponse
 )
+from patient_list import refresh_patient_list, refresh_patient_list_for_stage
+from response_cache import response_cache
 import logging
 
 # 设置日志
@@ -18,6 +20,9 @@ router = APIRouter(prefix="/api/rehabilitation-stages", tags=["康复阶段管
 @router.get("/{patient_id}", response_model=List[RehabilitationStageResponse])
 async def get_rehabilitation_stages(patient_id: int, current_user: dict = Depends(get_current_user)):
     """获取患者的康复阶段列表"""
+    return await run_db(_get_rehabilitation_stages, patient_id)
+
+def _get_rehabilitation_stages(patient_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -64,6 +69,9 @@ async def create_rehabilitation_stage(
     current_user: dict = Depends(get_current_user)
 ):
     """创建新的康复阶段"""
+    return await run_db(_create_rehabilitation_stage, stage, current_user)
+
+def _create_rehabilitation_stage(stage: RehabilitationStageCreate, current_user: dict):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -103,7 +111,9 @@ async def create_rehabilitation_stage(
         )
         
         new_stage = cursor.fetchone()
+        refresh_patient_list(cursor, stage.patient_id)
         conn.commit()
+        response_cache.invalidate()
         
         if not new_stage:
             logger.error("插入成功但无法获取新记录")
@@ -175,6 +185,9 @@ async def update_rehabilitation_stage(
     current_user: dict = Depends(get_current_user)
 ):
     """更新康复阶段信息"""
+    return await run_db(_update_rehabilitation_stage, stage_id, stage)
+
+def _update_rehabilitation_stage(stage_id: int, stage: RehabilitationStageUpdate):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -233,8 +246,10 @@ async def update_rehabilitation_stage(
         
         query = f"UPDATE RehabilitationStages SET {', '.join(update_fields)} WHERE StageID = ?"
         cursor.execute(query, params)
+        refresh_patient_list_for_stage(cursor, stage_id)
         
         conn.commit()
+        response_cache.invalidate()
         
         # 获取更新后的阶段信息
         cursor.execute("""
@@ -275,6 +290,9 @@ async def update_rehabilitation_stage(
 @router.delete("/{stage_id}")
 async def delete_rehabilitation_stage(stage_id: int, current_user: dict = Depends(get_current_user)):
     """删除康复阶段"""
+    return await run_db(_delete_rehabilitation_stage, stage_id)
+
+def _delete_rehabilitation_stage(stage_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -284,7 +302,9 @@ async def delete_rehabilitation_stage(stage_id: int, current_user: dict = Depend
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="康复阶段不存在")
         
+        refresh_patient_list_for_stage(cursor, stage_id)
         conn.commit()
+        response_cache.invalidate()
         return {"message": "康复阶段删除成功"}
         
     except Exception as e:
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
-from .dependencies import get_db_connection, get_current_user
+from .dependencies import get_db_connection, get_current_user, run_db
 from .models import (
     TrainingPlanCreate, 
     TrainingPlanUpdate, 
     TrainingPlanResponse
 )
+from response_cache import response_cache
 import logging
 
 # 设置日志
@@ -17,6 +18,9 @@ router = APIRouter(prefix="/api/training-plans", tags=["训练计划管理"])
 @router.get("/{patient_id}", response_model=List[TrainingPlanResponse])
 async def get_training_plans(patient_id: int, current_user: dict = Depends(get_current_user)):
     """获取患者的训练计划"""
+    return await run_db(_get_training_plans, patient_id)
+
+def _get_training_plans(patient_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -84,6 +88,9 @@ async def create_training_plan(
     current_user: dict = Depends(get_current_user)
 ):
     """创建新的训练计划"""
+    return await run_db(_create_training_plan, plan, current_user)
+
+def _create_training_plan(plan: TrainingPlanCreate, current_user: dict):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -135,6 +142,7 @@ async def create_training_plan(
         
         new_plan = cursor.fetchone()
         conn.commit()
+        response_cache.invalidate()
         
         if not new_plan:
             logger.error("插入成功但无法获取新记录")
@@ -211,6 +219,9 @@ async def update_training_plan(
     current_user: dict = Depends(get_current_user)
 ):
     """更新训练计划"""
+    return await run_db(_update_training_plan, plan_id, plan)
+
+def _update_training_plan(plan_id: int, plan: TrainingPlanUpdate):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -288,6 +299,7 @@ async def update_training_plan(
         cursor.execute(query, params)
         
         conn.commit()
+        response_cache.invalidate()
         
         # 获取更新后的计划
         cursor.execute("""
@@ -346,6 +358,9 @@ async def update_training_plan(
 @router.delete("/{plan_id}")
 async def delete_training_plan(plan_id: int, current_user: dict = Depends(get_current_user)):
     """删除训练计划"""
+    return await run_db(_delete_training_plan, plan_id)
+
+def _delete_training_plan(plan_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -356,6 +371,7 @@ async def delete_training_plan(plan_id: int, current_user: dict = Depends(get_cu
             raise HTTPException(status_code=404, detail="训练计划不存在")
         
         conn.commit()
+        response_cache.invalidate()
         return {"message": "训练计划删除成功"}
         
     except Exception as e:
@@ -368,6 +384,9 @@ async def delete_training_plan(plan_id: int, current_user: dict = Depends(get_cu
 @router.get("/{patient_id}/statistics")
 async def get_training_plan_statistics(patient_id: int, current_user: dict = Depends(get_current_user)):
     """获取训练计划统计信息"""
+    return await run_db(_get_training_plan_statistics, patient_id)
+
+def _get_training_plan_statistics(patient_id: int):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -0,0 +1,75 @@
+"""
+声学特征提取基准：librosa 分别计算 rms / zero_crossing_rate / spectral_centroid
+与 acoustic_features.extract_acoustic_features（一次分帧、一次幅度谱）的耗时与数值差异。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_acoustic_features.py --seconds 5 --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "aphasia"))
+
+import numpy as np  # noqa: E402
+
+from acoustic_features import extract_acoustic_features  # noqa: E402
+
+SR = 16000
+
+
+def synth_speech(seconds: float, rng) -> np.ndarray:
+    """合成类语音信号：浊音音节 + 停顿 + 少量噪声"""
+    t = np.arange(int(seconds * SR)) / SR
+    f0 = 130 + 15 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SR
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.3 * t) > -0.5)
+    return (0.2 * voiced * syllables + 0.005 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def librosa_features(y):
+    import librosa
+
+    return {
+        "rms": float(np.mean(librosa.feature.rms(y=y))),
+        "zero_crossing_rate": float(np.mean(librosa.feature.zero_crossing_rate(y))),
+        "spectral_centroid": float(np.mean(librosa.feature.spectral_centroid(y=y, sr=SR))),
+    }
+
+
+def timed(fn, y, repeat):
+    fn(y)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(y)
+    return result, (time.perf_counter() - t0) / repeat * 1000
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    y = synth_speech(args.seconds, np.random.default_rng(args.seed))
+    reference, librosa_ms = timed(librosa_features, y, args.repeat)
+    features, vectorized_ms = timed(lambda v: extract_acoustic_features(v, SR), y, args.repeat)
+
+    print(json.dumps({
+        "config": vars(args),
+        "librosa_ms": librosa_ms,
+        "vectorized_ms": vectorized_ms,
+        "speedup": librosa_ms / vectorized_ms,
+        "relative_diff": {k: abs(features[k] - v) / abs(v) if v else abs(features[k])
+                          for k, v in reference.items()},
+        "features": features,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,83 @@
+"""
+文本对齐基准：difflib.SequenceMatcher 与 text_alignment.align_texts 在长参考文本上的耗时。
+
+参考文本由常用汉字/英文单词随机拼成，识别文本在其上随机加入替换、漏读和多读。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_alignment.py --lengths 20,100,500,1000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from difflib import SequenceMatcher
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "aphasia"))
+
+import numpy as np  # noqa: E402
+
+from text_alignment import PYPINYIN_AVAILABLE, align_texts  # noqa: E402
+
+ZH_CHARS = "你好谢再见请坐对不起爸妈水饭车吃喝早上晚安今天明天我们他她是的有在和人中大小多少"
+EN_WORDS = ["hello", "world", "water", "thank", "you", "please", "sorry", "good", "morning", "how", "are"]
+
+
+def corrupt(tokens, rng, rate: float, vocabulary):
+    out = []
+    for token in tokens:
+        r = rng.random()
+        if r < rate / 3:
+            continue  # 漏读
+        if r < 2 * rate / 3:
+            out.append(vocabulary[rng.integers(len(vocabulary))])  # 替换
+            continue
+        out.append(token)
+        if r < rate:
+            out.append(vocabulary[rng.integers(len(vocabulary))])  # 多读
+    return out
+
+
+def timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - t0) / repeat * 1000
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", default="20,100,500,1000")
+    parser.add_argument("--error-rate", type=float, default=0.15)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = {"config": vars(args), "pypinyin_available": PYPINYIN_AVAILABLE, "cases": []}
+    for length in (int(x) for x in args.lengths.split(",")):
+        zh_ref = [ZH_CHARS[i] for i in rng.integers(len(ZH_CHARS), size=length)]
+        en_ref = [EN_WORDS[i] for i in rng.integers(len(EN_WORDS), size=max(1, length // 5))]
+        cases = {
+            "zh-CN": ("".join(zh_ref), "".join(corrupt(zh_ref, rng, args.error_rate, ZH_CHARS))),
+            "en-US": (" ".join(en_ref), " ".join(corrupt(en_ref, rng, args.error_rate, EN_WORDS))),
+        }
+        for language, (reference, hypothesis) in cases.items():
+            ratio, difflib_ms = timed(lambda: SequenceMatcher(None, hypothesis, reference).ratio(), args.repeat)
+            alignment, align_ms = timed(lambda: align_texts(hypothesis, reference, language), args.repeat)
+            results["cases"].append({
+                "language": language,
+                "reference_chars": len(reference),
+                "difflib_ms": difflib_ms,
+                "align_ms": align_ms,
+                "difflib_ratio": ratio,
+                "aligned_similarity": alignment.similarity,
+                "errors": len(alignment.errors),
+            })
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main_cli()
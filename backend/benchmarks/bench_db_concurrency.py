@@ -0,0 +1,189 @@
+"""
+数据访问层并发基准：以本地 SQLite 文件库代替 SQL Server，对比
+- inline: 在 async 路由中直接执行阻塞查询（旧写法，查询期间事件循环停顿）
+- threaded: 通过 db_access.ThreadedDatabase 在有界线程池中执行
+
+同时运行一个每 5ms 醒来一次的心跳协程（代表 /predict 等不访问数据库的请求），
+报告查询吞吐、单次查询延迟和事件循环停顿（心跳实际间隔超出 5ms 的部分），
+并验证语句超时能中止慢查询。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_db_concurrency.py --rows 200000 --requests 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from db_access import DatabaseTimeout, ThreadedDatabase  # noqa: E402
+from db_pool import ConnectionPool, DatabaseDriver, query_timeout  # noqa: E402
+
+HEARTBEAT_SECONDS = 0.005
+# 每执行这么多条 SQLite 虚拟机指令检查一次是否超时
+PROGRESS_STEPS = 10000
+
+SLOW_QUERY = """
+    SELECT COUNT(*), AVG(Duration), SUM(Steps)
+    FROM TrainingRecords
+    WHERE PatientID % ? = 0 AND Notes LIKE ?
+"""
+
+
+class SqliteDriver(DatabaseDriver):
+    """本地替身：语句超时用 progress handler 实现"""
+    errors = (sqlite3.Error,)
+    disconnect_errors = ()
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def set_query_timeout(self, conn, seconds: float):
+        if seconds <= 0:
+            conn.set_progress_handler(None, 0)
+            return
+        deadline = time.monotonic() + seconds
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+
+
+def create_database(path: str, rows: int):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE TrainingRecords (
+            RecordID INTEGER PRIMARY KEY, PatientID INTEGER, TrainingDate TEXT,
+            Duration INTEGER, Steps INTEGER, Notes TEXT
+        )
+    """)
+    rng = random.Random(0)
+    conn.executemany(
+        "INSERT INTO TrainingRecords (PatientID, TrainingDate, Duration, Steps, Notes) VALUES (?, ?, ?, ?, ?)",
+        ((rng.randint(1, 5000), f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+          rng.randint(10, 90), rng.randint(100, 5000), f"note {rng.random():.6f}") for _ in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def slow_query(pool: ConnectionPool, modulus: int):
+    conn = pool.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(SLOW_QUERY, (modulus, "%9%"))
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+def percentiles(values):
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": round(pick(0.5) * 1000, 2), "p95": round(pick(0.95) * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2)}
+
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        lags.append(max(0.0, time.perf_counter() - t0 - HEARTBEAT_SECONDS))
+
+
+async def run_mode(mode: str, pool: ConnectionPool, database: ThreadedDatabase,
+                   requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags = [], []
+    stop = asyncio.Event()
+
+    async def one(i):
+        async with semaphore:
+            t0 = time.perf_counter()
+            if mode == "inline":
+                slow_query(pool, 1 + i % 3)
+            else:
+                await database.run(slow_query, pool, 1 + i % 3)
+            latencies.append(time.perf_counter() - t0)
+
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await beat
+    return {
+        "requests": requests,
+        "seconds": round(elapsed, 3),
+        "queries_per_second": round(requests / elapsed, 1),
+        "latency_ms": percentiles(latencies),
+        "event_loop_lag_ms": percentiles(lags),
+    }
+
+
+async def check_timeout(pool: ConnectionPool, database: ThreadedDatabase, seconds: float):
+    """超时远小于单次查询耗时时，应由驱动中止并抛出异常"""
+    t0 = time.perf_counter()
+    try:
+        await database.run(slow_query, pool, 1, timeout=seconds)
+        outcome = "completed"
+    except DatabaseTimeout:
+        outcome = "asyncio_timeout"
+    except sqlite3.OperationalError as e:
+        outcome = f"aborted_by_driver: {e}"
+    return {"timeout_seconds": seconds, "outcome": outcome, "elapsed_seconds": round(time.perf_counter() - t0, 3)}
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "standin.db")
+        create_database(path, args.rows)
+        pool = ConnectionPool(SqliteDriver(path), pool_size=args.pool_size, max_overflow=args.max_overflow,
+                              pre_ping=60)
+        database = ThreadedDatabase(pool, timeout=args.query_timeout)
+
+        # 预热：建立连接、加载页缓存
+        with query_timeout(0):
+            single_t0 = time.perf_counter()
+            slow_query(pool, 1)
+            single = time.perf_counter() - single_t0
+
+        report = {
+            "rows": args.rows,
+            "concurrency": args.concurrency,
+            "executor_workers": database.workers,
+            "single_query_ms": round(single * 1000, 2),
+        }
+        for mode in ("inline", "threaded"):
+            report[mode] = await run_mode(mode, pool, database, args.requests, args.concurrency)
+        report["timeout_check"] = await check_timeout(pool, database, max(0.001, single / 10))
+        report["stats"] = database.stats()
+        database.shutdown()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--max-overflow", type=int, default=4)
+    parser.add_argument("--query-timeout", type=float, default=30.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
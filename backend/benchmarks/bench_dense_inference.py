@@ -0,0 +1,89 @@
+"""
+NumPy Dense 推理（model_store.DenseNumpyModel）与 Keras model.predict 的一致性校验与性能对比。
+
+用 create_feature_based_model / create_robot_model 构建两类模型，保存为 .h5 后经
+read_dense_layers + pack_dense_layers 打包，在多个批大小下比较输出差异与每行耗时。
+任一批次最大绝对误差超过 --atol 时以非零状态码退出，可作为一致性检查使用。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_dense_inference.py
+    python backend/benchmarks/bench_dense_inference.py --batch-sizes 1,32,4096,5000 --repeat 50
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def time_per_row_us(fn, x, repeat: int) -> float:
+    fn(x)  # 预热
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(x)
+    return (time.perf_counter() - t0) / repeat / len(x) * 1e6
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", default="1,8,64,512,4096,5000")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keras-repeat", type=int, default=3)
+    parser.add_argument("--atol", type=float, default=1e-5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="rehab_dense_")
+    os.chdir(workdir)  # main.py 的相对路径全部落在临时目录
+
+    import numpy as np
+    import main
+    from model_store import DenseNumpyModel, pack_dense_layers, read_dense_layers
+
+    rng = np.random.default_rng(args.seed)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b.strip()]
+    specs = {
+        "upper_limb": main.create_feature_based_model(input_dim=128),
+        "lower_limb": main.robot_processor.create_robot_model(input_dim=128, num_classes=3),
+    }
+
+    results = {"config": vars(args), "models": {}}
+    parity_ok = True
+    for name, keras_model in specs.items():
+        h5_path = os.path.join(workdir, f"{name}.h5")
+        keras_model.save(h5_path)
+        packed_path = os.path.join(workdir, f"{name}.bin")
+        pack_dense_layers(read_dense_layers(h5_path), packed_path)
+        dense_model = DenseNumpyModel(packed_path)
+
+        input_dim = keras_model.input_shape[1]
+        rows = []
+        for batch in batch_sizes:
+            x = rng.standard_normal((batch, input_dim)).astype(np.float32)
+            expected = keras_model.predict(x, verbose=0)
+            actual = dense_model.predict(x)
+            max_abs_diff = float(np.max(np.abs(expected - actual)))
+            argmax_match = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+            parity_ok &= max_abs_diff <= args.atol
+
+            rows.append({
+                "batch_size": batch,
+                "max_abs_diff": max_abs_diff,
+                "argmax_agreement": argmax_match,
+                "numpy_us_per_row": time_per_row_us(dense_model.predict, x, args.repeat),
+                "keras_us_per_row": time_per_row_us(
+                    lambda v: keras_model.predict(v, verbose=0), x, args.keras_repeat),
+            })
+        results["models"][name] = rows
+
+    results["parity_ok"] = parity_ok
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    sys.exit(0 if parity_ok else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,230 @@
+"""
+月度训练统计基准：原实现（YEAR()/MONTH() 过滤，记录与统计各查一次）与
+training_stats 的半开区间 + (PatientID, TrainingDate) 复合索引 + 单次查询对比。
+
+以本地 SQLite 文件库代替 SQL Server，默认生成 100 万条训练记录：
+- original:         仅有 PatientID 索引，按 CAST(strftime(...)) 过滤（等价于 YEAR()/MONTH()），两次查询
+- original+index:   同样的查询，但已建复合索引（函数过滤无法利用 TrainingDate 列）
+- range:            training_stats.fetch_monthly_training（与线上代码相同的 SQL 与汇总逻辑）
+两种实现的输出逐字段比对（原查询对同一时间的记录没有确定顺序，这部分按集合比较），并打印各自的查询计划。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_monthly_training.py --records 1000000 --patients 1000 --requests 500
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from training_stats import MONTHLY_RECORDS_SQL, fetch_monthly_training, month_range  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE TrainingRecords (
+    RecordID INTEGER PRIMARY KEY, PatientID INTEGER, TrainingDate TIMESTAMP, Duration INTEGER, Steps INTEGER,
+    PerformanceScore INTEGER, ExerciseType TEXT, Notes TEXT
+);
+CREATE INDEX IX_TrainingRecords_PatientID ON TrainingRecords (PatientID);
+"""
+
+# SQLite 没有 INCLUDE，被覆盖的列直接放在键尾部
+COMPOSITE_INDEX = """
+CREATE INDEX IX_TrainingRecords_PatientID_TrainingDate
+    ON TrainingRecords (PatientID, TrainingDate, Duration, Steps, PerformanceScore, ExerciseType)
+"""
+
+# 原实现的两条查询（SQLite 方言）
+ORIGINAL_RECORDS_SQL = """
+    SELECT TrainingDate, ExerciseType as TrainingContent, Duration, Steps,
+           CASE
+             WHEN PerformanceScore >= 80 THEN 'completed'
+             WHEN PerformanceScore >= 60 THEN 'partial'
+             ELSE 'pending'
+           END as CompletionStatus
+    FROM TrainingRecords
+    WHERE PatientID = ?
+      AND CAST(strftime('%Y', TrainingDate) AS INTEGER) = ?
+      AND CAST(strftime('%m', TrainingDate) AS INTEGER) = ?
+    ORDER BY TrainingDate DESC
+"""
+ORIGINAL_STATS_SQL = """
+    SELECT COUNT(*) as TrainingCount, SUM(Duration) as TotalDuration, SUM(Steps) as TotalSteps,
+           AVG(CASE WHEN PerformanceScore >= 80 THEN 1.0 ELSE 0.0 END) * 100 as CompletionRate
+    FROM TrainingRecords
+    WHERE PatientID = ?
+      AND CAST(strftime('%Y', TrainingDate) AS INTEGER) = ?
+      AND CAST(strftime('%m', TrainingDate) AS INTEGER) = ?
+"""
+
+
+class Row:
+    """模拟 pyodbc.Row 的按列名属性访问"""
+
+    def __init__(self, names, values):
+        self.__dict__.update(zip(names, values))
+
+
+def row_factory(cursor, values):
+    return Row([d[0] for d in cursor.description], values)
+
+
+class StandInCursor:
+    """pyodbc 风格的 execute(sql, *params)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.queries = 0
+        self._cursor = None
+
+    def execute(self, sql: str, *params):
+        self.queries += 1
+        self._cursor = self.conn.execute(sql, params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+
+def original_monthly(cursor: StandInCursor, patient_id: int, year: int, month: int):
+    cursor.execute(ORIGINAL_RECORDS_SQL, patient_id, year, month)
+    training_records = []
+    for record in cursor.fetchall():
+        training_records.append({
+            "training_date": record.TrainingDate.strftime("%Y-%m-%d") if record.TrainingDate else "",
+            "training_content": record.TrainingContent or "康复训练",
+            "duration": record.Duration or 0,
+            "steps": record.Steps or 0,
+            "completion_status": record.CompletionStatus or "pending"
+        })
+
+    cursor.execute(ORIGINAL_STATS_SQL, patient_id, year, month)
+    stats = cursor.fetchone()
+    monthly_stats = {
+        "training_count": stats.TrainingCount or 0,
+        "training_hours": round((stats.TotalDuration or 0) / 60, 1),
+        "total_steps": stats.TotalSteps or 0,
+        "completion_rate": round(stats.CompletionRate or 0, 1)
+    }
+    return training_records, monthly_stats
+
+
+def same_output(expected, actual) -> bool:
+    """统计值相同，记录按日期顺序一致且内容相同"""
+    (expected_records, expected_stats), (actual_records, actual_stats) = expected, actual
+    return (
+        expected_stats == actual_stats
+        and [r["training_date"] for r in expected_records] == [r["training_date"] for r in actual_records]
+        and sorted(map(json.dumps, expected_records)) == sorted(map(json.dumps, actual_records))
+    )
+
+
+def create_database(path: str, patients: int, records: int, days: int):
+    rng = random.Random(0)
+    base = datetime(2024, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    batch = []
+    for i in range(records):
+        batch.append((
+            rng.randint(1, patients), base + timedelta(minutes=rng.randint(0, days * 24 * 60)),
+            rng.randint(10, 90), rng.randint(100, 5000),
+            rng.choice([None] + list(range(40, 101))), rng.choice(["步态训练", "平衡训练", None]), ""
+        ))
+        if len(batch) == 50000 or i == records - 1:
+            conn.executemany(
+                "INSERT INTO TrainingRecords (PatientID, TrainingDate, Duration, Steps, PerformanceScore, "
+                "ExerciseType, Notes) VALUES (?, ?, ?, ?, ?, ?, ?)", batch
+            )
+            batch = []
+    conn.commit()
+    conn.close()
+
+
+def query_plan(conn, sql: str, params) -> list:
+    return [row.detail for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def percentiles(values):
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": round(pick(0.5) * 1000, 3), "p95": round(pick(0.95) * 1000, 3)}
+
+
+def run(conn, fn, requests):
+    cursor = StandInCursor(conn)
+    latencies, results = [], []
+    for patient_id, year, month in requests:
+        t0 = time.perf_counter()
+        results.append(fn(cursor, patient_id, year, month))
+        latencies.append(time.perf_counter() - t0)
+    return {
+        "queries_per_request": cursor.queries / len(requests),
+        "latency_ms": percentiles(latencies),
+    }, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=730, help="记录分布的天数")
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+    sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "standin.db")
+        t0 = time.perf_counter()
+        create_database(path, args.patients, args.records, args.days)
+        build_seconds = time.perf_counter() - t0
+
+        conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = row_factory
+
+        rng = random.Random(1)
+        months = sorted({(d.year, d.month) for d in
+                         (datetime(2024, 1, 1) + timedelta(days=i) for i in range(args.days))})
+        requests = [(rng.randint(1, args.patients), *rng.choice(months)) for _ in range(args.requests)]
+        sample = requests[0]
+
+        report = {"records": args.records, "patients": args.patients, "requests": args.requests,
+                  "build_seconds": round(build_seconds, 1), "results": {}}
+
+        original, expected = run(conn, original_monthly, requests)
+        original["plan"] = query_plan(conn, ORIGINAL_RECORDS_SQL, sample)
+        report["results"]["original"] = original
+
+        conn.execute(COMPOSITE_INDEX)
+        conn.execute("ANALYZE")
+        indexed, _ = run(conn, original_monthly, requests)
+        indexed["plan"] = query_plan(conn, ORIGINAL_RECORDS_SQL, sample)
+        report["results"]["original+index"] = indexed
+
+        ranged, actual = run(conn, fetch_monthly_training, requests)
+        ranged["plan"] = query_plan(conn, MONTHLY_RECORDS_SQL, (sample[0], *month_range(sample[1], sample[2])))
+        report["results"]["range"] = ranged
+
+        report["speedup_p50"] = round(
+            original["latency_ms"]["p50"] / max(ranged["latency_ms"]["p50"], 1e-9), 2)
+        report["identical_output"] = all(same_output(e, a) for e, a in zip(expected, actual))
+        conn.close()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if not report["identical_output"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+患者详情接口的往返次数基准：原实现（每部分一条查询，共 8 次往返）与
+patient_details 的单批次多结果集（1 次往返）对比。
+
+以本地 SQLite 文件库代替 SQL Server：SQLite 不支持多结果集批处理，
+这里用 SQLite 方言写出同样的各部分查询，由 StandInCursor 在一次"往返"内执行完毕并缓存结果，
+再通过 nextset() 交给 patient_details.read_patient_details 读取（与线上读取代码相同）。
+每次往返额外 sleep --rtt-ms 模拟网络延迟，两种方式的输出逐字段比对。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_patient_details.py --patients 200 --records 300 --rtt-ms 0 0.5 2
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from patient_details import (  # noqa: E402
+    PATIENT_DETAIL_RECORDS, PATIENT_DETAIL_SECTIONS, format_patient_info, read_patient_details, read_section
+)
+
+SCHEMA = """
+CREATE TABLE Users (UserID INTEGER PRIMARY KEY, FullName TEXT);
+CREATE TABLE Patients (
+    PatientID INTEGER PRIMARY KEY, PatientCode TEXT, Name TEXT, Age INTEGER, Gender TEXT,
+    RegisterDate TIMESTAMP, DoctorID INTEGER, Department TEXT, MedicalHistory TEXT, Status TEXT
+);
+CREATE TABLE PatientSummary (
+    PatientID INTEGER PRIMARY KEY, TotalTrainingHours REAL, TotalTrainingCount INTEGER, TotalSteps INTEGER,
+    OverallProgress INTEGER, JointMobilityProgress INTEGER, MuscleStrengthProgress INTEGER,
+    BalanceAbilityProgress INTEGER, LastUpdated TIMESTAMP
+);
+CREATE TABLE RehabilitationStages (
+    StageID INTEGER PRIMARY KEY, PatientID INTEGER, StageNumber INTEGER, StageName TEXT, CurrentProgress INTEGER,
+    StartDate TIMESTAMP, EndDate TIMESTAMP, TargetGoals TEXT, WeeksCompleted INTEGER, WeeksRemaining INTEGER,
+    WeeklyFocus TEXT, TrainingIntensity TEXT, NextEvaluationDate TIMESTAMP, Status TEXT
+);
+CREATE TABLE TrainingRecords (
+    RecordID INTEGER PRIMARY KEY, PatientID INTEGER, TrainingDate TIMESTAMP, Duration INTEGER, Steps INTEGER,
+    PerformanceScore INTEGER, ExerciseType TEXT, Notes TEXT
+);
+CREATE TABLE TrainingMonthlyRollup (
+    PatientID INTEGER, MonthStart TEXT, TrainingCount INTEGER, TotalDuration REAL, TotalSteps INTEGER,
+    CompletedCount INTEGER, PartialCount INTEGER, PendingCount INTEGER, PRIMARY KEY (PatientID, MonthStart)
+);
+CREATE TABLE JointMobilityRecords (
+    RecordID INTEGER PRIMARY KEY, PatientID INTEGER, RecordDate TIMESTAMP,
+    LeftHip INTEGER, RightHip INTEGER, LeftKnee INTEGER, RightKnee INTEGER, LeftAnkle INTEGER, RightAnkle INTEGER,
+    LeftHipChange INTEGER, RightHipChange INTEGER, LeftKneeChange INTEGER, RightKneeChange INTEGER,
+    LeftAnkleChange INTEGER, RightAnkleChange INTEGER
+);
+CREATE TABLE DeviceStatus (
+    StatusID INTEGER PRIMARY KEY, PatientID INTEGER, CheckDate TIMESTAMP, MainController TEXT, DriveMotor TEXT,
+    Sensors TEXT, BatteryLevel INTEGER, SelfCheck TEXT
+);
+CREATE TABLE RehabilitationProgress (
+    ProgressID INTEGER PRIMARY KEY, PatientID INTEGER, WeekNumber INTEGER, OverallProgress INTEGER,
+    JointMobilityProgress INTEGER, MuscleStrengthProgress INTEGER, BalanceAbilityProgress INTEGER
+);
+CREATE INDEX IX_TrainingRecords_Patient ON TrainingRecords (PatientID, TrainingDate);
+CREATE INDEX IX_JointMobility_Patient ON JointMobilityRecords (PatientID, RecordDate);
+CREATE INDEX IX_DeviceStatus_Patient ON DeviceStatus (PatientID, CheckDate);
+CREATE INDEX IX_Stages_Patient ON RehabilitationStages (PatientID, Status);
+CREATE INDEX IX_Progress_Patient ON RehabilitationProgress (PatientID, WeekNumber);
+"""
+
+# 与 PATIENT_DETAILS_SQL 各结果集一一对应的 SQLite 方言查询
+PATIENT_QUERY = """
+    SELECT p.*, u.FullName as DoctorName
+    FROM Patients p LEFT JOIN Users u ON p.DoctorID = u.UserID
+    WHERE p.PatientID = ?
+"""
+SECTION_QUERIES = {
+    "patient_summary": """
+        SELECT TotalTrainingHours, TotalTrainingCount, TotalSteps, OverallProgress, JointMobilityProgress,
+               MuscleStrengthProgress, BalanceAbilityProgress, LastUpdated
+        FROM PatientSummary WHERE PatientID = ?
+    """,
+    "training_stats": """
+        SELECT IFNULL(SUM(TrainingCount), 0) as TrainingCount, SUM(TotalDuration) as TotalDuration,
+               SUM(TotalSteps) as TotalSteps
+        FROM TrainingMonthlyRollup WHERE PatientID = ?
+    """,
+    "current_stage": """
+        SELECT StageName, CurrentProgress, StartDate, EndDate, TargetGoals, WeeksCompleted, WeeksRemaining,
+               WeeklyFocus, TrainingIntensity, NextEvaluationDate
+        FROM RehabilitationStages WHERE PatientID = ? AND Status = 'active'
+        ORDER BY StageNumber DESC LIMIT 1
+    """,
+    "joint_mobility": """
+        SELECT LeftHip, RightHip, LeftKnee, RightKnee, LeftAnkle, RightAnkle,
+               LeftHipChange, RightHipChange, LeftKneeChange, RightKneeChange, LeftAnkleChange, RightAnkleChange
+        FROM JointMobilityRecords WHERE PatientID = ? ORDER BY RecordDate DESC LIMIT 1
+    """,
+    "device_status": """
+        SELECT MainController, DriveMotor, Sensors, BatteryLevel, SelfCheck
+        FROM DeviceStatus WHERE PatientID = ? ORDER BY CheckDate DESC LIMIT 1
+    """,
+    "training_records": """
+        SELECT RecordID, TrainingDate, Duration, Steps, PerformanceScore, ExerciseType, Notes
+        FROM TrainingRecords WHERE PatientID = ? ORDER BY TrainingDate DESC, RecordID DESC
+        LIMIT %d
+    """ % (PATIENT_DETAIL_RECORDS + 1),
+    "progress_history": """
+        SELECT WeekNumber, OverallProgress, JointMobilityProgress, MuscleStrengthProgress, BalanceAbilityProgress
+        FROM RehabilitationProgress WHERE PatientID = ? ORDER BY WeekNumber
+    """,
+}
+
+
+class Row:
+    """模拟 pyodbc.Row 的按列名属性访问"""
+
+    def __init__(self, names, values):
+        self.__dict__.update(zip(names, values))
+
+
+def row_factory(cursor, values):
+    return Row([d[0] for d in cursor.description], values)
+
+
+class StandInCursor:
+    """一次往返执行全部查询并缓存结果集，nextset() 切换到下一个"""
+
+    def __init__(self, conn: sqlite3.Connection, rtt: float):
+        self.conn = conn
+        self.rtt = rtt
+        self.round_trips = 0
+        self._results = []
+
+    def execute_batch(self, queries, patient_id: int):
+        self.round_trips += 1
+        time.sleep(self.rtt)
+        self._results = [self.conn.execute(sql, (patient_id,)).fetchall() for sql in queries]
+
+    def execute(self, sql: str, patient_id: int):
+        self.execute_batch([sql], patient_id)
+
+    def fetchone(self):
+        return self._results[0][0] if self._results[0] else None
+
+    def fetchall(self):
+        return self._results[0]
+
+    def nextset(self):
+        self._results = self._results[1:]
+        return bool(self._results)
+
+
+def sequential_details(cursor: StandInCursor, patient_id: int):
+    """原实现：每部分一次 execute"""
+    cursor.execute(PATIENT_QUERY, patient_id)
+    patient = cursor.fetchone()
+    if not patient:
+        return None
+    details = {"patient_info": format_patient_info(patient)}
+    for key, fetch, formatter in PATIENT_DETAIL_SECTIONS:
+        cursor.execute(SECTION_QUERIES[key], patient_id)
+        read_section(cursor, details, key, fetch, formatter)
+    return details
+
+
+def batched_details(cursor: StandInCursor, patient_id: int):
+    queries = [PATIENT_QUERY] + [SECTION_QUERIES[key] for key, _, _ in PATIENT_DETAIL_SECTIONS]
+    cursor.execute_batch(queries, patient_id)
+    return read_patient_details(cursor)
+
+
+def create_database(path: str, patients: int, records: int):
+    rng = random.Random(0)
+    base = datetime(2025, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO Users VALUES (?, ?)", [(i, f"医生{i}") for i in range(1, 11)])
+    for pid in range(1, patients + 1):
+        conn.execute(
+            "INSERT INTO Patients VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'active')",
+            (pid, f"PT2025{pid:04d}", f"患者{pid}", rng.randint(20, 80), rng.choice(["男", "女"]),
+             base + timedelta(days=rng.randint(0, 90)), rng.randint(1, 10), "康复科", "无")
+        )
+        conn.execute(
+            "INSERT INTO PatientSummary VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (pid, rng.uniform(0, 100), records, rng.randint(0, 10 ** 6), rng.randint(0, 100),
+             rng.randint(0, 100), rng.randint(0, 100), rng.randint(0, 100), base)
+        )
+        conn.execute(
+            "INSERT INTO RehabilitationStages (PatientID, StageNumber, StageName, CurrentProgress, StartDate, "
+            "EndDate, TargetGoals, WeeksCompleted, WeeksRemaining, WeeklyFocus, TrainingIntensity, "
+            "NextEvaluationDate, Status) VALUES (?, 1, '恢复期', ?, ?, ?, '行走', 3, 5, '平衡', '中', ?, 'active')",
+            (pid, rng.randint(0, 100), base, base + timedelta(weeks=8), base + timedelta(weeks=4))
+        )
+        conn.executemany(
+            "INSERT INTO TrainingRecords (PatientID, TrainingDate, Duration, Steps, PerformanceScore, "
+            "ExerciseType, Notes) VALUES (?, ?, ?, ?, ?, '步态训练', '')",
+            [(pid, base + timedelta(hours=rng.randint(0, 24 * 180)), rng.randint(10, 90),
+              rng.randint(100, 5000), rng.randint(40, 100)) for _ in range(records)]
+        )
+        conn.executemany(
+            "INSERT INTO JointMobilityRecords (PatientID, RecordDate, LeftHip, RightHip, LeftKnee, RightKnee, "
+            "LeftAnkle, RightAnkle, LeftHipChange, RightHipChange, LeftKneeChange, RightKneeChange, "
+            "LeftAnkleChange, RightAnkleChange) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, 1, 1, 1, 1, 1)",
+            [(pid, base + timedelta(days=d), *[rng.randint(30, 120) for _ in range(6)]) for d in range(10)]
+        )
+        conn.execute(
+            "INSERT INTO DeviceStatus (PatientID, CheckDate, MainController, DriveMotor, Sensors, BatteryLevel, "
+            "SelfCheck) VALUES (?, ?, '正常', '正常', '正常', ?, '通过')", (pid, base, rng.randint(10, 100))
+        )
+        conn.executemany(
+            "INSERT INTO RehabilitationProgress (PatientID, WeekNumber, OverallProgress, JointMobilityProgress, "
+            "MuscleStrengthProgress, BalanceAbilityProgress) VALUES (?, ?, ?, ?, ?, ?)",
+            [(pid, w, *[rng.randint(0, 100) for _ in range(4)]) for w in range(1, 13)]
+        )
+    conn.execute(
+        "INSERT INTO TrainingMonthlyRollup SELECT PatientID, strftime('%Y-%m-01', TrainingDate), COUNT(*), "
+        "SUM(Duration), SUM(Steps), SUM(PerformanceScore >= 80), "
+        "SUM(PerformanceScore >= 60 AND PerformanceScore < 80), SUM(PerformanceScore < 60) "
+        "FROM TrainingRecords GROUP BY PatientID, strftime('%Y-%m-01', TrainingDate)"
+    )
+    conn.commit()
+    conn.close()
+
+
+def percentiles(values):
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": round(pick(0.5) * 1000, 3), "p95": round(pick(0.95) * 1000, 3)}
+
+
+def run(conn, fn, rtt: float, patient_ids):
+    cursor = StandInCursor(conn, rtt)
+    latencies, results = [], []
+    for pid in patient_ids:
+        t0 = time.perf_counter()
+        results.append(fn(cursor, pid))
+        latencies.append(time.perf_counter() - t0)
+    return {
+        "round_trips_per_request": cursor.round_trips / len(patient_ids),
+        "latency_ms": percentiles(latencies),
+    }, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--records", type=int, default=300, help="每个患者的训练记录数")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, nargs="+", default=[0.0, 0.5, 2.0])
+    args = parser.parse_args()
+
+    sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "standin.db")
+        create_database(path, args.patients, args.records)
+        conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = row_factory
+
+        rng = random.Random(1)
+        patient_ids = [rng.randint(1, args.patients) for _ in range(args.requests)]
+        report = {"patients": args.patients, "records_per_patient": args.records, "results": []}
+        for rtt_ms in args.rtt_ms:
+            sequential, expected = run(conn, sequential_details, rtt_ms / 1000, patient_ids)
+            batched, actual = run(conn, batched_details, rtt_ms / 1000, patient_ids)
+            report["results"].append({
+                "rtt_ms": rtt_ms,
+                "sequential": sequential,
+                "batched": batched,
+                "speedup_p50": round(sequential["latency_ms"]["p50"] / max(batched["latency_ms"]["p50"], 1e-9), 2),
+                "identical_output": expected == actual,
+            })
+        conn.close()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if not all(r["identical_output"] for r in report["results"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+基频后端对比：yin / autocorr 相对 librosa.pyin 的 pitch_mean / pitch_std 误差与加速比。
+
+合成测试集：不同基频、带颤音和滑音的谐波信号，叠加白噪声并在首尾留静音。
+超出 pitch.PITCH_MEAN_TOLERANCE / PITCH_STD_TOLERANCE_HZ 的片段会列出，
+默认后端 yin 有片段超出容差时以非零状态码退出（autocorr 仅供参考）。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_pitch.py --clips 12 --seconds 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "aphasia"))
+
+import numpy as np  # noqa: E402
+
+import pitch  # noqa: E402
+
+SR = 16000
+
+
+def synth_voice(seconds: float, base_f0: float, vibrato_hz: float, glide: float,
+                snr_db: float, rng) -> np.ndarray:
+    """合成浊音：基频 base_f0，带颤音与线性滑音，首尾各 0.3 秒静音"""
+    t = np.arange(int(seconds * SR)) / SR
+    f0 = base_f0 * (1 + glide * t / seconds) + 3 * np.sin(2 * np.pi * vibrato_hz * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SR
+    y = sum(np.sin(k * phase) / k for k in range(1, 8)) * 0.2
+    noise = rng.standard_normal(len(y)) * np.sqrt(np.mean(y ** 2) / 10 ** (snr_db / 10))
+    silence = np.zeros(int(0.3 * SR))
+    return np.concatenate([silence, y + noise, silence]).astype(np.float32)
+
+
+def timed_stats(y, backend):
+    t0 = time.perf_counter()
+    stats = pitch.pitch_statistics(y, SR, fmin=50, fmax=300, backend=backend)
+    return stats, time.perf_counter() - t0
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=12)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    clips = []
+    for i in range(args.clips):
+        params = {
+            "base_f0": float(rng.uniform(80, 250)),
+            "vibrato_hz": float(rng.uniform(3, 6)),
+            "glide": float(rng.uniform(-0.15, 0.15)),
+            "snr_db": float(rng.uniform(15, 35)),
+        }
+        clips.append((params, synth_voice(args.seconds, rng=rng, **params)))
+
+    totals = {backend: 0.0 for backend in pitch.PITCH_BACKENDS}
+    outliers = {"yin": [], "autocorr": []}
+    errors = {"yin": [], "autocorr": []}
+    for index, (params, y) in enumerate(clips):
+        reference, elapsed = timed_stats(y, "pyin")
+        totals["pyin"] += elapsed
+        for backend in ("yin", "autocorr"):
+            stats, elapsed = timed_stats(y, backend)
+            totals[backend] += elapsed
+            if reference is None or stats is None:
+                outliers[backend].append({"clip": index, "reason": "无浊音帧", **params})
+                continue
+            mean_err = abs(stats[0] - reference[0]) / reference[0]
+            std_err = abs(stats[1] - reference[1])
+            errors[backend].append((mean_err, std_err))
+            if mean_err > pitch.PITCH_MEAN_TOLERANCE or std_err > pitch.PITCH_STD_TOLERANCE_HZ:
+                outliers[backend].append({"clip": index, "mean_rel_err": mean_err,
+                                          "std_abs_err_hz": std_err, **params})
+
+    results = {
+        "config": vars(args),
+        "tolerance": {"pitch_mean_rel": pitch.PITCH_MEAN_TOLERANCE,
+                      "pitch_std_abs_hz": pitch.PITCH_STD_TOLERANCE_HZ},
+        "seconds_per_clip": {b: totals[b] / len(clips) for b in pitch.PITCH_BACKENDS},
+        "backends": {},
+    }
+    for backend in ("yin", "autocorr"):
+        errs = np.asarray(errors[backend]) if errors[backend] else np.zeros((0, 2))
+        results["backends"][backend] = {
+            "speedup_vs_pyin": totals["pyin"] / totals[backend] if totals[backend] else None,
+            "max_mean_rel_err": float(errs[:, 0].max()) if len(errs) else None,
+            "max_std_abs_err_hz": float(errs[:, 1].max()) if len(errs) else None,
+            "outliers": outliers[backend],
+        }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    sys.exit(1 if outliers["yin"] else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,197 @@
+"""
+预测链路延迟/吞吐基准：/predict、/predict_with_completion 与 load_trained_model。
+
+在临时目录中用 create_feature_based_model / create_robot_model 生成小模型，
+进程内直接以 ASGI 方式调用 FastAPI 应用，无需启动 uvicorn，也不依赖任何外部服务。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_prediction.py --requests 500 --concurrency 8
+    python backend/benchmarks/bench_prediction.py --output bench_prediction.json
+
+输出 JSON：每个场景的 p50/p95/p99 延迟（毫秒）、吞吐（请求/秒）与进程 RSS（MB）。
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def current_rss_mb() -> float:
+    """当前进程常驻内存（MB）"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def summarize(latencies_s, wall_s):
+    import numpy as np
+
+    arr = np.asarray(latencies_s) * 1000
+    return {
+        "requests": len(arr),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "mean_ms": float(arr.mean()),
+        "throughput_rps": len(arr) / wall_s if wall_s > 0 else 0.0,
+        "rss_mb": current_rss_mb(),
+    }
+
+
+async def asgi_post(app, path: str, payload: dict):
+    """最小 ASGI 客户端：发送 JSON POST 请求并返回 (状态码, 响应体)"""
+    body = json.dumps(payload).encode("utf-8")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 8000),
+    }
+    request_sent = False
+    status = None
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def run_endpoint(app, path: str, payloads, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(payload):
+        nonlocal errors
+        async with semaphore:
+            t0 = time.perf_counter()
+            status, body = await asgi_post(app, path, payload)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200 or b'"error"' in body:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in payloads))
+    result = summarize(latencies, time.perf_counter() - t0)
+    result["errors"] = errors
+    return result
+
+
+def build_models(main):
+    """在临时 BASE_MODEL_DIR 中保存并发布两个小模型"""
+    models = {}
+    specs = {
+        "upper_limb": (main.create_feature_based_model(input_dim=128), 128, 2),
+        "lower_limb": (main.robot_processor.create_robot_model(input_dim=4, num_classes=3), 4, 3),
+    }
+    for category, (model, input_dim, num_classes) in specs.items():
+        model_name = f"bench_{category}"
+        model_dir = main.get_model_directory(category)
+        model.save(os.path.join(model_dir, f"{model_name}.h5"))
+        with open(os.path.join(model_dir, f"{model_name}_config.json"), "w") as f:
+            json.dump({"model_name": model_name, "category": category,
+                       "input_dimension": input_dim, "num_classes": num_classes}, f)
+        with open(os.path.join(main.BASE_MODEL_DIR, category, "published_model.json"), "w") as f:
+            json.dump({"model_name": model_name, "category": category, "config": {}}, f)
+        models[category] = (model_name, input_dim)
+    return models
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="每个端点的请求数")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--load-iterations", type=int, default=5, help="load_trained_model 调用次数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="结果 JSON 文件路径（默认输出到标准输出）")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="rehab_bench_")
+    os.chdir(workdir)  # main.py 的相对路径 (backend/ml_models 等) 全部落在临时目录
+
+    rss_before_import = current_rss_mb()
+    import numpy as np
+    import main
+
+    rng = np.random.default_rng(args.seed)
+    results = {
+        "config": vars(args),
+        "workdir": workdir,
+        "rss_mb": {"before_import": rss_before_import, "after_import": current_rss_mb()},
+        "scenarios": {},
+    }
+
+    models = build_models(main)
+    results["rss_mb"]["after_model_build"] = current_rss_mb()
+
+    load_latencies = []
+    for _ in range(args.load_iterations):
+        t0 = time.perf_counter()
+        main.load_trained_model("upper_limb", models["upper_limb"][0])
+        load_latencies.append(time.perf_counter() - t0)
+    results["scenarios"]["load_trained_model"] = summarize(load_latencies, sum(load_latencies))
+
+    for category, (model_name, input_dim) in models.items():
+        payloads = [{
+            "model_name": model_name,
+            "category": category,
+            "features": rng.random(input_dim).round(4).tolist()
+        } for _ in range(args.requests)]
+
+        for path in ("/predict", "/predict_with_completion"):
+            # 首个请求单独计时（冷启动：加载/映射模型）
+            t0 = time.perf_counter()
+            asyncio.run(asgi_post(main.app, path, payloads[0]))
+            cold_ms = (time.perf_counter() - t0) * 1000
+
+            scenario = asyncio.run(run_endpoint(main.app, path, payloads, args.concurrency))
+            scenario["cold_first_request_ms"] = cold_ms
+            results["scenarios"][f"{path} [{category}]"] = scenario
+
+    results["rss_mb"]["final"] = current_rss_mb()
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main_cli()
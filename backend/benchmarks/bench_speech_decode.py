@@ -0,0 +1,124 @@
+"""
+发音分析解码阶段基准：旧流程（临时 .webm → pydub 转 .wav → wave 读取 + librosa.load 再解码）
+与 audio_decode.decode_audio 单次内存解码的每个 5 秒片段耗时对比。
+
+片段为合成的带谐波的浊音信号；系统中有 ffmpeg 时额外测试 webm(opus) 输入。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_speech_decode.py --clips 20
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "aphasia"))
+
+import numpy as np  # noqa: E402
+
+from audio_decode import decode_audio  # noqa: E402
+
+
+def synth_clip(seconds: float, sr: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 120 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    y = sum(np.sin(k * phase) / k for k in range(1, 6))
+    y *= 0.3 * (0.5 + 0.5 * np.sin(2 * np.pi * 2 * t) ** 2)
+    return (y + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def to_wav_bytes(y: np.ndarray, sr: int) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        wf.writeframes((np.clip(y, -1, 1) * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def to_webm_bytes(wav_bytes: bytes) -> bytes:
+    proc = subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+         "-c:a", "libopus", "-f", "webm", "pipe:1"],
+        input=wav_bytes, stdout=subprocess.PIPE, check=True
+    )
+    return proc.stdout
+
+
+def legacy_decode(audio_data: bytes, suffix: str):
+    """复现旧流程：两个临时文件 + 两次解码"""
+    import librosa
+    from pydub import AudioSegment
+
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+        f.write(audio_data)
+        temp_path = f.name
+    wav_path = temp_path + ".wav"
+    try:
+        audio = AudioSegment.from_file(temp_path)
+        audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
+        audio.export(wav_path, format="wav")
+        with wave.open(wav_path, "rb") as wf:
+            pcm = wf.readframes(wf.getnframes())
+        y, _ = librosa.load(temp_path, sr=16000)
+        return pcm, y
+    finally:
+        for path in (temp_path, wav_path):
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def new_decode(audio_data: bytes, suffix: str):
+    audio = decode_audio(audio_data)
+    return audio.pcm16, audio.samples
+
+
+def bench(fn, clips, suffix):
+    timings = []
+    for clip in clips:
+        t0 = time.perf_counter()
+        fn(clip, suffix)
+        timings.append(time.perf_counter() - t0)
+    arr = np.asarray(timings) * 1000
+    return {"mean_ms": float(arr.mean()), "p50_ms": float(np.percentile(arr, 50)),
+            "p95_ms": float(np.percentile(arr, 95))}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--source-rate", type=int, default=48000, help="合成片段的原始采样率（浏览器录音通常为 48kHz）")
+    args = parser.parse_args()
+
+    wav_clips = [to_wav_bytes(synth_clip(args.seconds, args.source_rate, i), args.source_rate)
+                 for i in range(args.clips)]
+    inputs = {"wav": (wav_clips, ".wav")}
+    if shutil.which("ffmpeg"):
+        inputs["webm"] = ([to_webm_bytes(c) for c in wav_clips], ".webm")
+
+    results = {"config": vars(args), "formats": {}}
+    for name, (clips, suffix) in inputs.items():
+        entry = {"in_memory": bench(new_decode, clips, suffix)}
+        try:
+            entry["legacy"] = bench(legacy_decode, clips, suffix)
+            entry["speedup"] = entry["legacy"]["mean_ms"] / entry["in_memory"]["mean_ms"]
+        except ImportError as e:
+            entry["legacy"] = f"跳过: {e}"
+        results["formats"][name] = entry
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,77 @@
+"""
+时序推理逐帧延迟基准。
+
+用法（在仓库根目录执行）:
+    python backend/benchmarks/bench_temporal.py --frames 2000 --sequence-length 10
+
+输出 JSON：概率平滑、窗口维护、时序模型单次推理的逐帧延迟（微秒）。
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from temporal_inference import TemporalSessionManager, create_temporal_model  # noqa: E402
+
+
+def _percentiles(samples_us):
+    arr = np.asarray(samples_us)
+    return {
+        "mean_us": float(arr.mean()),
+        "p50_us": float(np.percentile(arr, 50)),
+        "p95_us": float(np.percentile(arr, 95)),
+        "p99_us": float(np.percentile(arr, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--sequence-length", type=int, default=10)
+    parser.add_argument("--input-dim", type=int, default=128)
+    parser.add_argument("--num-classes", type=int, default=2)
+    parser.add_argument("--model-frames", type=int, default=200, help="时序模型推理的帧数（较慢）")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    frames = rng.random((args.frames, args.input_dim), dtype=np.float32)
+    probs = rng.dirichlet(np.ones(args.num_classes), size=args.frames).astype(np.float32)
+
+    manager = TemporalSessionManager(sequence_length=args.sequence_length)
+
+    smooth_us = []
+    for p in probs:
+        t0 = time.perf_counter()
+        manager.smooth("bench", p)
+        smooth_us.append((time.perf_counter() - t0) * 1e6)
+
+    window_us = []
+    for f in frames:
+        t0 = time.perf_counter()
+        manager.push_frame("bench", f, args.sequence_length)
+        window_us.append((time.perf_counter() - t0) * 1e6)
+
+    model = create_temporal_model(args.sequence_length, args.input_dim, args.num_classes)
+    model_us = []
+    for f in frames[:args.model_frames]:
+        t0 = time.perf_counter()
+        window = manager.push_frame("bench_model", f, args.sequence_length)
+        model(window[np.newaxis, ...], training=False)
+        model_us.append((time.perf_counter() - t0) * 1e6)
+
+    print(json.dumps({
+        "frames": args.frames,
+        "sequence_length": args.sequence_length,
+        "smoothing": _percentiles(smooth_us),
+        "window_push": _percentiles(window_us),
+        "temporal_model": _percentiles(model_us),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
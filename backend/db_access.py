@@ -0,0 +1,138 @@
+"""
+数据访问层：把阻塞的数据库调用移出事件循环。
+
+路由保持 async def，实际的 pyodbc 调用通过 Database.run() 在专用线程池中执行：
+- 线程数默认等于连接池常驻连接数（DB_POOL_SIZE），稳定负载下每个线程都复用常驻连接，
+  不会反复创建/关闭溢出连接；溢出连接留给线程池之外的调用方
+- 每次调用有语句超时（驱动层，DB_QUERY_TIMEOUT），外层再加一个略长的 asyncio 超时兜底
+- 慢查询只占用一个工作线程，事件循环上的其他请求（如 /predict）不受影响
+
+以后换用原生异步驱动时，实现 Database 抽象基类（run / stats / shutdown）并在 get_database()
+中返回即可，路由代码不需要改动。
+"""
+import asyncio
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from db_pool import DB_QUERY_TIMEOUT, ConnectionPool, get_pool, query_timeout
+
+logger = logging.getLogger(__name__)
+
+# 工作线程数，0 表示与连接池常驻连接数一致
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "0"))
+# asyncio 超时在语句超时之外额外等待的时间（取连接、网络往返等）
+TIMEOUT_GRACE_SECONDS = 5.0
+
+
+class DatabaseTimeout(RuntimeError):
+    """数据库调用超时"""
+
+
+class Database(ABC):
+    """数据访问接口（路由只通过 run 访问数据库，stats / shutdown 供监控与关闭时使用）"""
+
+    @abstractmethod
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """执行一段包含数据库访问的同步代码，返回其结果"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """执行器与连接池的运行统计"""
+
+    @abstractmethod
+    def shutdown(self):
+        """停止接受新调用并释放连接"""
+
+
+class ThreadedDatabase(Database):
+    """阻塞驱动 + 有界线程池"""
+
+    def __init__(self, pool: ConnectionPool, workers: int = DB_EXECUTOR_WORKERS,
+                 timeout: float = DB_QUERY_TIMEOUT):
+        self.pool = pool
+        self.workers = workers if workers > 0 else pool.pool_size
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="db")
+            return self._executor
+
+    def _call(self, fn: Callable, args, kwargs, timeout: float):
+        with query_timeout(timeout):
+            return fn(*args, **kwargs)
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), self._call, fn, args, kwargs, timeout)
+        with self._lock:
+            self.in_flight += 1
+        try:
+            if timeout > 0:
+                result = await asyncio.wait_for(future, timeout + TIMEOUT_GRACE_SECONDS)
+            else:
+                result = await future
+            with self._lock:
+                self.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"数据库调用超时（{timeout:g}s）: {getattr(fn, '__name__', fn)}")
+            raise DatabaseTimeout(f"数据库操作超时（{timeout:g}s）")
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            executor = {
+                "workers": self.workers,
+                "query_timeout": self.timeout,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+            }
+        return {"executor": executor, "pool": self.pool.stats()}
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self.pool.dispose()
+
+
+_database: Optional[Database] = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> Database:
+    """进程内共享的数据访问对象，首次使用时创建"""
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = ThreadedDatabase(get_pool())
+    return _database
+
+
+async def run_blocking(fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+    return await get_database().run(fn, *args, timeout=timeout, **kwargs)
@@ -0,0 +1,331 @@
+"""
+pyodbc 连接池：main_api 的 DatabaseManager 与 api/ 下各路由共用。
+
+- 常驻 DB_POOL_SIZE 个连接，高峰期最多再临时创建 DB_MAX_OVERFLOW 个，归还时关闭
+- 连接存活超过 DB_POOL_RECYCLE 秒后不再复用
+- 闲置超过 DB_POOL_PRE_PING 秒的连接取出前先执行 SELECT 1 检查，失效则丢弃重连
+- 池满时最多等待 DB_POOL_TIMEOUT 秒，超时抛出 PoolTimeout
+- 记录取连接的等待时间、新建/回收/检查失败/超时次数
+- 借出时按当前线程的 query_timeout() 设置语句超时（默认 DB_QUERY_TIMEOUT 秒）
+
+get_connection() 返回的连接对象与 pyodbc 连接用法相同，close() 时归还到池中
+（未提交的事务会被回滚）。数据库驱动通过 DatabaseDriver 接入，默认 PyodbcDriver。
+"""
+import logging
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "3600"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# 0 表示每次取出都检查
+DB_POOL_PRE_PING = float(os.getenv("DB_POOL_PRE_PING", "30"))
+# 登录超时（秒），0 表示使用驱动默认值
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+# 单条语句的默认超时（秒），0 表示不限制
+DB_QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", "30"))
+# 统计窗口（最近 N 次取连接）
+METRICS_WINDOW = 1000
+
+
+class PoolTimeout(RuntimeError):
+    """等待空闲连接超时"""
+
+
+class DatabaseDriver(ABC):
+    """连接池使用的驱动接口"""
+    # 驱动抛出的异常基类；disconnect_errors 表示连接本身已不可用
+    errors = (Exception,)
+    disconnect_errors = ()
+
+    @abstractmethod
+    def connect(self):
+        """新建一个数据库连接"""
+
+    @abstractmethod
+    def set_query_timeout(self, conn, seconds: float):
+        """设置该连接后续语句的超时，0 表示不限制"""
+
+    def ping(self, conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+
+
+class PyodbcDriver(DatabaseDriver):
+    def __init__(self, connection_string: str, login_timeout: int = DB_CONNECT_TIMEOUT):
+        import pyodbc
+
+        self.pyodbc = pyodbc
+        self.connection_string = connection_string
+        self.login_timeout = login_timeout
+        self.errors = (pyodbc.Error,)
+        self.disconnect_errors = (pyodbc.OperationalError, pyodbc.InterfaceError)
+
+    def connect(self):
+        return self.pyodbc.connect(self.connection_string, timeout=self.login_timeout)
+
+    def set_query_timeout(self, conn, seconds: float):
+        # pyodbc 的语句超时以整秒计，对之后创建的游标生效
+        conn.timeout = int(math.ceil(seconds)) if seconds > 0 else 0
+
+
+_local = threading.local()
+
+
+def current_query_timeout() -> float:
+    return getattr(_local, "query_timeout", DB_QUERY_TIMEOUT)
+
+
+@contextmanager
+def query_timeout(seconds: float):
+    """在当前线程内临时修改借出连接的语句超时"""
+    previous = current_query_timeout()
+    _local.query_timeout = seconds
+    try:
+        yield
+    finally:
+        _local.query_timeout = previous
+
+
+def build_connection_string() -> str:
+    return f"""
+        DRIVER={os.getenv('DB_DRIVER', '')};
+        SERVER={os.getenv('DB_SERVER', '')};
+        DATABASE={os.getenv('DB_NAME', '')};
+        UID={os.getenv('DB_USERNAME', '')};
+        PWD={os.getenv('DB_PASSWORD', '')};
+    """
+
+
+def _percentiles(values) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": round(pick(0.5), 4), "p95": round(pick(0.95), 4), "max": round(ordered[-1], 4)}
+
+
+class _Entry:
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """借出的连接：属性访问转发给 pyodbc 连接，close() 归还到池中"""
+
+    def __init__(self, pool: "ConnectionPool", entry: _Entry):
+        self._pool = pool
+        self._entry = entry
+        self._invalid = False
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._entry is None:
+            raise RuntimeError("连接已归还到连接池")
+        return getattr(self._entry.conn, name)
+
+    def invalidate(self):
+        """标记连接已损坏，归还时直接关闭"""
+        self._invalid = True
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry, discard=self._invalid)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if isinstance(exc, self._pool.driver.disconnect_errors):
+            self.invalidate()
+        self.close()
+
+    def __del__(self):
+        # 忘记 close() 的连接在回收时归还，避免池被耗尽
+        if self._entry is not None:
+            self.close()
+
+
+class ConnectionPool:
+    """有界的数据库连接池（线程安全）"""
+
+    def __init__(self, driver: DatabaseDriver, pool_size: int = DB_POOL_SIZE,
+                 max_overflow: int = DB_MAX_OVERFLOW, recycle: float = DB_POOL_RECYCLE,
+                 timeout: float = DB_POOL_TIMEOUT, pre_ping: float = DB_POOL_PRE_PING):
+        self.driver = driver
+        self.pool_size = max(1, pool_size)
+        self.max_overflow = max(0, max_overflow)
+        self.recycle = recycle
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self._idle: "deque[_Entry]" = deque()
+        self._open = 0        # 已创建且未关闭的连接数（空闲 + 借出）
+        self._cond = threading.Condition()
+        self._waits = deque(maxlen=METRICS_WINDOW)
+        self.checkouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.ping_failures = 0
+        self.timeouts = 0
+        self.peak_in_use = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.pool_size + self.max_overflow
+
+    def get_connection(self, timeout: Optional[float] = None) -> PooledConnection:
+        """借出一个连接；池满时等待，超时抛出 PoolTimeout"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        while True:
+            entry, create = None, False
+            with self._cond:
+                while not self._idle and self._open >= self.capacity:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(f"等待数据库连接超时（{timeout:g}s，连接数上限 {self.capacity}）")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    # 后进先出：优先复用最近用过的连接，多余连接自然闲置到被回收
+                    entry = self._idle.pop()
+                else:
+                    self._open += 1
+                    create = True
+
+            if create:
+                try:
+                    entry = _Entry(self.driver.connect())
+                except Exception:
+                    self._forget()
+                    raise
+                with self._cond:
+                    self.created += 1
+            elif not self._usable(entry):
+                self._close(entry)
+                continue
+
+            try:
+                self.driver.set_query_timeout(entry.conn, current_query_timeout())
+            except self.driver.errors:
+                self._close(entry)
+                raise
+
+            with self._cond:
+                self.checkouts += 1
+                self._waits.append(time.perf_counter() - start)
+                self.peak_in_use = max(self.peak_in_use, self._open - len(self._idle))
+            return PooledConnection(self, entry)
+
+    def _usable(self, entry: _Entry) -> bool:
+        now = time.monotonic()
+        if self.recycle > 0 and now - entry.created_at > self.recycle:
+            with self._cond:
+                self.recycled += 1
+            return False
+        if now - entry.last_used >= self.pre_ping:
+            try:
+                self.driver.ping(entry.conn)
+            except self.driver.errors as e:
+                logger.warning(f"数据库连接已失效，重新连接: {e}")
+                with self._cond:
+                    self.ping_failures += 1
+                return False
+        return True
+
+    def _release(self, entry: _Entry, discard: bool = False):
+        if not discard:
+            try:
+                # 清掉调用方未提交的事务，避免下一个使用者继承
+                entry.conn.rollback()
+            except self.driver.errors:
+                discard = True
+        with self._cond:
+            if not discard and self._open <= self.pool_size:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+        # 损坏的连接或高峰期的溢出连接直接关闭
+        self._close(entry)
+
+    def _close(self, entry: _Entry):
+        try:
+            entry.conn.close()
+        except self.driver.errors:
+            pass
+        self._forget()
+
+    def _forget(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def dispose(self):
+        """关闭所有空闲连接（借出的连接归还时照常处理）"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                "overflow_in_use": max(0, self._open - self.pool_size),
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "created": self.created,
+                "recycled": self.recycled,
+                "ping_failures": self.ping_failures,
+                "timeouts": self.timeouts,
+                "wait_seconds": _percentiles(list(self._waits)),
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """进程内共享的连接池，首次使用时创建"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(PyodbcDriver(build_connection_string()))
+    return _pool
+
+
+def get_connection(timeout: Optional[float] = None) -> PooledConnection:
+    return get_pool().get_connection(timeout)
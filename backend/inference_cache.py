@@ -0,0 +1,86 @@
+"""
+推理结果缓存：对特征向量量化后做 LRU 缓存。
+
+静止的患者或 100ms 间隔的模拟数据会产生大量几乎相同的帧，
+将特征按配置的精度取整后哈希，同一 (模型版本, 特征键) 直接复用预测结果。
+模型版本变化（重新发布/文件更新）后旧条目自然失效。
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class QuantizedPredictionCache:
+    """量化键 LRU 缓存，带命中率统计"""
+
+    def __init__(self, max_entries: int = 4096, precision: float = 1e-3, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, model_version: str, features) -> tuple:
+        """特征按精度取整后哈希"""
+        arr = np.asarray(features, dtype=np.float64)
+        quantized = np.round(arr / self.precision).astype(np.int64)
+        digest = hashlib.blake2b(quantized.tobytes(), digest_size=16).digest()
+        return model_version, arr.shape, digest
+
+    def get(self, key: tuple) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if now - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return dict(value)
+
+    def put(self, key: tuple, value: Dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_model(self, model_version_prefix: str):
+        """删除某个模型（按版本前缀匹配）的所有条目"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0].startswith(model_version_prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "precision": self.precision,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / total if total else 0.0
+            }
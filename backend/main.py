@@ -32,6 +32,16 @@ import base64
 #from sklearn.model_selection import train_test_split
 
 from main_api import app  as main_app
+from inference_cache import QuantizedPredictionCache
+from model_store import SharedModelPool
+from temporal_inference import (
+    DEFAULT_SEQUENCE_LENGTH,
+    TemporalSessionManager,
+    concat_sequence_datasets,
+    create_temporal_model,
+    is_temporal_model,
+    make_sequence_windows,
+)
 
 # 添加 aphasia 目录到 Python 路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -74,33 +84,10 @@ class RehabRobotDataProcessor:
                             with open(file_path, 'r', encoding='utf-8') as f:
                                 data = json.load(f)
                             for sample in data.get('samples', []):
-                                features = sample.get('features') or sample.get('landmarks')
-                                # 如果 features 是 dict（landmarks），将其转换为扁平数组
-                                if isinstance(features, dict):
-                                    # 扁平化数值
-                                    flat = []
-                                    for v in features.values():
-                                        if isinstance(v, dict):
-                                            flat.extend([v.get('x', 0.0), v.get('y', 0.0), v.get('z', 0.0)])
-                                        elif isinstance(v, (list, tuple)):
-                                            flat.extend(v)
-                                        else:
-                                            flat.append(float(v) if v is not None else 0.0)
-                                    features = flat
-
+                                features = self.sample_features(sample)
                                 if features:
                                     all_features.append(np.array(features, dtype=np.float32))
-                                    # 优先使用 rehab_stage 或 label 字段，否则随机化为 0
-                                    label = sample.get('rehab_stage') if isinstance(sample.get('rehab_stage'), int) else sample.get('label')
-                                    if label is None:
-                                        label = sample.get('rehab_stage', 0)
-                                    # 如果仍然不是整数，尝试从字符串映射
-                                    if isinstance(label, str):
-                                        try:
-                                            label = int(label)
-                                        except:
-                                            label = 0
-                                    all_labels.append(int(label) if label is not None else 0)
+                                    all_labels.append(self.sample_label(sample))
                         except Exception:
                             continue
 
@@ -115,6 +102,39 @@ class RehabRobotDataProcessor:
         labels_array = np.array(all_labels, dtype=np.int32)
         return features_array, labels_array
 
+    @staticmethod
+    def sample_features(sample: Dict):
+        """提取单个样本的特征（landmarks 字典会被扁平化）"""
+        features = sample.get('features') or sample.get('landmarks')
+        # 如果 features 是 dict（landmarks），将其转换为扁平数组
+        if isinstance(features, dict):
+            # 扁平化数值
+            flat = []
+            for v in features.values():
+                if isinstance(v, dict):
+                    flat.extend([v.get('x', 0.0), v.get('y', 0.0), v.get('z', 0.0)])
+                elif isinstance(v, (list, tuple)):
+                    flat.extend(v)
+                else:
+                    flat.append(float(v) if v is not None else 0.0)
+            features = flat
+        return features
+
+    @staticmethod
+    def sample_label(sample: Dict) -> int:
+        """解析单个样本的康复阶段标签"""
+        # 优先使用 rehab_stage 或 label 字段，否则随机化为 0
+        label = sample.get('rehab_stage') if isinstance(sample.get('rehab_stage'), int) else sample.get('label')
+        if label is None:
+            label = sample.get('rehab_stage', 0)
+        # 如果仍然不是整数，尝试从字符串映射
+        if isinstance(label, str):
+            try:
+                label = int(label)
+            except:
+                label = 0
+        return int(label) if label is not None else 0
+
     def generate_simulated_data(self, n=100, input_dim: int = 128):
         # 返回特征矩阵和稀疏标签（3类）
         x = np.random.rand(n, input_dim).astype(np.float32)
@@ -192,12 +212,26 @@ for category in CATEGORIES:
 # 创建康复机器人处理器实例（使用文件内替代实现以避免外部依赖）
 robot_processor = RehabRobotDataProcessor(POSE_DATA_DIR)
 
+# 推理模型预热池：Dense 模型权重打包后由各 worker 只读映射共享
+SERVING_CACHE_DIR = os.path.join(BASE_MODEL_DIR, ".serving_cache")
+serving_pool = SharedModelPool(SERVING_CACHE_DIR)
+
+# 推理结果缓存（可选）：特征量化后复用相同 (模型版本, 特征) 的预测
+INFERENCE_CACHE_ENABLED = os.getenv("INFERENCE_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+inference_cache = QuantizedPredictionCache(
+    max_entries=int(os.getenv("INFERENCE_CACHE_SIZE", "4096")),
+    precision=float(os.getenv("INFERENCE_CACHE_PRECISION", "0.001")),
+    ttl_seconds=float(os.getenv("INFERENCE_CACHE_TTL", "300"))
+)
+
 class TrainRequest(BaseModel):
     lr: float = 0.001
     batch: int = 8
     epoch: int = 5
     model_name: Optional[str] = None
     category: str = "upper_limb"
+    use_sequence: bool = False  # 训练基于最近N帧的时序模型
+    sequence_length: int = DEFAULT_SEQUENCE_LENGTH
 
 class ContinueTrainRequest(BaseModel):
     model_name: str
@@ -224,6 +258,7 @@ class PredictRequest(BaseModel):
     model_name: str
     category: str
     features: List[float]
+    session_id: Optional[str] = None  # 传入时启用时序推理（窗口模型/概率平滑）
 
 class RehabSessionRequest(BaseModel):
     patient_id: str
@@ -394,6 +429,57 @@ def load_pose_dataset(category: str):
     
     return features_array, labels_array
 
+def load_pose_sequence_dataset(category: str, sequence_length: int = DEFAULT_SEQUENCE_LENGTH):
+    """
+    加载姿态数据并按录制文件切分为时序窗口，窗口不会跨越文件边界。
+    标签约定与 load_pose_dataset 一致（lower_limb 为稀疏标签，其余为 one-hot）。
+    """
+    category_dir = os.path.join(POSE_DATA_DIR, category)
+    if not os.path.exists(category_dir):
+        return None, None
+
+    parts = []
+    for date_dir in os.listdir(category_dir):
+        date_dir_path = os.path.join(category_dir, date_dir)
+        if not os.path.isdir(date_dir_path):
+            continue
+        for file in sorted(os.listdir(date_dir_path)):
+            if not file.endswith('.json'):
+                continue
+            file_path = os.path.join(date_dir_path, file)
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                frames = []
+                labels = []
+                for sample in data.get('samples', []):
+                    if category == "lower_limb":
+                        features = robot_processor.sample_features(sample)
+                        if not features:
+                            continue
+                        frames.append(np.array(features, dtype=np.float32))
+                        labels.append(robot_processor.sample_label(sample))
+                    else:
+                        landmarks = sample.get('landmarks', {})
+                        if not landmarks:
+                            continue
+                        frames.append(process_pose_landmarks_to_features(landmarks))
+                        action_type = data.get('action', 'unknown')
+                        labels.append(0 if 'flexion' in action_type else 1)
+
+                if frames:
+                    parts.append(make_sequence_windows(np.vstack(frames), np.array(labels), sequence_length))
+            except Exception as e:
+                print(f"加载时序数据文件错误 {file_path}: {e}")
+
+    x, y = concat_sequence_datasets(parts)
+    if x is None:
+        return None, None
+    if category != "lower_limb":
+        y = tf.keras.utils.to_categorical(y, 2)
+    return x, y
+
 def create_feature_based_model(input_dim: int = 128):
     """
     创建基于特征向量的模型（替代图像分类模型）
@@ -426,10 +512,11 @@ def get_latest_published_model(category: str = "upper_limb"):
             with open(published_model_path, 'r') as f:
                 published_info = json.load(f)
             
-            # 加载实际的模型
-            model_data = load_trained_model(category, published_info['model_name'])
+            # 加载实际的模型（worker 内预热缓存，权重共享映射）
+            model_data = load_serving_model(category, published_info['model_name'])
             if model_data:
                 published_info['model'] = model_data['model']
+                published_info['model_path'] = model_data['model_path']
                 return published_info
         else:
             # 如果没有发布的模型，返回最近训练的模型
@@ -462,7 +549,7 @@ def get_recent_model(category: str):
             
         # 使用第一个模型
         model_name = model_files[0].replace('.h5', '')
-        model_data = load_trained_model(category, model_name)
+        model_data = load_serving_model(category, model_name)
         
         if model_data:
             return {
@@ -478,57 +565,80 @@ def get_recent_model(category: str):
         print(f"获取最近模型错误: {e}")
         return None
 
-def predict_exercise(model, features: List[float], category: str):
-    """使用模型预测康复动作"""
+def fit_feature_dimension(features_array: np.ndarray, expected_dim: int) -> np.ndarray:
+    """将 (1, n) 特征填充或截断为模型期望的维度"""
+    if features_array.shape[1] < expected_dim:
+        # 填充特征
+        padding = np.zeros((1, expected_dim - features_array.shape[1]), dtype=np.float32)
+        features_array = np.concatenate([features_array, padding], axis=1)
+    elif features_array.shape[1] > expected_dim:
+        # 截断特征
+        features_array = features_array[:, :expected_dim]
+    return features_array
+
+def get_prediction_label(predicted_class: int, category: str) -> str:
+    """类别编号映射为可读标签"""
+    if category == "lower_limb":
+        # 康复阶段映射
+        stage_mapping = {
+            0: "初期康复",
+            1: "中期康复", 
+            2: "后期康复"
+        }
+        return stage_mapping.get(predicted_class, "未知阶段")
+
+    # 上肢动作映射
+    action_mapping = {
+        0: "屈曲类动作",
+        1: "其他动作"
+    }
+    return action_mapping.get(predicted_class, "未知动作")
+
+def get_model_version(model_info: Dict) -> Optional[str]:
+    """模型版本标识：模型文件路径 + 修改时间，文件更新后缓存自动失效"""
+    model_path = model_info.get('model_path')
+    if not model_path or not os.path.exists(model_path):
+        return None
+    return f"{os.path.abspath(model_path)}@{os.stat(model_path).st_mtime_ns}"
+
+def predict_exercise(model, features: List[float], category: str, model_version: Optional[str] = None):
+    """使用模型预测康复动作；传入 model_version 且启用缓存时复用近似相同特征的结果。
+    时序模型在无会话时以当前帧重复 sequence_length 次作为窗口推理。"""
+    cache_key = None
+    if INFERENCE_CACHE_ENABLED and model_version:
+        cache_key = inference_cache.make_key(f"{model_version}|{category}", features)
+        cached = inference_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
         # 将特征转换为numpy数组
         features_array = np.array(features, dtype=np.float32).reshape(1, -1)
         
-        # 确保特征维度正确
-        expected_dim = model.input_shape[1]
-        if len(features_array[0]) < expected_dim:
-            # 填充特征
-            padding = np.zeros(expected_dim - len(features_array[0]))
-            features_array = np.concatenate([features_array, padding.reshape(1, -1)], axis=1)
-        elif len(features_array[0]) > expected_dim:
-            # 截断特征
-            features_array = features_array[:, :expected_dim]
+        if is_temporal_model(model):
+            # 时序模型但请求没有 session_id：没有帧窗口，把当前帧重复成一个完整窗口
+            sequence_length, expected_dim = model.input_shape[1], model.input_shape[2]
+            features_array = fit_feature_dimension(features_array, expected_dim)
+            features_array = np.repeat(features_array[np.newaxis, ...], sequence_length, axis=1)
+        else:
+            # 确保特征维度正确
+            features_array = fit_feature_dimension(features_array, model.input_shape[1])
         
         # 进行预测
         predictions = model.predict(features_array, verbose=0)
         
-        if category == "lower_limb":
-            # 康复机器人分类，使用稀疏分类
-            predicted_class = int(np.argmax(predictions[0]))
-            confidence = float(np.max(predictions[0]))
-            
-            # 康复阶段映射
-            stage_mapping = {
-                0: "初期康复",
-                1: "中期康复", 
-                2: "后期康复"
-            }
-            
-            predicted_label = stage_mapping.get(predicted_class, "未知阶段")
-        else:
-            # 上肢康复分类
-            predicted_class = int(np.argmax(predictions[0]))
-            confidence = float(np.max(predictions[0]))
-            
-            # 动作映射
-            action_mapping = {
-                0: "屈曲类动作",
-                1: "其他动作"
-            }
-            
-            predicted_label = action_mapping.get(predicted_class, "未知动作")
+        predicted_class = int(np.argmax(predictions[0]))
+        confidence = float(np.max(predictions[0]))
         
-        return {
+        result = {
             'predicted_class': predicted_class,
-            'predicted_label': predicted_label,
+            'predicted_label': get_prediction_label(predicted_class, category),
             'confidence': confidence,
             'probabilities': predictions[0].tolist()
         }
+        if cache_key is not None:
+            inference_cache.put(cache_key, result)
+        return result
         
     except Exception as e:
         print(f"预测错误: {e}")
@@ -539,6 +649,51 @@ def predict_exercise(model, features: List[float], category: str):
             'probabilities': []
         }
 
+# 时序推理会话（按 session_id 维护帧窗口与概率平滑状态）
+temporal_sessions = TemporalSessionManager()
+
+def predict_exercise_temporal(model, features: List[float], category: str, session_id: str,
+                              model_version: Optional[str] = None):
+    """
+    时序推理：时序模型对最近N帧窗口做一次推理；逐帧模型先单帧推理。
+    两种情况都再经过指数平滑与滞回，输出稳定标签。
+    """
+    try:
+        if is_temporal_model(model):
+            sequence_length, expected_dim = model.input_shape[1], model.input_shape[2]
+            features_array = fit_feature_dimension(
+                np.array(features, dtype=np.float32).reshape(1, -1), expected_dim
+            )
+            window = temporal_sessions.push_frame(session_id, features_array[0], sequence_length)
+            predictions = model.predict(window[np.newaxis, ...], verbose=0)
+            predicted_class = int(np.argmax(predictions[0]))
+            result = {
+                'predicted_class': predicted_class,
+                'predicted_label': get_prediction_label(predicted_class, category),
+                'confidence': float(np.max(predictions[0])),
+                'probabilities': predictions[0].tolist()
+            }
+        else:
+            # 逐帧推理可走缓存，平滑状态仍逐帧更新
+            result = predict_exercise(model, features, category, model_version)
+
+        if result['probabilities']:
+            smoothed = temporal_sessions.smooth(session_id, result['probabilities'])
+            result['stable_class'] = smoothed['stable_class']
+            result['stable_label'] = get_prediction_label(smoothed['stable_class'], category)
+            result['stable_confidence'] = smoothed['stable_confidence']
+            result['smoothed_probabilities'] = smoothed['smoothed_probabilities']
+        return result
+
+    except Exception as e:
+        print(f"时序预测错误: {e}")
+        return {
+            'predicted_class': -1,
+            'predicted_label': '预测错误',
+            'confidence': 0.0,
+            'probabilities': []
+        }
+
 def get_exercise_feedback(prediction_result: Dict, expected_exercise: str) -> ExerciseFeedback:
     """根据预测结果生成康复反馈"""
     correctness = prediction_result['confidence']
@@ -637,10 +792,14 @@ def get_session_stats(session_id: str) -> Dict:
     }
 
 # 模型训练逻辑
-async def finetune_model(lr: float, batch: int, epoch: int, category: str, model_name: str = None) -> AsyncGenerator[str, None]:
+async def finetune_model(lr: float, batch: int, epoch: int, category: str, model_name: str = None,
+                         use_sequence: bool = False, sequence_length: int = DEFAULT_SEQUENCE_LENGTH) -> AsyncGenerator[str, None]:
     try:
         # 根据分类加载相应的数据
-        x, y = load_pose_dataset(category)
+        if use_sequence:
+            x, y = load_pose_sequence_dataset(category, sequence_length)
+        else:
+            x, y = load_pose_dataset(category)
         use_pose_data = x is not None
         
         if not use_pose_data:
@@ -651,6 +810,8 @@ async def finetune_model(lr: float, batch: int, epoch: int, category: str, model
             else:
                 # 姿态数据模拟数据：128个特征，2个类别
                 x, y = get_sample_data()
+            if use_sequence:
+                x, y = make_sequence_windows(x, y, sequence_length)
             
             yield f"data: {json.dumps({'warning': f'未找到{category}数据，使用模拟数据训练'})}\n\n"
         
@@ -662,11 +823,15 @@ async def finetune_model(lr: float, batch: int, epoch: int, category: str, model
         if category == "lower_limb":
             # 康复机器人专用模型 - 明确指定3个类别
             num_classes = 3  # 康复机器人有3个康复阶段
-            model = robot_processor.create_robot_model(
-                input_dim=x.shape[1], 
-                num_classes=num_classes
-            )
-            model_architecture = 'Robot Rehabilitation DNN'
+            if use_sequence:
+                model = create_temporal_model(sequence_length, x.shape[-1], num_classes)
+                model_architecture = 'Robot Rehabilitation Temporal Conv1D'
+            else:
+                model = robot_processor.create_robot_model(
+                    input_dim=x.shape[1], 
+                    num_classes=num_classes
+                )
+                model_architecture = 'Robot Rehabilitation DNN'
             
             # 验证标签范围
             if y is not None:
@@ -691,8 +856,12 @@ async def finetune_model(lr: float, batch: int, epoch: int, category: str, model
             X_train, X_test, y_train, y_test = robot_processor.preprocess_data(x, y)
         else:
             # 原有的姿态数据模型
-            model = create_feature_based_model(input_dim=x.shape[1])
-            model_architecture = 'Feature-based DNN'
+            if use_sequence:
+                model = create_temporal_model(sequence_length, x.shape[-1], 2)
+                model_architecture = 'Feature-based Temporal Conv1D'
+            else:
+                model = create_feature_based_model(input_dim=x.shape[1])
+                model_architecture = 'Feature-based DNN'
             
             # 姿态数据使用 categorical_crossentropy
             model.compile(
@@ -780,8 +949,9 @@ async def finetune_model(lr: float, batch: int, epoch: int, category: str, model
             'model_architecture': model_architecture,
             'data_source': 'real_data' if use_pose_data else 'synthetic',
             'training_samples': len(X_train),
-            'input_dimension': x.shape[1],
-            'num_classes': 3 if category == "lower_limb" else 2  # 明确记录类别数
+            'input_dimension': x.shape[-1],
+            'num_classes': 3 if category == "lower_limb" else 2,  # 明确记录类别数
+            'sequence_length': sequence_length if use_sequence else None
         }
         
         config_save_path = os.path.join(model_dir, f"{model_name}_config.json")
@@ -811,8 +981,8 @@ async def finetune_model(lr: float, batch: int, epoch: int, category: str, model
         yield f"data: {json.dumps({'error': error_msg})}\n\n"
 
 # 加载已训练模型
-def load_trained_model(category: str, model_name: str):
-    """加载之前训练好的模型和配置"""
+def find_model_files(category: str, model_name: str) -> Optional[Dict]:
+    """查找模型文件并读取训练历史与配置（不加载模型本身）"""
     # 搜索所有日期目录找到模型
     category_dir = os.path.join(BASE_MODEL_DIR, category)
     model_found = False
@@ -844,19 +1014,27 @@ def load_trained_model(category: str, model_name: str):
         'config': {}
     }
     
+    # 加载训练历史
+    if os.path.exists(history_path):
+        with open(history_path, 'r') as f:
+            result['history'] = json.load(f)
+    
+    # 加载配置
+    if os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            result['config'] = json.load(f)
+    
+    return result
+
+def load_trained_model(category: str, model_name: str):
+    """加载之前训练好的模型和配置"""
     try:
-        # 加载模型
-        result['model'] = tf.keras.models.load_model(model_path)
-        
-        # 加载训练历史
-        if os.path.exists(history_path):
-            with open(history_path, 'r') as f:
-                result['history'] = json.load(f)
+        result = find_model_files(category, model_name)
+        if result is None:
+            return None
         
-        # 加载配置
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                result['config'] = json.load(f)
+        # 加载模型
+        result['model'] = tf.keras.models.load_model(result['model_path'])
                 
     except Exception as e:
         print(f"加载模型失败: {e}")
@@ -864,6 +1042,26 @@ def load_trained_model(category: str, model_name: str):
     
     return result
 
+def load_serving_model(category: str, model_name: str):
+    """
+    加载用于推理的模型：Dense 模型使用共享内存映射权重的 NumPy 推理，
+    其他模型回退到 Keras。模型在每个 worker 内只加载一次。
+    """
+    try:
+        result = find_model_files(category, model_name)
+        if result is None:
+            return None
+        
+        result['model'] = serving_pool.get(result['model_path'], fallback_loader=tf.keras.models.load_model)
+        if result['model'] is None:
+            return None
+                
+    except Exception as e:
+        print(f"加载推理模型失败: {e}")
+        return None
+    
+    return result
+
 # 继续训练功能
 async def continue_training(model_name: str, category: str, additional_epochs: int = 5, new_lr: float = None) -> AsyncGenerator[str, None]:
     """在已有模型基础上继续训练"""
@@ -877,14 +1075,20 @@ async def continue_training(model_name: str, category: str, additional_epochs: i
         model = model_data['model']
         existing_history = model_data['history'].copy()
         
-        # 加载数据
-        x, y = load_pose_dataset(category)
+        # 加载数据（时序模型按窗口加载）
+        sequence_length = model.input_shape[1] if is_temporal_model(model) else None
+        if sequence_length:
+            x, y = load_pose_sequence_dataset(category, sequence_length)
+        else:
+            x, y = load_pose_dataset(category)
         if x is None:
             # 根据分类生成不同的模拟数据
             if category == "lower_limb":
                 x, y = robot_processor.generate_simulated_data(100)
             else:
                 x, y = get_sample_data()
+            if sequence_length:
+                x, y = make_sequence_windows(x, y, sequence_length)
         
         # 修复：重新编译模型以重置优化器状态
         current_lr = new_lr if new_lr is not None else model_data['config'].get('learning_rate', 0.001)
@@ -905,10 +1109,13 @@ async def continue_training(model_name: str, category: str, additional_epochs: i
                 if model_output_shape != 3:
                     print(f"警告: 模型输出层有 {model_output_shape} 个神经元，但康复机器人需要3个类别")
                     # 如果模型结构不匹配，需要重新创建模型
-                    model = robot_processor.create_robot_model(
-                        input_dim=x.shape[1], 
-                        num_classes=3
-                    )
+                    if sequence_length:
+                        model = create_temporal_model(sequence_length, x.shape[-1], 3)
+                    else:
+                        model = robot_processor.create_robot_model(
+                            input_dim=x.shape[1], 
+                            num_classes=3
+                        )
                     print("已重新创建康复机器人模型")
         else:
             loss_function = 'categorical_crossentropy'
@@ -998,6 +1205,17 @@ async def continue_training(model_name: str, category: str, additional_epochs: i
         print(error_msg)
         yield f"data: {json.dumps({'error': error_msg})}\n\n"
 
+@app.on_event("startup")
+async def warm_serving_models():
+    """worker 启动时预热各分类已发布的模型"""
+    for category in CATEGORIES:
+        try:
+            model_info = get_latest_published_model(category)
+            if model_info and model_info.get('model') is not None:
+                print(f"已预热 {category} 模型: {model_info.get('model_name')}")
+        except Exception as e:
+            print(f"预热 {category} 模型失败: {e}")
+
 # ========== 新增：康复预测API端点 ==========
 @app.post("/predict")
 async def predict_rehab_exercise(request: PredictRequest):
@@ -1010,7 +1228,7 @@ async def predict_rehab_exercise(request: PredictRequest):
         
         # 首先尝试使用指定的模型
         if request.model_name:
-            model_data = load_trained_model(request.category, request.model_name)
+            model_data = load_serving_model(request.category, request.model_name)
             if model_data:
                 model_info = model_data
             else:
@@ -1025,11 +1243,22 @@ async def predict_rehab_exercise(request: PredictRequest):
             return {"error": "模型加载失败"}
         
         # 进行预测
-        prediction_result = predict_exercise(
-            model_info['model'], 
-            request.features, 
-            request.category
-        )
+        model_version = get_model_version(model_info)
+        if request.session_id:
+            prediction_result = predict_exercise_temporal(
+                model_info['model'],
+                request.features,
+                request.category,
+                request.session_id,
+                model_version
+            )
+        else:
+            prediction_result = predict_exercise(
+                model_info['model'], 
+                request.features, 
+                request.category,
+                model_version
+            )
         
         print(f"预测结果: 类别={prediction_result['predicted_class']}, 置信度={prediction_result['confidence']:.3f}")
         
@@ -1054,21 +1283,35 @@ async def predict_with_completion(request: PredictRequest):
             return {"error": "模型加载失败"}
         
         # 进行预测
-        prediction_result = predict_exercise(
-            model_info['model'], 
-            request.features, 
-            request.category
-        )
+        model_version = get_model_version(model_info)
+        if request.session_id:
+            prediction_result = predict_exercise_temporal(
+                model_info['model'],
+                request.features,
+                request.category,
+                request.session_id,
+                model_version
+            )
+        else:
+            prediction_result = predict_exercise(
+                model_info['model'], 
+                request.features, 
+                request.category,
+                model_version
+            )
+        
+        # 时序模式下使用平滑后的置信度，避免单帧抖动
+        confidence = prediction_result.get('stable_confidence', prediction_result['confidence'])
         
         # 检测动作是否完成
         is_completed = False
-        if prediction_result['confidence'] > 0.5:  # 基本置信度阈值
+        if confidence > 0.5:  # 基本置信度阈值
             # 这里需要从前端传递exercise_type
             # 在实际应用中，应该从前端传递当前训练的动作类型
             exercise_type = getattr(request, 'exercise_type', 'shoulder_flexion')
             is_completed = completion_detector.check_completion(
                 exercise_type,
-                prediction_result['confidence'],
+                confidence,
                 request.features
             )
         
@@ -1083,6 +1326,11 @@ async def predict_with_completion(request: PredictRequest):
     except Exception as e:
         return {"error": f"预测过程中发生错误: {str(e)}"}
 
+@app.get("/inference_cache/stats")
+async def get_inference_cache_stats():
+    """推理结果缓存命中率统计"""
+    return {"enabled": INFERENCE_CACHE_ENABLED, **inference_cache.stats()}
+
 @app.post("/create_rehab_session")
 async def create_rehab_session_endpoint(request: RehabSessionRequest):
     """创建康复会话"""
@@ -1232,7 +1480,8 @@ async def train_model(request: TrainRequest):
         return {"error": f"分类必须是以下之一: {CATEGORIES}"}
     
     return StreamingResponse(
-        finetune_model(request.lr, request.batch, request.epoch, request.category, request.model_name),
+        finetune_model(request.lr, request.batch, request.epoch, request.category, request.model_name,
+                       request.use_sequence, request.sequence_length),
         media_type="text/plain"
     )
 
@@ -1304,10 +1553,14 @@ async def delete_model(category: str, model_name: str):
         return {"error": f"分类必须是以下之一: {CATEGORIES}"}
     
     try:
-        model_data = load_trained_model(category, model_name)
+        model_data = find_model_files(category, model_name)
         if model_data is None:
             return {"error": "模型不存在"}
         
+        # 释放推理缓存与共享权重文件
+        serving_pool.invalidate(model_data['model_path'])
+        inference_cache.invalidate_model(os.path.abspath(model_data['model_path']) + "@")
+        
         files_to_delete = [
             model_data['model_path'],
             model_data['history_path'], 
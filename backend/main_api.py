@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 import json
@@ -5,7 +6,7 @@ import os
 from typing import Optional
 
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.responses import JSONResponse
@@ -15,6 +16,26 @@ import pyodbc
 from pydantic import BaseModel, Field
 
 from api import stages, joint_rom, progress, training
+from db_access import DatabaseTimeout, get_database
+from db_pool import PoolTimeout, build_connection_string, get_pool
+from pagination import (
+    NEXT_CURSOR_HEADER, clamp_limit, decode_cursor, keyset_condition, make_page, order_by, set_next_cursor, top_rows
+)
+from patient_details import (
+    TRAINING_RECORD_ORDER, fetch_patient_details, format_current_stage, format_device_status,
+    format_joint_mobility, format_patient_summary, format_progress, format_training_record,
+    format_training_stats, training_record_key
+)
+from patient_list import (
+    format_patient_list_item, patient_list_filters, patient_list_order, refresh_patient_list
+)
+from response_cache import cached_json, response_cache
+from training_rollups import (
+    TRAINING_ROLLUP_COMPACT_INTERVAL, TRAINING_ROLLUP_COMPACT_TIMEOUT, compact_rollups, fetch_training_totals,
+    run_compaction_loop
+)
+from training_stats import fetch_monthly_training
+from user_cache import user_cache, user_claims
 
 # 加载环境变量
 load_dotenv()
@@ -75,6 +96,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # 包含路由
@@ -93,23 +115,25 @@ class DatabaseManager:
     
     @staticmethod
     def get_connection_string():
-        return f"""
-            DRIVER={Config.DB_DRIVER};
-            SERVER={Config.DB_SERVER};
-            DATABASE={Config.DB_NAME};
-            UID={Config.DB_USERNAME};
-            PWD={Config.DB_PASSWORD};
-        """
+        return build_connection_string()
     
     @contextmanager
     def get_db_connection(self):
-        """数据库连接上下文管理器"""
+        """数据库连接上下文管理器（从连接池借出，结束时归还）"""
         conn = None
         try:
-            conn = pyodbc.connect(self.get_connection_string())
+            conn = get_pool().get_connection()
             yield conn
+        except PoolTimeout as e:
+            print(f"数据库连接池已满: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="数据库繁忙，请稍后重试"
+            )
         except pyodbc.Error as e:
             print(f"数据库连接错误: {e}")
+            if conn and isinstance(e, (pyodbc.OperationalError, pyodbc.InterfaceError)):
+                conn.invalidate()
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="数据库连接失败"
@@ -118,6 +142,13 @@ class DatabaseManager:
             if conn:
                 conn.close()
     
+    async def run(self, fn, *args, **kwargs):
+        """在数据库线程池中执行阻塞的数据库代码，避免阻塞事件循环"""
+        try:
+            return await get_database().run(fn, *args, **kwargs)
+        except DatabaseTimeout as e:
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    
     @contextmanager
     def get_db_cursor(self, conn=None):
         """数据库游标上下文管理器"""
@@ -164,13 +195,18 @@ class AuthService:
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """创建访问令牌"""
         to_encode = data.copy()
-        expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-        to_encode.update({"exp": expire})
+        now = datetime.utcnow()
+        expire = now + (expires_delta or timedelta(minutes=15))
+        to_encode.update({"exp": expire, "iat": now})
         return jwt.encode(to_encode, Config.SECRET_KEY, algorithm=Config.ALGORITHM)
     
     @staticmethod
     async def authenticate_user(username: str, password: str) -> Optional[dict]:
         """认证用户"""
+        return await db_manager.run(AuthService._authenticate_user, username, password)
+    
+    @staticmethod
+    def _authenticate_user(username: str, password: str) -> Optional[dict]:
         with db_manager.get_db_cursor() as cursor:
             cursor.execute("""
                 SELECT UserID, Username, PasswordHash, FullName, Email, Role, IsActive 
@@ -220,14 +256,26 @@ class AuthService:
         except jwt.InvalidTokenError:
             raise credentials_exception
         
+        # 缓存命中（或信任令牌中的用户信息）时不查库
+        user = user_cache.lookup(payload)
+        if user is None:
+            generation = user_cache.generation(username)
+            user = await db_manager.run(AuthService._find_user, username)
+            if not user:
+                raise credentials_exception
+            user_cache.put(payload, user, generation)
+        return user
+    
+    @staticmethod
+    def _find_user(username: str) -> Optional[dict]:
         with db_manager.get_db_cursor() as cursor:
             cursor.execute("""
                 SELECT UserID, Username, FullName, Email, Role, IsActive 
                 FROM Users WHERE Username = ?
             """, username)
             user = cursor.fetchone()
-            if not user:
-                raise credentials_exception
+            if not user or not user.IsActive:
+                return None
             
             return {
                 "user_id": user.UserID,
@@ -251,7 +299,7 @@ async def login(form_data: UserLogin):
     
     access_token_expires = timedelta(minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = AuthService.create_access_token(
-        data={"sub": user["username"]}, 
+        data={"sub": user["username"], **user_claims(user)}, 
         expires_delta=access_token_expires
     )
     
@@ -267,99 +315,107 @@ async def read_users_me(current_user: dict = Depends(AuthService.get_current_use
     return current_user
 
 @app.get("/api/patients")
-async def get_patients(current_user: dict = Depends(AuthService.get_current_user)):
-    """获取患者列表"""
+async def get_patients(
+    request: Request,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    sort: str = "register_date",
+    order: str = "desc",
+    status: Optional[str] = None,
+    department: Optional[str] = None,
+    doctor_id: Optional[int] = None,
+    search: Optional[str] = None,
+    current_user: dict = Depends(AuthService.get_current_user)
+):
+    """获取患者列表（默认按登记日期倒序，支持筛选/搜索/排序，键集分页；响应缓存 + ETag）"""
+    list_order = patient_list_order(sort, order)
+    filters = patient_list_filters(status, department, doctor_id, search)
+    
+    async def produce():
+        patients, next_cursor = await db_manager.run(_get_patients, list_order, filters, clamp_limit(limit), after)
+        return patients, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    
+    return await cached_json(request, "patients", current_user["user_id"], produce)
+
+def _get_patients(list_order: list, filters: tuple, limit: int, after: Optional[str]):
+    condition, params = keyset_condition(list_order, decode_cursor(after, len(list_order)))
+    filter_sql, filter_params = filters
+    sort_column = list_order[0][0]
     with db_manager.get_db_cursor() as cursor:
-        cursor.execute("""
-            SELECT p.PatientID, p.PatientCode, p.Name, p.Age, p.Gender, p.RegisterDate, 
-                   p.Status, p.Department, u.FullName as DoctorName,
-                   ISNULL(ps.TotalTrainingCount, 0) as TrainingCount,
-                   ISNULL(ps.TotalTrainingHours, 0) * 60 as TotalDuration,
-                   (SELECT MAX(CurrentProgress) FROM RehabilitationStages rs 
-                    WHERE rs.PatientID = p.PatientID AND rs.Status = 'active') as RecoveryProgress
-            FROM Patients p 
-            LEFT JOIN PatientSummary ps ON p.PatientID = ps.PatientID
-            LEFT JOIN Users u ON p.DoctorID = u.UserID
-            WHERE p.Status != 'deleted'
-            ORDER BY p.RegisterDate DESC
-        """)
-        
-        patients = []
-        for row in cursor.fetchall():
-            total_hours = (row.TotalDuration or 0) / 60
-            patients.append({
-                "patient_id": row.PatientID,
-                "patient_code": row.PatientCode,
-                "name": row.Name,
-                "age": row.Age,
-                "gender": row.Gender,
-                "register_date": row.RegisterDate.strftime("%Y-%m-%d") if row.RegisterDate else None,
-                "status": row.Status,
-                "department": row.Department,
-                "doctor_name": row.DoctorName,
-                "training_count": row.TrainingCount or 0,
-                "total_duration": f"{total_hours:.1f}h",
-                "recovery_progress": f"{row.RecoveryProgress or 0}%"
-            })
+        cursor.execute(f"""
+            SELECT TOP (?) PatientID, PatientCode, Name, Age, Gender, RegisterDate,
+                   Status, Department, DoctorName, TrainingCount, TotalTrainingHours, RecoveryProgress
+            FROM PatientListSummary
+            WHERE {filter_sql} AND {condition}
+            ORDER BY {order_by(list_order)}
+        """, top_rows(limit), *filter_params, *params)
         
-        return patients
+        page = make_page(cursor.fetchall(), limit, lambda row: (getattr(row, sort_column), row.PatientID))
+        return [format_patient_list_item(row) for row in page.rows], page.next_cursor
 
 @app.get("/api/patients/{patient_id}")
 async def get_patient_details(patient_id: int, current_user: dict = Depends(AuthService.get_current_user)):
     """获取患者详情"""
+    return await db_manager.run(_get_patient_details, patient_id)
+
+def _get_patient_details(patient_id: int):
     with db_manager.get_db_connection() as conn:
         with db_manager.get_db_cursor(conn) as cursor:
             try:
-                # 获取患者基本信息
-                cursor.execute("""
-                    SELECT p.*, u.FullName as DoctorName
-                    FROM Patients p
-                    LEFT JOIN Users u ON p.DoctorID = u.UserID
-                    WHERE p.PatientID = ?
-                """, patient_id)
-                
-                patient = cursor.fetchone()
-                if not patient:
+                # 一次往返取回全部数据（必要时补建患者汇总数据）
+                details = fetch_patient_details(cursor, patient_id)
+                if not details:
                     raise HTTPException(status_code=404, detail="患者不存在")
                 
-                # 获取或创建患者汇总数据
-                patient_summary = PatientService.get_or_create_patient_summary(cursor, patient_id)
-                
-                # 获取其他相关数据
-                current_stage = PatientService.get_current_stage(cursor, patient_id)
-                training_stats = PatientService.get_training_stats(cursor, patient_id)
-                joint_mobility = PatientService.get_joint_mobility(cursor, patient_id)
-                device_status = PatientService.get_device_status(cursor, patient_id)
-                training_records = PatientService.get_training_records(cursor, patient_id)
-                progress_history = PatientService.get_progress_history(cursor, patient_id)
-                
-                return {
-                    "patient_info": {
-                        "name": patient.Name,
-                        "patient_code": patient.PatientCode,
-                        "age": patient.Age,
-                        "gender": patient.Gender,
-                        "register_date": patient.RegisterDate.strftime("%Y-%m-%d"),
-                        "doctor_name": patient.DoctorName,
-                        "department": patient.Department,
-                        "medical_history": patient.MedicalHistory
-                    },
-                    "patient_summary": patient_summary,
-                    "training_stats": training_stats,
-                    "current_stage": current_stage,
-                    "joint_mobility": joint_mobility,
-                    "device_status": device_status,
-                    "training_records": training_records,
-                    "progress_history": progress_history
-                }
+                conn.commit()
+                return details
                 
+            except HTTPException:
+                raise
             except Exception as e:
                 conn.rollback()
                 raise HTTPException(status_code=500, detail=f"获取患者详情失败: {str(e)}")
 
+@app.get("/api/patients/{patient_id}/training-records")
+async def get_patient_training_records(
+    patient_id: int,
+    response: Response,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    current_user: dict = Depends(AuthService.get_current_user)
+):
+    """获取患者训练记录（键集分页）"""
+    records, next_cursor = await db_manager.run(_get_patient_training_records, patient_id, clamp_limit(limit), after)
+    set_next_cursor(response, next_cursor)
+    return records
+
+def _get_patient_training_records(patient_id: int, limit: int, after: Optional[str]):
+    with db_manager.get_db_cursor() as cursor:
+        return PatientService.get_training_records(cursor, patient_id, limit, after)
+
+@app.get("/api/patients/{patient_id}/progress-history")
+async def get_patient_progress_history(
+    patient_id: int,
+    response: Response,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    current_user: dict = Depends(AuthService.get_current_user)
+):
+    """获取患者康复进度历史（键集分页）"""
+    history, next_cursor = await db_manager.run(_get_patient_progress_history, patient_id, clamp_limit(limit), after)
+    set_next_cursor(response, next_cursor)
+    return history
+
+def _get_patient_progress_history(patient_id: int, limit: int, after: Optional[str]):
+    with db_manager.get_db_cursor() as cursor:
+        return PatientService.get_progress_history(cursor, patient_id, limit, after)
+
 @app.post("/api/patients")
 async def create_patient(patient: PatientCreate, current_user: dict = Depends(AuthService.get_current_user)):
     """创建患者"""
+    return await db_manager.run(_create_patient, patient, current_user)
+
+def _create_patient(patient: PatientCreate, current_user: dict):
     with db_manager.get_db_connection() as conn:
         with db_manager.get_db_cursor(conn) as cursor:
             try:
@@ -373,13 +429,15 @@ async def create_patient(patient: PatientCreate, current_user: dict = Depends(Au
                     patient.contact_info, patient.medical_history, patient.department, 
                     current_user["user_id"])
                 
-                conn.commit()
-                
                 cursor.execute(
                     "SELECT PatientID, PatientCode, Name FROM Patients WHERE PatientCode = ?", 
                     patient_code
                 )
                 new_patient = cursor.fetchone()
+                refresh_patient_list(cursor, new_patient.PatientID)
+                
+                conn.commit()
+                response_cache.invalidate()
                 
                 return {
                     "message": "患者添加成功",
@@ -400,6 +458,9 @@ async def update_patient(
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """更新患者信息"""
+    return await db_manager.run(_update_patient, patient_id, patient)
+
+def _update_patient(patient_id: int, patient: PatientUpdate):
     with db_manager.get_db_connection() as conn:
         with db_manager.get_db_cursor(conn) as cursor:
             try:
@@ -412,7 +473,9 @@ async def update_patient(
                 if cursor.rowcount == 0:
                     raise HTTPException(status_code=404, detail="患者不存在")
                 
+                refresh_patient_list(cursor, patient_id)
                 conn.commit()
+                response_cache.invalidate()
                 return {"message": "患者信息更新成功"}
                 
             except HTTPException:
@@ -425,6 +488,9 @@ async def update_patient(
 @app.delete("/api/patients/{patient_id}")
 async def delete_patient(patient_id: int, current_user: dict = Depends(AuthService.get_current_user)):
     """删除患者（软删除）"""
+    return await db_manager.run(_delete_patient, patient_id)
+
+def _delete_patient(patient_id: int):
     with db_manager.get_db_connection() as conn:
         with db_manager.get_db_cursor(conn) as cursor:
             try:
@@ -436,7 +502,9 @@ async def delete_patient(patient_id: int, current_user: dict = Depends(AuthServi
                 if cursor.rowcount == 0:
                     raise HTTPException(status_code=404, detail="患者不存在")
                 
+                refresh_patient_list(cursor, patient_id)
                 conn.commit()
+                response_cache.invalidate()
                 return {"message": "患者删除成功"}
                 
             except HTTPException:
@@ -450,6 +518,9 @@ async def delete_patient(patient_id: int, current_user: dict = Depends(AuthServi
 @app.get("/api/patients/{patient_id}/ai-analysis")
 async def get_ai_analysis(patient_id: int, current_user: dict = Depends(AuthService.get_current_user)):
     """获取AI分析报告"""
+    return await db_manager.run(_get_ai_analysis, patient_id)
+
+def _get_ai_analysis(patient_id: int):
     with db_manager.get_db_cursor() as cursor:
         cursor.execute("""
             SELECT TOP 1 ar.OverallScore, ar.JointAngleDeviation, ar.MotionTrajectoryData, 
@@ -488,8 +559,14 @@ async def get_ai_analysis(patient_id: int, current_user: dict = Depends(AuthServ
         }
 
 @app.get("/api/reminders/today")
-async def get_today_reminders(current_user: dict = Depends(AuthService.get_current_user)):
-    """获取今日提醒"""
+async def get_today_reminders(request: Request, current_user: dict = Depends(AuthService.get_current_user)):
+    """获取今日提醒（响应缓存 + ETag）"""
+    async def produce():
+        return await db_manager.run(_get_today_reminders), {}
+    
+    return await cached_json(request, "reminders", current_user["user_id"], produce)
+
+def _get_today_reminders():
     with db_manager.get_db_cursor() as cursor:
         cursor.execute("""
             SELECT r.ReminderID, r.Title, r.Description, r.ReminderTime, p.Name as PatientName
@@ -516,6 +593,69 @@ async def health_check():
     """健康检查"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/api/db-pool/stats")
+async def get_db_pool_stats(current_user: dict = Depends(AuthService.get_current_user)):
+    """数据库线程池与连接池状态"""
+    return get_database().stats()
+
+@app.get("/api/auth/cache/stats")
+async def get_auth_cache_stats(current_user: dict = Depends(AuthService.get_current_user)):
+    """认证用户缓存状态"""
+    return user_cache.stats()
+
+@app.get("/api/response-cache/stats")
+async def get_response_cache_stats(current_user: dict = Depends(AuthService.get_current_user)):
+    """轮询接口响应缓存状态"""
+    return response_cache.stats()
+
+@app.post("/api/auth/cache/invalidate")
+async def invalidate_auth_cache(
+    username: Optional[str] = None,
+    current_user: dict = Depends(AuthService.get_current_user)
+):
+    """
+    用户被禁用或修改后清除其认证缓存（不指定用户名时清除全部，仅管理员可清除他人）。
+    只清除处理本请求的 worker 进程，其他进程的条目在 AUTH_USER_CACHE_TTL 秒内过期。
+    """
+    if username != current_user["username"] and current_user["role"] != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限")
+    if username:
+        user_cache.invalidate(username)
+    else:
+        user_cache.clear()
+    return {"message": "认证缓存已清除"}
+
+@app.post("/api/training-rollups/compact")
+async def compact_training_rollups(
+    days: Optional[int] = None,
+    current_user: dict = Depends(AuthService.get_current_user)
+):
+    """用原始训练记录重算汇总表（不指定天数时全量重算，仅管理员，用于批量导入之后）"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限")
+    return await db_manager.run(_compact_training_rollups, days, timeout=TRAINING_ROLLUP_COMPACT_TIMEOUT)
+
+def _compact_training_rollups(days: Optional[int]):
+    try:
+        return compact_rollups(days)
+    except Exception as e:
+        print(f"重算训练汇总错误: {e}")
+        raise HTTPException(status_code=500, detail="重算训练汇总失败")
+
+@app.on_event("startup")
+async def start_rollup_compaction():
+    if TRAINING_ROLLUP_COMPACT_INTERVAL > 0:
+        app.state.rollup_compaction = asyncio.create_task(run_compaction_loop())
+
+@app.on_event("shutdown")
+def close_db_pool():
+    compaction = getattr(app.state, "rollup_compaction", None)
+    if compaction is not None:
+        compaction.cancel()
+    get_database().shutdown()
+
+PROGRESS_HISTORY_ORDER = [("WeekNumber", "ASC"), ("ProgressID", "ASC")]
+
 # 患者服务
 class PatientService:
     """患者服务类"""
@@ -570,8 +710,7 @@ class PatientService:
         
         if not patient_summary:
             # 创建默认的患者汇总数据
-            cursor.execute("SELECT COUNT(*) as TrainingCount, SUM(Duration) as TotalDuration, SUM(Steps) as TotalSteps FROM TrainingRecords WHERE PatientID = ?", patient_id)
-            stats = cursor.fetchone()
+            stats = fetch_training_totals(cursor, patient_id)
             
             cursor.execute("SELECT TOP 1 LeftHip, RightHip, LeftKnee, RightKnee, LeftAnkle, RightAnkle FROM JointMobilityRecords WHERE PatientID = ? ORDER BY RecordDate DESC", patient_id)
             joint_mobility = cursor.fetchone()
@@ -597,6 +736,7 @@ class PatientService:
                 stats.TotalSteps or 0,
                 joint_progress, joint_progress, 0, 0
             ))
+            refresh_patient_list(cursor, patient_id)
             
             # 重新获取数据
             cursor.execute("""
@@ -609,16 +749,7 @@ class PatientService:
             """, patient_id)
             patient_summary = cursor.fetchone()
         
-        return {
-            "total_training_count": patient_summary.TotalTrainingCount,
-            "total_training_hours": float(patient_summary.TotalTrainingHours),
-            "total_steps": patient_summary.TotalSteps,
-            "overall_progress": patient_summary.OverallProgress,
-            "joint_mobility_progress": patient_summary.JointMobilityProgress,
-            "muscle_strength_progress": patient_summary.MuscleStrengthProgress,
-            "balance_ability_progress": patient_summary.BalanceAbilityProgress,
-            "last_updated": patient_summary.LastUpdated.strftime("%Y-%m-%d %H:%M")
-        }
+        return format_patient_summary(patient_summary)
     
     @staticmethod
     def get_current_stage(cursor, patient_id: int) -> Optional[dict]:
@@ -631,40 +762,12 @@ class PatientService:
             ORDER BY StageNumber DESC
         """, patient_id)
         
-        stage = cursor.fetchone()
-        if not stage:
-            return None
-        
-        return {
-            "stage_name": stage.StageName,
-            "progress": stage.CurrentProgress,
-            "start_date": stage.StartDate.strftime("%Y-%m-%d") if stage.StartDate else None,
-            "end_date": stage.EndDate.strftime("%Y-%m-%d") if stage.EndDate else None,
-            "target_goals": stage.TargetGoals,
-            "weeks_completed": stage.WeeksCompleted,
-            "weeks_remaining": stage.WeeksRemaining,
-            "weekly_focus": stage.WeeklyFocus,
-            "training_intensity": stage.TrainingIntensity,
-            "next_evaluation_date": stage.NextEvaluationDate.strftime("%Y-%m-%d") if stage.NextEvaluationDate else None
-        }
+        return format_current_stage(cursor.fetchone())
     
     @staticmethod
     def get_training_stats(cursor, patient_id: int) -> dict:
-        """获取训练统计"""
-        cursor.execute("""
-            SELECT COUNT(*) as TrainingCount, 
-                   SUM(Duration) as TotalDuration,
-                   SUM(Steps) as TotalSteps
-            FROM TrainingRecords 
-            WHERE PatientID = ?
-        """, patient_id)
-        
-        stats = cursor.fetchone()
-        return {
-            "training_count": stats.TrainingCount or 0,
-            "total_duration": f"{(stats.TotalDuration or 0) / 60:.1f}",
-            "total_steps": stats.TotalSteps or 0
-        }
+        """获取训练统计（按月汇总表）"""
+        return format_training_stats(fetch_training_totals(cursor, patient_id))
     
     @staticmethod
     def get_joint_mobility(cursor, patient_id: int) -> Optional[dict]:
@@ -678,24 +781,7 @@ class PatientService:
             ORDER BY RecordDate DESC
         """, patient_id)
         
-        joint_mobility = cursor.fetchone()
-        if not joint_mobility:
-            return None
-        
-        return {
-            "left_hip": joint_mobility.LeftHip,
-            "right_hip": joint_mobility.RightHip,
-            "left_knee": joint_mobility.LeftKnee,
-            "right_knee": joint_mobility.RightKnee,
-            "left_ankle": joint_mobility.LeftAnkle,
-            "right_ankle": joint_mobility.RightAnkle,
-            "left_hip_change": joint_mobility.LeftHipChange,
-            "right_hip_change": joint_mobility.RightHipChange,
-            "left_knee_change": joint_mobility.LeftKneeChange,
-            "right_knee_change": joint_mobility.RightKneeChange,
-            "left_ankle_change": joint_mobility.LeftAnkleChange,
-            "right_ankle_change": joint_mobility.RightAnkleChange
-        }
+        return format_joint_mobility(cursor.fetchone())
     
     @staticmethod
     def get_device_status(cursor, patient_id: int) -> Optional[dict]:
@@ -707,63 +793,40 @@ class PatientService:
             ORDER BY CheckDate DESC
         """, patient_id)
         
-        device_status = cursor.fetchone()
-        if not device_status:
-            return None
-        
-        return {
-            "main_controller": device_status.MainController,
-            "drive_motor": device_status.DriveMotor,
-            "sensors": device_status.Sensors,
-            "battery_level": device_status.BatteryLevel,
-            "self_check": device_status.SelfCheck
-        }
+        return format_device_status(cursor.fetchone())
     
     @staticmethod
-    def get_training_records(cursor, patient_id: int) -> list:
-        """获取训练记录"""
-        cursor.execute("""
-            SELECT TrainingDate, Duration, Steps, PerformanceScore, ExerciseType, Notes
+    def get_training_records(cursor, patient_id: int, limit: int, after: Optional[str] = None) -> tuple:
+        """获取训练记录（按训练时间倒序，键集分页），返回 (记录, 下一页游标)"""
+        condition, params = keyset_condition(
+            TRAINING_RECORD_ORDER, decode_cursor(after, len(TRAINING_RECORD_ORDER))
+        )
+        cursor.execute(f"""
+            SELECT TOP (?) RecordID, TrainingDate, Duration, Steps, PerformanceScore, ExerciseType, Notes
             FROM TrainingRecords 
-            WHERE PatientID = ?
-            ORDER BY TrainingDate DESC
-        """, patient_id)
+            WHERE PatientID = ? AND {condition}
+            ORDER BY {order_by(TRAINING_RECORD_ORDER)}
+        """, top_rows(limit), patient_id, *params)
         
-        training_records = []
-        for record in cursor.fetchall():
-            training_records.append({
-                "training_date": record.TrainingDate.strftime("%Y-%m-%d %H:%M"),
-                "duration": record.Duration,
-                "steps": record.Steps,
-                "performance_score": record.PerformanceScore,
-                "exercise_type": record.ExerciseType,
-                "notes": record.Notes
-            })
-        
-        return training_records
+        page = make_page(cursor.fetchall(), limit, training_record_key)
+        return [format_training_record(record) for record in page.rows], page.next_cursor
     
     @staticmethod
-    def get_progress_history(cursor, patient_id: int) -> list:
-        """获取康复进度历史"""
-        cursor.execute("""
-            SELECT WeekNumber, OverallProgress, JointMobilityProgress, 
+    def get_progress_history(cursor, patient_id: int, limit: int, after: Optional[str] = None) -> tuple:
+        """获取康复进度历史（按周次正序，键集分页），返回 (记录, 下一页游标)"""
+        condition, params = keyset_condition(
+            PROGRESS_HISTORY_ORDER, decode_cursor(after, len(PROGRESS_HISTORY_ORDER))
+        )
+        cursor.execute(f"""
+            SELECT TOP (?) ProgressID, WeekNumber, OverallProgress, JointMobilityProgress, 
                    MuscleStrengthProgress, BalanceAbilityProgress
             FROM RehabilitationProgress 
-            WHERE PatientID = ?
-            ORDER BY WeekNumber
-        """, patient_id)
+            WHERE PatientID = ? AND {condition}
+            ORDER BY {order_by(PROGRESS_HISTORY_ORDER)}
+        """, top_rows(limit), patient_id, *params)
         
-        progress_history = []
-        for progress in cursor.fetchall():
-            progress_history.append({
-                "week_number": progress.WeekNumber,
-                "overall_progress": progress.OverallProgress,
-                "joint_mobility": progress.JointMobilityProgress,
-                "muscle_strength": progress.MuscleStrengthProgress,
-                "balance_ability": progress.BalanceAbilityProgress
-            })
-        
-        return progress_history
+        page = make_page(cursor.fetchall(), limit, lambda row: (row.WeekNumber, row.ProgressID))
+        return [format_progress(progress) for progress in page.rows], page.next_cursor
 
 # 在 main_api.py 中添加以下代码
 
@@ -809,6 +872,11 @@ async def get_monthly_training_plan(
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """获取月度训练计划和统计数据"""
+    if month is not None and not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="无效的月份")
+    return await db_manager.run(_get_monthly_training_plan, patient_id, year, month)
+
+def _get_monthly_training_plan(patient_id: int, year: int, month: int):
     try:
         if year is None:
             year = datetime.now().year
@@ -832,53 +900,8 @@ async def get_monthly_training_plan(
             
             plan = cursor.fetchone()
             
-            # 获取本月训练记录
-            cursor.execute("""
-                SELECT TrainingDate, ExerciseType as TrainingContent, 
-                       Duration, Steps, 
-                       CASE 
-                         WHEN PerformanceScore >= 80 THEN 'completed'
-                         WHEN PerformanceScore >= 60 THEN 'partial'
-                         ELSE 'pending'
-                       END as CompletionStatus
-                FROM TrainingRecords 
-                WHERE PatientID = ? 
-                  AND YEAR(TrainingDate) = ? 
-                  AND MONTH(TrainingDate) = ?
-                ORDER BY TrainingDate DESC
-            """, patient_id, year, month)
-            
-            training_records = []
-            for record in cursor.fetchall():
-                training_records.append({
-                    "training_date": record.TrainingDate.strftime("%Y-%m-%d") if record.TrainingDate else "",
-                    "training_content": record.TrainingContent or "康复训练",
-                    "duration": record.Duration or 0,
-                    "steps": record.Steps or 0,
-                    "completion_status": record.CompletionStatus or "pending"
-                })
-            
-            # 计算月度统计
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as TrainingCount,
-                    SUM(Duration) as TotalDuration,
-                    SUM(Steps) as TotalSteps,
-                    AVG(CASE WHEN PerformanceScore >= 80 THEN 1.0 ELSE 0.0 END) * 100 as CompletionRate
-                FROM TrainingRecords 
-                WHERE PatientID = ? 
-                  AND YEAR(TrainingDate) = ? 
-                  AND MONTH(TrainingDate) = ?
-            """, patient_id, year, month)
-            
-            stats = cursor.fetchone()
-            
-            monthly_stats = {
-                "training_count": stats.TrainingCount or 0,
-                "training_hours": round((stats.TotalDuration or 0) / 60, 1),
-                "total_steps": stats.TotalSteps or 0,
-                "completion_rate": round(stats.CompletionRate or 0, 1)
-            }
+            # 本月训练记录与统计（一次查询）
+            training_records, monthly_stats = fetch_monthly_training(cursor, patient_id, year, month)
             
             # 计算计划进度
             plan_progress = 0
@@ -0,0 +1,71 @@
+-- 患者列表汇总表：GET /api/patients 只读这一张表（见 patient_list.py）
+-- 由应用在患者/康复阶段写入时按行维护；本脚本建表、建索引并回填现有数据，可重复执行。
+-- RegisterDate 是默认排序键，键集分页的 "<" 比较无法处理 NULL，缺失的登记日期存为 1900-01-01（接口仍返回 null）。
+
+IF OBJECT_ID('dbo.PatientListSummary', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.PatientListSummary (
+        PatientID           INT            NOT NULL,
+        PatientCode         NVARCHAR(50)   NOT NULL,
+        Name                NVARCHAR(100)  NOT NULL,
+        Age                 INT            NULL,
+        Gender              NVARCHAR(10)   NULL,
+        RegisterDate        DATETIME       NOT NULL,
+        Status              NVARCHAR(20)   NULL,
+        Department          NVARCHAR(100)  NULL,
+        DoctorID            INT            NULL,
+        DoctorName          NVARCHAR(100)  NULL,
+        TrainingCount       INT            NOT NULL DEFAULT 0,
+        TotalTrainingHours  DECIMAL(10, 2) NOT NULL DEFAULT 0,
+        RecoveryProgress    INT            NOT NULL DEFAULT 0,
+        UpdatedAt           DATETIME       NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_PatientListSummary PRIMARY KEY NONCLUSTERED (PatientID)
+    );
+
+    -- 默认排序（登记日期倒序）直接按聚集索引顺序扫描
+    CREATE UNIQUE CLUSTERED INDEX CIX_PatientListSummary_RegisterDate
+        ON dbo.PatientListSummary (RegisterDate DESC, PatientID DESC);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_PatientListSummary_Name')
+    CREATE UNIQUE INDEX IX_PatientListSummary_Name
+        ON dbo.PatientListSummary (Name, PatientID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_PatientListSummary_RecoveryProgress')
+    CREATE UNIQUE INDEX IX_PatientListSummary_RecoveryProgress
+        ON dbo.PatientListSummary (RecoveryProgress, PatientID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_PatientListSummary_TrainingCount')
+    CREATE UNIQUE INDEX IX_PatientListSummary_TrainingCount
+        ON dbo.PatientListSummary (TrainingCount, PatientID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_PatientListSummary_Doctor')
+    CREATE UNIQUE INDEX IX_PatientListSummary_Doctor
+        ON dbo.PatientListSummary (DoctorID, RegisterDate DESC, PatientID DESC);
+GO
+
+-- 回填：一次聚合代替逐行子查询
+BEGIN TRANSACTION;
+
+DELETE FROM dbo.PatientListSummary WITH (TABLOCKX);
+
+INSERT INTO dbo.PatientListSummary (
+    PatientID, PatientCode, Name, Age, Gender, RegisterDate, Status, Department,
+    DoctorID, DoctorName, TrainingCount, TotalTrainingHours, RecoveryProgress
+)
+SELECT p.PatientID, p.PatientCode, p.Name, p.Age, p.Gender, ISNULL(p.RegisterDate, '19000101'), p.Status, p.Department,
+       p.DoctorID, u.FullName,
+       ISNULL(ps.TotalTrainingCount, 0),
+       ISNULL(ps.TotalTrainingHours, 0),
+       ISNULL(rs.RecoveryProgress, 0)
+FROM dbo.Patients p
+LEFT JOIN dbo.PatientSummary ps ON ps.PatientID = p.PatientID
+LEFT JOIN dbo.Users u ON u.UserID = p.DoctorID
+LEFT JOIN (
+    SELECT PatientID, MAX(CurrentProgress) AS RecoveryProgress
+    FROM dbo.RehabilitationStages
+    WHERE Status = 'active'
+    GROUP BY PatientID
+) rs ON rs.PatientID = p.PatientID
+WHERE p.Status != 'deleted';
+
+COMMIT TRANSACTION;
+GO
@@ -0,0 +1,14 @@
+-- TrainingRecords 按患者 + 训练时间的复合索引（见 training_stats.py）
+-- 月度统计按 [当月 1 日, 下月 1 日) 做范围查找；INCLUDE 的列覆盖该查询，不需要回表。
+-- 同一索引也服务于患者详情/训练记录分页的 ORDER BY TrainingDate DESC, RecordID DESC
+-- （RecordID 为聚集键，已隐含在非聚集索引的键尾部）。可重复执行。
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_TrainingRecords_PatientID_TrainingDate'
+      AND object_id = OBJECT_ID('dbo.TrainingRecords')
+)
+    CREATE INDEX IX_TrainingRecords_PatientID_TrainingDate
+        ON dbo.TrainingRecords (PatientID, TrainingDate)
+        INCLUDE (Duration, Steps, PerformanceScore, ExerciseType);
+GO
@@ -0,0 +1,158 @@
+-- 训练记录按日/按月汇总（见 training_rollups.py）
+-- TrainingRecords 由设备端直接写库，应用内没有写入口，因此由触发器在写入时增量维护汇总：
+-- inserted 中的行计 +1，deleted 中的行计 -1（UPDATE 两者都有），按 (患者, 日) / (患者, 月) 合并。
+-- 完成度分档与 training_stats 一致：PerformanceScore >= 80 completed，>= 60 partial，其余（含 NULL）pending。
+-- 本脚本建表、建触发器并回填现有数据，可重复执行。
+
+IF OBJECT_ID('dbo.TrainingDailyRollup', 'U') IS NULL
+    CREATE TABLE dbo.TrainingDailyRollup (
+        PatientID       INT            NOT NULL,
+        TrainingDay     DATE           NOT NULL,
+        TrainingCount   INT            NOT NULL DEFAULT 0,
+        TotalDuration   DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        TotalSteps      BIGINT         NOT NULL DEFAULT 0,
+        CompletedCount  INT            NOT NULL DEFAULT 0,
+        PartialCount    INT            NOT NULL DEFAULT 0,
+        PendingCount    INT            NOT NULL DEFAULT 0,
+        UpdatedAt       DATETIME       NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_TrainingDailyRollup PRIMARY KEY (PatientID, TrainingDay)
+    );
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_TrainingDailyRollup_TrainingDay')
+    CREATE INDEX IX_TrainingDailyRollup_TrainingDay
+        ON dbo.TrainingDailyRollup (TrainingDay)
+        INCLUDE (TrainingCount, CompletedCount);
+GO
+
+IF OBJECT_ID('dbo.TrainingMonthlyRollup', 'U') IS NULL
+    CREATE TABLE dbo.TrainingMonthlyRollup (
+        PatientID       INT            NOT NULL,
+        MonthStart      DATE           NOT NULL,
+        TrainingCount   INT            NOT NULL DEFAULT 0,
+        TotalDuration   DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        TotalSteps      BIGINT         NOT NULL DEFAULT 0,
+        CompletedCount  INT            NOT NULL DEFAULT 0,
+        PartialCount    INT            NOT NULL DEFAULT 0,
+        PendingCount    INT            NOT NULL DEFAULT 0,
+        UpdatedAt       DATETIME       NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_TrainingMonthlyRollup PRIMARY KEY (PatientID, MonthStart)
+    );
+GO
+
+CREATE OR ALTER TRIGGER dbo.TR_TrainingRecords_Rollup
+ON dbo.TrainingRecords
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    IF NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM deleted)
+        RETURN;
+
+    DECLARE @Delta TABLE (
+        PatientID       INT            NOT NULL,
+        TrainingDay     DATE           NOT NULL,
+        TrainingCount   INT            NOT NULL,
+        TotalDuration   DECIMAL(18, 2) NOT NULL,
+        TotalSteps      BIGINT         NOT NULL,
+        CompletedCount  INT            NOT NULL,
+        PartialCount    INT            NOT NULL,
+        PendingCount    INT            NOT NULL,
+        PRIMARY KEY (PatientID, TrainingDay)
+    );
+
+    INSERT INTO @Delta
+    SELECT PatientID, TrainingDay,
+           SUM(Sign),
+           SUM(Sign * ISNULL(Duration, 0)),
+           SUM(Sign * CAST(ISNULL(Steps, 0) AS BIGINT)),
+           SUM(CASE WHEN PerformanceScore >= 80 THEN Sign ELSE 0 END),
+           SUM(CASE WHEN PerformanceScore >= 60 AND PerformanceScore < 80 THEN Sign ELSE 0 END),
+           SUM(CASE WHEN PerformanceScore IS NULL OR PerformanceScore < 60 THEN Sign ELSE 0 END)
+    FROM (
+        SELECT PatientID, CAST(TrainingDate AS DATE) AS TrainingDay, Duration, Steps, PerformanceScore, 1 AS Sign
+        FROM inserted WHERE TrainingDate IS NOT NULL
+        UNION ALL
+        SELECT PatientID, CAST(TrainingDate AS DATE), Duration, Steps, PerformanceScore, -1
+        FROM deleted WHERE TrainingDate IS NOT NULL
+    ) d
+    GROUP BY PatientID, TrainingDay;
+
+    MERGE dbo.TrainingDailyRollup WITH (HOLDLOCK) AS t
+    USING @Delta AS s
+    ON t.PatientID = s.PatientID AND t.TrainingDay = s.TrainingDay
+    WHEN MATCHED THEN UPDATE SET
+        TrainingCount = t.TrainingCount + s.TrainingCount,
+        TotalDuration = t.TotalDuration + s.TotalDuration,
+        TotalSteps = t.TotalSteps + s.TotalSteps,
+        CompletedCount = t.CompletedCount + s.CompletedCount,
+        PartialCount = t.PartialCount + s.PartialCount,
+        PendingCount = t.PendingCount + s.PendingCount,
+        UpdatedAt = GETDATE()
+    WHEN NOT MATCHED THEN INSERT (
+        PatientID, TrainingDay, TrainingCount, TotalDuration, TotalSteps,
+        CompletedCount, PartialCount, PendingCount
+    ) VALUES (
+        s.PatientID, s.TrainingDay, s.TrainingCount, s.TotalDuration, s.TotalSteps,
+        s.CompletedCount, s.PartialCount, s.PendingCount
+    );
+
+    MERGE dbo.TrainingMonthlyRollup WITH (HOLDLOCK) AS t
+    USING (
+        SELECT PatientID, DATEFROMPARTS(YEAR(TrainingDay), MONTH(TrainingDay), 1) AS MonthStart,
+               SUM(TrainingCount) AS TrainingCount, SUM(TotalDuration) AS TotalDuration,
+               SUM(TotalSteps) AS TotalSteps, SUM(CompletedCount) AS CompletedCount,
+               SUM(PartialCount) AS PartialCount, SUM(PendingCount) AS PendingCount
+        FROM @Delta
+        GROUP BY PatientID, DATEFROMPARTS(YEAR(TrainingDay), MONTH(TrainingDay), 1)
+    ) AS s
+    ON t.PatientID = s.PatientID AND t.MonthStart = s.MonthStart
+    WHEN MATCHED THEN UPDATE SET
+        TrainingCount = t.TrainingCount + s.TrainingCount,
+        TotalDuration = t.TotalDuration + s.TotalDuration,
+        TotalSteps = t.TotalSteps + s.TotalSteps,
+        CompletedCount = t.CompletedCount + s.CompletedCount,
+        PartialCount = t.PartialCount + s.PartialCount,
+        PendingCount = t.PendingCount + s.PendingCount,
+        UpdatedAt = GETDATE()
+    WHEN NOT MATCHED THEN INSERT (
+        PatientID, MonthStart, TrainingCount, TotalDuration, TotalSteps,
+        CompletedCount, PartialCount, PendingCount
+    ) VALUES (
+        s.PatientID, s.MonthStart, s.TrainingCount, s.TotalDuration, s.TotalSteps,
+        s.CompletedCount, s.PartialCount, s.PendingCount
+    );
+END
+GO
+
+-- 回填：与定期压缩相同的全量重算（training_rollups.COMPACT_ROLLUPS_SQL，@Since 取最早日期）
+BEGIN TRANSACTION;
+
+DELETE FROM dbo.TrainingDailyRollup WITH (TABLOCKX);
+DELETE FROM dbo.TrainingMonthlyRollup WITH (TABLOCKX);
+
+INSERT INTO dbo.TrainingDailyRollup (
+    PatientID, TrainingDay, TrainingCount, TotalDuration, TotalSteps,
+    CompletedCount, PartialCount, PendingCount
+)
+SELECT PatientID, CAST(TrainingDate AS DATE), COUNT(*),
+       ISNULL(SUM(Duration), 0), ISNULL(SUM(CAST(Steps AS BIGINT)), 0),
+       SUM(CASE WHEN PerformanceScore >= 80 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN PerformanceScore >= 60 AND PerformanceScore < 80 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN PerformanceScore IS NULL OR PerformanceScore < 60 THEN 1 ELSE 0 END)
+FROM dbo.TrainingRecords
+WHERE TrainingDate IS NOT NULL
+GROUP BY PatientID, CAST(TrainingDate AS DATE);
+
+INSERT INTO dbo.TrainingMonthlyRollup (
+    PatientID, MonthStart, TrainingCount, TotalDuration, TotalSteps,
+    CompletedCount, PartialCount, PendingCount
+)
+SELECT PatientID, DATEFROMPARTS(YEAR(TrainingDay), MONTH(TrainingDay), 1),
+       SUM(TrainingCount), SUM(TotalDuration), SUM(TotalSteps),
+       SUM(CompletedCount), SUM(PartialCount), SUM(PendingCount)
+FROM dbo.TrainingDailyRollup
+GROUP BY PatientID, DATEFROMPARTS(YEAR(TrainingDay), MONTH(TrainingDay), 1);
+
+COMMIT TRANSACTION;
+GO
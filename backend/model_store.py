@@ -0,0 +1,283 @@
+"""
+康复模型的共享权重存储与轻量级前向推理。
+
+已发布的 Dense 模型权重从 .h5 中提取一次，打包为只读的扁平 float32 文件，
+各 uvicorn worker 通过 np.memmap 只读映射同一份文件，权重页由操作系统页缓存共享，
+增加 worker 不会成倍增加权重内存。推理使用 NumPy 完成，不经过 TensorFlow。
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 打包文件格式: MAGIC(8) + 头部长度(uint64) + JSON头部 + 按 ALIGNMENT 对齐的 float32 数据
+MAGIC = b"RHWTS001"
+ALIGNMENT = 64
+SUPPORTED_ACTIVATIONS = ("linear", "relu", "softmax", "sigmoid", "tanh")
+# 推理时忽略的层（推理期为恒等变换）
+PASSTHROUGH_LAYERS = ("InputLayer", "Dropout")
+# 单次前向的最大行数，更大的批次按块处理（缓冲区按此上限预分配）
+MAX_BATCH_ROWS = 4096
+
+
+class UnsupportedModelError(ValueError):
+    """模型包含 NumPy 推理不支持的层，调用方应回退到 Keras"""
+
+
+def _decode(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def read_dense_layers(h5_path: str) -> List[Dict]:
+    """
+    从 Keras .h5 文件中读取 Dense 层权重（依赖 h5py）。
+    返回 [{'name', 'activation', 'kernel', 'bias'}...]，按前向顺序排列。
+    """
+    import h5py
+
+    layers = []
+    with h5py.File(h5_path, "r") as f:
+        model_config = f.attrs.get("model_config")
+        if model_config is None:
+            raise UnsupportedModelError(f"{h5_path} 中没有 model_config")
+        config = json.loads(_decode(model_config))
+        weights_root = f["model_weights"] if "model_weights" in f else f
+
+        for layer in config.get("config", {}).get("layers", []):
+            class_name = layer.get("class_name")
+            layer_config = layer.get("config", {})
+            if class_name in PASSTHROUGH_LAYERS:
+                continue
+            if class_name != "Dense":
+                raise UnsupportedModelError(f"不支持的层类型: {class_name}")
+
+            activation = layer_config.get("activation", "linear")
+            if activation not in SUPPORTED_ACTIVATIONS:
+                raise UnsupportedModelError(f"不支持的激活函数: {activation}")
+
+            group = weights_root[layer_config["name"]]
+            arrays = [np.asarray(group[_decode(n)], dtype=np.float32)
+                      for n in group.attrs.get("weight_names", [])]
+            kernel = next((a for a in arrays if a.ndim == 2), None)
+            bias = next((a for a in arrays if a.ndim == 1), None)
+            if kernel is None:
+                raise UnsupportedModelError(f"层 {layer_config['name']} 缺少权重")
+            if bias is None:
+                bias = np.zeros(kernel.shape[1], dtype=np.float32)
+
+            layers.append({
+                "name": layer_config["name"],
+                "activation": activation,
+                "kernel": kernel,
+                "bias": bias,
+            })
+
+    if not layers:
+        raise UnsupportedModelError(f"{h5_path} 中没有 Dense 层")
+    return layers
+
+
+def _aligned(n: int) -> int:
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def pack_dense_layers(layers: List[Dict], out_path: str):
+    """将 Dense 层权重打包为单个只读文件（原子写入，多 worker 并发构建安全）"""
+    header_layers = []
+    offset = 0  # 以 float32 元素计
+    for layer in layers:
+        entry = {"name": layer["name"], "activation": layer["activation"]}
+        for key in ("kernel", "bias"):
+            arr = layer[key]
+            entry[key] = {"offset": offset, "shape": list(arr.shape)}
+            offset += _aligned(arr.size)
+        header_layers.append(entry)
+
+    header = json.dumps({"layers": header_layers, "total": offset}).encode("utf-8")
+    prefix_len = len(MAGIC) + 8 + len(header)
+    data_start = _aligned(prefix_len)
+
+    buffer = np.zeros(offset, dtype=np.float32)
+    for layer, entry in zip(layers, header_layers):
+        for key in ("kernel", "bias"):
+            arr = np.ascontiguousarray(layer[key], dtype=np.float32).ravel()
+            start = entry[key]["offset"]
+            buffer[start:start + arr.size] = arr
+
+    out_dir = os.path.dirname(out_path)
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(b"\0" * (data_start - prefix_len))
+            f.write(buffer.tobytes())
+        os.replace(tmp_path, out_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class DenseNumpyModel:
+    """
+    基于只读内存映射权重的 Dense 前向推理。
+    对外提供与 Keras 模型一致的 input_shape / output_shape / predict 接口，
+    可直接替换 predict_exercise 中使用的 Keras 模型。
+
+    每层的 matmul、偏置与激活都写入同一块预分配缓冲区（每线程一组，按需增长到
+    max_batch_rows），热路径上除输出数组外不再分配内存；超过 max_batch_rows 的批次按块计算。
+    """
+
+    def __init__(self, packed_path: str, max_batch_rows: int = MAX_BATCH_ROWS):
+        with open(packed_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"无效的权重文件: {packed_path}")
+            header_len = struct.unpack("<Q", f.read(8))[0]
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        data_start = _aligned(len(MAGIC) + 8 + header_len)
+
+        self.packed_path = packed_path
+        self.max_batch_rows = max_batch_rows
+        self._data = np.memmap(packed_path, dtype=np.float32, mode="r",
+                               offset=data_start, shape=(header["total"],))
+        self.layers: List[Tuple[np.ndarray, np.ndarray, str]] = []
+        for entry in header["layers"]:
+            kernel = self._view(entry["kernel"])
+            bias = self._view(entry["bias"])
+            self.layers.append((kernel, bias, entry["activation"]))
+
+        self.input_shape = (None, self.layers[0][0].shape[0])
+        self.output_shape = (None, self.layers[-1][0].shape[1])
+        self._workspaces = threading.local()
+
+    def _view(self, spec: Dict) -> np.ndarray:
+        start = spec["offset"]
+        size = int(np.prod(spec["shape"]))
+        # np.asarray 去掉 memmap 子类（不复制），避免运算结果也带上 memmap 类型
+        return np.asarray(self._data[start:start + size]).reshape(spec["shape"])
+
+    def _workspace(self, rows: int) -> List[np.ndarray]:
+        """当前线程的各层输出缓冲区，行数不足时扩容"""
+        buffers = getattr(self._workspaces, "buffers", None)
+        if buffers is None or buffers[0].shape[0] < rows:
+            buffers = [np.empty((rows, kernel.shape[1]), dtype=np.float32)
+                       for kernel, _, _ in self.layers]
+            self._workspaces.buffers = buffers
+        return buffers
+
+    def predict(self, x, verbose=0, batch_size=None) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        n = x.shape[0]
+        chunk = max(1, min(batch_size or self.max_batch_rows, self.max_batch_rows, n))
+        buffers = self._workspace(chunk)
+        output = np.empty((n, self.output_shape[1]), dtype=np.float32)
+
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            h = x[start:stop]
+            for (kernel, bias, activation), buffer in zip(self.layers, buffers):
+                y = buffer[:stop - start]
+                np.matmul(h, kernel, out=y)
+                y += bias
+                h = _apply_activation(y, activation)
+            output[start:stop] = h
+        return output
+
+    __call__ = predict
+
+
+def _apply_activation(x: np.ndarray, activation: str) -> np.ndarray:
+    if activation == "relu":
+        np.maximum(x, 0.0, out=x)
+    elif activation == "softmax":
+        x -= x.max(axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=1, keepdims=True)
+    elif activation == "sigmoid":
+        np.negative(x, out=x)
+        np.exp(x, out=x)
+        x += 1.0
+        np.reciprocal(x, out=x)
+    elif activation == "tanh":
+        np.tanh(x, out=x)
+    return x
+
+
+class SharedModelPool:
+    """
+    每个 worker 进程内的模型预热池。
+    同一模型文件只打包一次（跨 worker 共享打包文件），每个进程只映射一次。
+    不支持 NumPy 推理的模型（如时序卷积模型）回退到 fallback_loader（通常为 Keras）。
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self._models: Dict[Tuple[str, int], object] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _packed_prefix(model_path: str) -> str:
+        abs_path = os.path.abspath(model_path)
+        digest = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:12]
+        return f"{os.path.splitext(os.path.basename(abs_path))[0]}-{digest}."
+
+    def _packed_path(self, model_path: str, mtime_ns: int) -> str:
+        return os.path.join(self.cache_dir, f"{self._packed_prefix(model_path)}{mtime_ns}.bin")
+
+    def get(self, model_path: str, fallback_loader=None):
+        """获取模型；文件更新（mtime 变化）后自动重新映射"""
+        mtime_ns = os.stat(model_path).st_mtime_ns
+        key = (os.path.abspath(model_path), mtime_ns)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+            model = self._load(model_path, mtime_ns, fallback_loader)
+            if model is None:
+                return None
+            # 移除同一路径的旧版本
+            for old_key in [k for k in self._models if k[0] == key[0]]:
+                del self._models[old_key]
+            self._models[key] = model
+            return model
+
+    def _load(self, model_path: str, mtime_ns: int, fallback_loader):
+        packed_path = self._packed_path(model_path, mtime_ns)
+        try:
+            if not os.path.exists(packed_path):
+                pack_dense_layers(read_dense_layers(model_path), packed_path)
+            return DenseNumpyModel(packed_path)
+        except UnsupportedModelError as e:
+            print(f"模型不支持共享权重推理，回退到Keras: {e}")
+        except Exception as e:
+            print(f"共享权重加载失败，回退到Keras: {e}")
+        return fallback_loader(model_path) if fallback_loader else None
+
+    def invalidate(self, model_path: str):
+        """删除模型时清理映射与打包文件"""
+        abs_path = os.path.abspath(model_path)
+        with self._lock:
+            for key in [k for k in self._models if k[0] == abs_path]:
+                del self._models[key]
+        prefix = self._packed_prefix(model_path)
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix):
+                    try:
+                        os.unlink(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
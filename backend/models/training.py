@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DECIMAL, Text, ForeignKey, DateTime
+from sqlalchemy import BigInteger, Column, Integer, String, Date, DECIMAL, Text, ForeignKey, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -17,6 +17,20 @@ class TrainingRecord(Base):
     min_speed = Column(DECIMAL(5, 2))
     created_at = Column(DateTime, server_default=func.now())
 
+class TrainingDailyRollup(Base):
+    """训练记录按日汇总（由 TrainingRecords 触发器维护，见 migrations/003_training_rollups.sql）"""
+    __tablename__ = "TrainingDailyRollup"
+    
+    patient_id = Column("PatientID", Integer, primary_key=True)
+    training_day = Column("TrainingDay", Date, primary_key=True)
+    training_count = Column("TrainingCount", Integer, nullable=False, default=0)
+    total_duration = Column("TotalDuration", DECIMAL(18, 2), nullable=False, default=0)
+    total_steps = Column("TotalSteps", BigInteger, nullable=False, default=0)
+    completed_count = Column("CompletedCount", Integer, nullable=False, default=0)
+    partial_count = Column("PartialCount", Integer, nullable=False, default=0)
+    pending_count = Column("PendingCount", Integer, nullable=False, default=0)
+    updated_at = Column("UpdatedAt", DateTime, server_default=func.now())
+
 class JointMobilityRecord(Base):
     __tablename__ = "JointMobilityRecords"
     
@@ -73,4 +87,7 @@ class DailyReminder(Base):
     description = Column(Text)
     reminder_time = Column(DateTime)
     is_completed = Column(Integer, default=0)
-    created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+    
+    # 关系
+    patient = relationship("Patient")
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+键集（游标）分页。
+
+列表接口接受 limit / after 两个查询参数：after 是上一页返回的游标（最后一行排序键的编码），
+查询用 "排序键在游标之后" 的条件加 TOP (limit + 1) 取下一页，多取的一行只用来判断是否还有下一页。
+与 OFFSET 不同，翻到第 N 页的代价不随 N 增长，只要排序列上有索引。
+
+不传 limit 时按 API_PAGE_SIZE 分页，单次请求的耗时不随历史记录增长。
+响应体仍是列表，下一页游标放在 X-Next-Cursor 响应头中，没有下一页时不返回该头；
+需要全部记录的页面用前端 common.js 的 fetchAllPages 跟随游标逐页获取。
+"""
+import base64
+import json
+import os
+from datetime import date, datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+DEFAULT_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page:
+    def __init__(self, rows: List, next_cursor: Optional[str]):
+        self.rows = rows
+        self.next_cursor = next_cursor
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def top_rows(limit: int) -> int:
+    """TOP (?) 的参数：多取一行用于判断是否还有下一页"""
+    return limit + 1
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """解析游标；格式不对时返回 400"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(v) for v in json.loads(raw)]
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    return values
+
+
+def keyset_condition(order: Sequence[Tuple[str, str]], after: Optional[list]) -> Tuple[str, list]:
+    """
+    order 形如 [("RegisterDate", "DESC"), ("PatientID", "DESC")]，最后一列须唯一。
+    返回 "排序在游标之后" 的 WHERE 片段与参数（SQL Server 不支持行值比较，按列展开）。
+    """
+    if after is None:
+        return "1 = 1", []
+    clauses, params = [], []
+    for i, (column, direction) in enumerate(order):
+        op = "<" if direction.upper() == "DESC" else ">"
+        parts = [f"{c} = ?" for c, _ in order[:i]] + [f"{column} {op} ?"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(after[:i] + [after[i]])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def order_by(order: Sequence[Tuple[str, str]]) -> str:
+    return ", ".join(f"{column} {direction}" for column, direction in order)
+
+
+def make_page(rows: List, limit: int, key: Callable) -> Page:
+    """rows 为按 TOP (top_rows(limit)) 取回的行"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return Page(rows, encode_cursor(key(rows[-1])))
+    return Page(rows, None)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
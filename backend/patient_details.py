@@ -0,0 +1,248 @@
+"""
+患者详情：一次往返取回 GET /api/patients/{id} 需要的全部数据。
+
+PATIENT_DETAILS_SQL 是一个 T-SQL 批处理，先在需要时补建 PatientSummary（同时刷新患者列表行），
+然后按 PATIENT_DETAIL_SECTIONS 的顺序返回多个结果集，客户端用 cursor.nextset() 依次读取。
+原实现对同一游标顺序执行 8~12 条查询，每条都是一次网络往返。
+
+训练记录只返回最近 PATIENT_DETAIL_RECORDS 条，更早的记录用 training_records_next_cursor
+通过 GET /api/patients/{id}/training-records 继续翻页。
+
+训练次数/时长/步数取自按月汇总表（见 training_rollups.py），不再对 TrainingRecords 求和。
+
+各部分的格式化函数同时供 main_api.PatientService 的单项查询使用，保证两条路径输出一致。
+"""
+import os
+from typing import Optional
+
+from pagination import make_page
+from patient_list import PATIENT_LIST_REFRESH_SQL
+
+PATIENT_DETAIL_RECORDS = int(os.getenv("PATIENT_DETAIL_RECORDS", "50"))
+
+TRAINING_RECORD_ORDER = [("TrainingDate", "DESC"), ("RecordID", "DESC")]
+
+PATIENT_DETAILS_SQL = f"""
+SET NOCOUNT ON;
+DECLARE @PatientID INT = ?;
+DECLARE @RecordsLimit INT = ?;
+
+IF EXISTS (SELECT 1 FROM Patients WHERE PatientID = @PatientID)
+   AND NOT EXISTS (SELECT 1 FROM PatientSummary WHERE PatientID = @PatientID)
+BEGIN
+    INSERT INTO PatientSummary (
+        PatientID, TotalTrainingHours, TotalTrainingCount, TotalSteps,
+        OverallProgress, JointMobilityProgress, MuscleStrengthProgress, BalanceAbilityProgress
+    )
+    SELECT @PatientID, ISNULL(t.TotalDuration, 0) / 60.0, t.TrainingCount, ISNULL(t.TotalSteps, 0),
+           ISNULL(j.JointProgress, 0), ISNULL(j.JointProgress, 0), 0, 0
+    FROM (
+        SELECT ISNULL(SUM(TrainingCount), 0) AS TrainingCount, SUM(TotalDuration) AS TotalDuration, SUM(TotalSteps) AS TotalSteps
+        FROM TrainingMonthlyRollup WHERE PatientID = @PatientID
+    ) t
+    OUTER APPLY (
+        SELECT TOP 1 CAST((LeftHip + RightHip + LeftKnee + RightKnee + LeftAnkle + RightAnkle) / 6.0 AS INT) AS JointProgress
+        FROM JointMobilityRecords WHERE PatientID = @PatientID
+        ORDER BY RecordDate DESC
+    ) j;
+{PATIENT_LIST_REFRESH_SQL}
+END
+
+SELECT p.*, u.FullName as DoctorName
+FROM Patients p
+LEFT JOIN Users u ON p.DoctorID = u.UserID
+WHERE p.PatientID = @PatientID;
+
+SELECT TotalTrainingHours, TotalTrainingCount, TotalSteps,
+       OverallProgress, JointMobilityProgress,
+       MuscleStrengthProgress, BalanceAbilityProgress,
+       LastUpdated
+FROM PatientSummary
+WHERE PatientID = @PatientID;
+
+SELECT ISNULL(SUM(TrainingCount), 0) as TrainingCount,
+       SUM(TotalDuration) as TotalDuration,
+       SUM(TotalSteps) as TotalSteps
+FROM TrainingMonthlyRollup
+WHERE PatientID = @PatientID;
+
+SELECT TOP 1 StageName, CurrentProgress, StartDate, EndDate, TargetGoals,
+       WeeksCompleted, WeeksRemaining, WeeklyFocus, TrainingIntensity, NextEvaluationDate
+FROM RehabilitationStages
+WHERE PatientID = @PatientID AND Status = 'active'
+ORDER BY StageNumber DESC;
+
+SELECT TOP 1 LeftHip, RightHip, LeftKnee, RightKnee, LeftAnkle, RightAnkle,
+       LeftHipChange, RightHipChange, LeftKneeChange, RightKneeChange,
+       LeftAnkleChange, RightAnkleChange
+FROM JointMobilityRecords
+WHERE PatientID = @PatientID
+ORDER BY RecordDate DESC;
+
+SELECT TOP 1 MainController, DriveMotor, Sensors, BatteryLevel, SelfCheck
+FROM DeviceStatus
+WHERE PatientID = @PatientID
+ORDER BY CheckDate DESC;
+
+SELECT TOP (@RecordsLimit + 1) RecordID, TrainingDate, Duration, Steps, PerformanceScore, ExerciseType, Notes
+FROM TrainingRecords
+WHERE PatientID = @PatientID
+ORDER BY TrainingDate DESC, RecordID DESC;
+
+SELECT WeekNumber, OverallProgress, JointMobilityProgress,
+       MuscleStrengthProgress, BalanceAbilityProgress
+FROM RehabilitationProgress
+WHERE PatientID = @PatientID
+ORDER BY WeekNumber;
+"""
+
+
+def format_patient_info(patient) -> dict:
+    return {
+        "name": patient.Name,
+        "patient_code": patient.PatientCode,
+        "age": patient.Age,
+        "gender": patient.Gender,
+        "register_date": patient.RegisterDate.strftime("%Y-%m-%d"),
+        "doctor_name": patient.DoctorName,
+        "department": patient.Department,
+        "medical_history": patient.MedicalHistory
+    }
+
+
+def format_patient_summary(patient_summary) -> dict:
+    return {
+        "total_training_count": patient_summary.TotalTrainingCount,
+        "total_training_hours": float(patient_summary.TotalTrainingHours),
+        "total_steps": patient_summary.TotalSteps,
+        "overall_progress": patient_summary.OverallProgress,
+        "joint_mobility_progress": patient_summary.JointMobilityProgress,
+        "muscle_strength_progress": patient_summary.MuscleStrengthProgress,
+        "balance_ability_progress": patient_summary.BalanceAbilityProgress,
+        "last_updated": patient_summary.LastUpdated.strftime("%Y-%m-%d %H:%M")
+    }
+
+
+def format_current_stage(stage) -> Optional[dict]:
+    if not stage:
+        return None
+    return {
+        "stage_name": stage.StageName,
+        "progress": stage.CurrentProgress,
+        "start_date": stage.StartDate.strftime("%Y-%m-%d") if stage.StartDate else None,
+        "end_date": stage.EndDate.strftime("%Y-%m-%d") if stage.EndDate else None,
+        "target_goals": stage.TargetGoals,
+        "weeks_completed": stage.WeeksCompleted,
+        "weeks_remaining": stage.WeeksRemaining,
+        "weekly_focus": stage.WeeklyFocus,
+        "training_intensity": stage.TrainingIntensity,
+        "next_evaluation_date": stage.NextEvaluationDate.strftime("%Y-%m-%d") if stage.NextEvaluationDate else None
+    }
+
+
+def format_training_stats(stats) -> dict:
+    return {
+        "training_count": stats.TrainingCount or 0,
+        "total_duration": f"{(stats.TotalDuration or 0) / 60:.1f}",
+        "total_steps": stats.TotalSteps or 0
+    }
+
+
+def format_joint_mobility(joint_mobility) -> Optional[dict]:
+    if not joint_mobility:
+        return None
+    return {
+        "left_hip": joint_mobility.LeftHip,
+        "right_hip": joint_mobility.RightHip,
+        "left_knee": joint_mobility.LeftKnee,
+        "right_knee": joint_mobility.RightKnee,
+        "left_ankle": joint_mobility.LeftAnkle,
+        "right_ankle": joint_mobility.RightAnkle,
+        "left_hip_change": joint_mobility.LeftHipChange,
+        "right_hip_change": joint_mobility.RightHipChange,
+        "left_knee_change": joint_mobility.LeftKneeChange,
+        "right_knee_change": joint_mobility.RightKneeChange,
+        "left_ankle_change": joint_mobility.LeftAnkleChange,
+        "right_ankle_change": joint_mobility.RightAnkleChange
+    }
+
+
+def format_device_status(device_status) -> Optional[dict]:
+    if not device_status:
+        return None
+    return {
+        "main_controller": device_status.MainController,
+        "drive_motor": device_status.DriveMotor,
+        "sensors": device_status.Sensors,
+        "battery_level": device_status.BatteryLevel,
+        "self_check": device_status.SelfCheck
+    }
+
+
+def format_training_record(record) -> dict:
+    return {
+        "training_date": record.TrainingDate.strftime("%Y-%m-%d %H:%M"),
+        "duration": record.Duration,
+        "steps": record.Steps,
+        "performance_score": record.PerformanceScore,
+        "exercise_type": record.ExerciseType,
+        "notes": record.Notes
+    }
+
+
+def training_record_key(record) -> tuple:
+    return record.TrainingDate, record.RecordID
+
+
+def format_progress(progress) -> dict:
+    return {
+        "week_number": progress.WeekNumber,
+        "overall_progress": progress.OverallProgress,
+        "joint_mobility": progress.JointMobilityProgress,
+        "muscle_strength": progress.MuscleStrengthProgress,
+        "balance_ability": progress.BalanceAbilityProgress
+    }
+
+
+# 结果集顺序（患者基本信息之后）：(返回字段, 取一行/全部/一页, 格式化函数)
+PATIENT_DETAIL_SECTIONS = [
+    ("patient_summary", "one", format_patient_summary),
+    ("training_stats", "one", format_training_stats),
+    ("current_stage", "one", format_current_stage),
+    ("joint_mobility", "one", format_joint_mobility),
+    ("device_status", "one", format_device_status),
+    ("training_records", "page", format_training_record),
+    ("progress_history", "all", format_progress),
+]
+
+
+def read_patient_details(cursor) -> Optional[dict]:
+    """读取已执行的 PATIENT_DETAILS_SQL 的全部结果集；患者不存在时返回 None"""
+    patient = cursor.fetchone()
+    if not patient:
+        return None
+
+    details = {"patient_info": format_patient_info(patient)}
+    for key, fetch, formatter in PATIENT_DETAIL_SECTIONS:
+        if not cursor.nextset():
+            raise RuntimeError(f"患者详情查询缺少结果集: {key}")
+        read_section(cursor, details, key, fetch, formatter)
+    return details
+
+
+def read_section(cursor, details: dict, key: str, fetch: str, formatter):
+    """读取当前结果集到 details[key]；分页部分另写 details[key + "_next_cursor"]"""
+    if fetch == "one":
+        details[key] = formatter(cursor.fetchone())
+    elif fetch == "page":
+        page = make_page(cursor.fetchall(), PATIENT_DETAIL_RECORDS, training_record_key)
+        details[key] = [formatter(row) for row in page.rows]
+        details[f"{key}_next_cursor"] = page.next_cursor
+    else:
+        details[key] = [formatter(row) for row in cursor.fetchall()]
+
+
+def fetch_patient_details(cursor, patient_id: int) -> Optional[dict]:
+    """一次往返执行批处理并读取全部结果集"""
+    cursor.execute(PATIENT_DETAILS_SQL, patient_id, PATIENT_DETAIL_RECORDS)
+    return read_patient_details(cursor)
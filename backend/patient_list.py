@@ -0,0 +1,132 @@
+"""
+患者列表：GET /api/patients 从预先维护的 PatientListSummary 表读取。
+
+原查询每行都执行一次相关子查询 SELECT MAX(CurrentProgress) FROM RehabilitationStages，
+再联接 PatientSummary 与 Users。现在这些值在写入时算好：
+- 患者新增/修改/删除、康复阶段新增/修改/删除、补建 PatientSummary 时，
+  在同一事务内调用 refresh_patient_list* 重算该患者的一行
+- 已删除的患者不在表中，列表查询不需要再过滤 Status
+- RegisterDate 为默认排序键，不能为 NULL（键集分页按 "<" 比较），缺失时存为 MISSING_REGISTER_DATE
+- 表结构、索引与初始数据见 migrations/001_patient_list_summary.sql
+
+列表查询只访问这一张表，按排序列上的索引做一次范围扫描（配合键集分页）。
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+
+# 缺失的登记日期在汇总表中的取值，排在倒序列表最后；接口返回 null
+MISSING_REGISTER_DATE = datetime(1900, 1, 1)
+
+# 重算 @PatientID 对应的一行（调用方先声明 @PatientID）
+PATIENT_LIST_REFRESH_SQL = """
+DELETE FROM PatientListSummary
+WHERE PatientID = @PatientID
+  AND NOT EXISTS (SELECT 1 FROM Patients WHERE PatientID = @PatientID AND Status != 'deleted');
+
+MERGE PatientListSummary WITH (HOLDLOCK) AS t
+USING (
+    SELECT p.PatientID, p.PatientCode, p.Name, p.Age, p.Gender, ISNULL(p.RegisterDate, '19000101') AS RegisterDate,
+           p.Status, p.Department, p.DoctorID, u.FullName AS DoctorName,
+           ISNULL(ps.TotalTrainingCount, 0) AS TrainingCount,
+           ISNULL(ps.TotalTrainingHours, 0) AS TotalTrainingHours,
+           ISNULL(rs.RecoveryProgress, 0) AS RecoveryProgress
+    FROM Patients p
+    LEFT JOIN PatientSummary ps ON ps.PatientID = p.PatientID
+    LEFT JOIN Users u ON u.UserID = p.DoctorID
+    OUTER APPLY (
+        SELECT MAX(CurrentProgress) AS RecoveryProgress
+        FROM RehabilitationStages
+        WHERE PatientID = p.PatientID AND Status = 'active'
+    ) rs
+    WHERE p.PatientID = @PatientID AND p.Status != 'deleted'
+) AS s
+ON t.PatientID = s.PatientID
+WHEN MATCHED THEN UPDATE SET
+    PatientCode = s.PatientCode, Name = s.Name, Age = s.Age, Gender = s.Gender,
+    RegisterDate = s.RegisterDate, Status = s.Status, Department = s.Department,
+    DoctorID = s.DoctorID, DoctorName = s.DoctorName, TrainingCount = s.TrainingCount,
+    TotalTrainingHours = s.TotalTrainingHours, RecoveryProgress = s.RecoveryProgress,
+    UpdatedAt = GETDATE()
+WHEN NOT MATCHED THEN INSERT (
+    PatientID, PatientCode, Name, Age, Gender, RegisterDate, Status, Department,
+    DoctorID, DoctorName, TrainingCount, TotalTrainingHours, RecoveryProgress, UpdatedAt
+) VALUES (
+    s.PatientID, s.PatientCode, s.Name, s.Age, s.Gender, s.RegisterDate, s.Status, s.Department,
+    s.DoctorID, s.DoctorName, s.TrainingCount, s.TotalTrainingHours, s.RecoveryProgress, GETDATE()
+);
+"""
+
+# 排序参数 -> 列；每种排序都以 PatientID 作为唯一的第二排序键
+PATIENT_LIST_SORTS = {
+    "register_date": "RegisterDate",
+    "name": "Name",
+    "recovery_progress": "RecoveryProgress",
+    "training_count": "TrainingCount",
+}
+
+
+def refresh_patient_list(cursor, patient_id: int):
+    """重算一个患者的列表行；与触发它的写操作在同一事务内提交"""
+    cursor.execute("SET NOCOUNT ON; DECLARE @PatientID INT = ?;" + PATIENT_LIST_REFRESH_SQL, patient_id)
+
+
+def refresh_patient_list_for_stage(cursor, stage_id: int):
+    """按康复阶段 ID 重算其所属患者的列表行"""
+    cursor.execute(
+        "SET NOCOUNT ON; DECLARE @PatientID INT = (SELECT PatientID FROM RehabilitationStages WHERE StageID = ?);"
+        + PATIENT_LIST_REFRESH_SQL,
+        stage_id
+    )
+
+
+def patient_list_order(sort: str, order: str) -> List[Tuple[str, str]]:
+    column = PATIENT_LIST_SORTS.get(sort)
+    direction = order.upper()
+    if column is None or direction not in ("ASC", "DESC"):
+        raise HTTPException(status_code=400, detail="无效的排序参数")
+    return [(column, direction), ("PatientID", direction)]
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("[", "[[]").replace("%", "[%]").replace("_", "[_]")
+    return f"%{escaped}%"
+
+
+def patient_list_filters(status: Optional[str] = None, department: Optional[str] = None,
+                         doctor_id: Optional[int] = None, search: Optional[str] = None) -> Tuple[str, list]:
+    """筛选条件的 WHERE 片段与参数；search 匹配姓名或患者编号"""
+    clauses, params = [], []
+    if status:
+        clauses.append("Status = ?")
+        params.append(status)
+    if department:
+        clauses.append("Department = ?")
+        params.append(department)
+    if doctor_id is not None:
+        clauses.append("DoctorID = ?")
+        params.append(doctor_id)
+    if search and search.strip():
+        pattern = _like_pattern(search.strip())
+        clauses.append("(Name LIKE ? OR PatientCode LIKE ?)")
+        params.extend([pattern, pattern])
+    return (" AND ".join(clauses) or "1 = 1"), params
+
+
+def format_patient_list_item(row) -> dict:
+    return {
+        "patient_id": row.PatientID,
+        "patient_code": row.PatientCode,
+        "name": row.Name,
+        "age": row.Age,
+        "gender": row.Gender,
+        "register_date": (row.RegisterDate.strftime("%Y-%m-%d")
+                          if row.RegisterDate and row.RegisterDate != MISSING_REGISTER_DATE else None),
+        "status": row.Status,
+        "department": row.Department,
+        "doctor_name": row.DoctorName,
+        "training_count": row.TrainingCount or 0,
+        "total_duration": f"{float(row.TotalTrainingHours or 0):.1f}h",
+        "recovery_progress": f"{row.RecoveryProgress or 0}%"
+    }
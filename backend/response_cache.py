@@ -0,0 +1,140 @@
+"""
+轮询接口的响应缓存：今日提醒（/api/reminders/today）、患者列表（/api/patients）会被每个打开的页面定时轮询。
+
+- 按 (接口, 用户, 查询参数) 缓存已序列化的 JSON 字节，命中时直接返回，不再查库和序列化
+- 每个响应带 ETag（正文哈希）；请求的 If-None-Match 与之相同时返回 304，不传正文
+- 条目在 RESPONSE_CACHE_TTL 秒后过期；患者、关节活动度、康复进度、康复阶段、训练计划的写接口
+  提交后调用 response_cache.invalidate() 立即清空（这些接口的数据对所有医生可见，按用户精确清除并不安全）
+- 缓存在进程内，多 worker 部署时其他进程的条目最多滞后一个 TTL
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "10"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+
+# 浏览器每次都带 If-None-Match 重新验证，而不是直接使用本地副本
+CACHE_CONTROL = "private, no-cache"
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, headers: Dict[str, str]):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.headers = headers
+        self.created = time.monotonic()
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """If-None-Match 与本响应的 ETag 匹配（弱比较）"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+
+def serialize(content) -> bytes:
+    """与 FastAPI JSONResponse 相同的序列化方式"""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class ResponseCache:
+    """(接口, 用户, 查询参数) -> 已序列化响应的 TTL + LRU 缓存"""
+
+    def __init__(self, ttl_seconds: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry.created > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def generation(self) -> int:
+        """生成响应前取得版本号，写回时用于判断期间是否发生过 invalidate"""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: tuple, content, headers: Dict[str, str], generation: int) -> CachedResponse:
+        entry = CachedResponse(serialize(content), headers)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, entry: CachedResponse, if_none_match: Optional[str]) -> Response:
+        headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL, **entry.headers}
+        if entry.matches(if_none_match):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def invalidate(self):
+        """写接口提交后调用"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache()
+
+
+async def cached_json(request: Request, endpoint: str, user_id,
+                      produce: Callable[[], Awaitable[Tuple[object, Dict[str, str]]]]) -> Response:
+    """
+    返回缓存的响应；未命中时调用 produce() 得到 (响应内容, 额外响应头) 并写入缓存。
+    If-None-Match 与 ETag 相同时返回 304。
+    """
+    key = (endpoint, user_id, tuple(sorted(request.query_params.multi_items())))
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation()
+        content, headers = await produce()
+        entry = response_cache.put(key, content, headers, generation)
+    return response_cache.respond(entry, request.headers.get("if-none-match"))
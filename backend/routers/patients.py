@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased, joinedload
 from typing import List
 import json
 
 from database import get_db
 from models.user import User
 from models.patient import Patient, Doctor
-from models.training import TrainingRecord, JointMobilityRecord, RobotStatus, RehabilitationStage, DailyReminder
+from models.training import (
+    TrainingRecord, TrainingDailyRollup, JointMobilityRecord, RobotStatus, RehabilitationStage, DailyReminder
+)
 from models.analysis import AIAnalysisReport
 from schemas.patient import Patient as PatientSchema, TrainingRecord as TrainingRecordSchema
 from schemas.analysis import AIAnalysisReport as AIAnalysisReportSchema, DashboardData  # 修正导入
@@ -100,6 +103,19 @@ async def get_patient_ai_analysis(
     
     return analysis
 
+def latest_per_patient(db: Session, model, order_column, patient_ids: List[int]) -> dict:
+    """一次查询取每个患者最新的一条记录：ROW_NUMBER() OVER (PARTITION BY patient_id ORDER BY ... DESC)"""
+    if not patient_ids:
+        return {}
+    row_number = func.row_number().over(
+        partition_by=model.patient_id,
+        order_by=(order_column.desc(), model.id.desc())
+    ).label("row_number")
+    ranked = db.query(model, row_number).filter(model.patient_id.in_(patient_ids)).subquery()
+    latest = aliased(model, ranked)
+    rows = db.query(latest).filter(ranked.c.row_number == 1).all()
+    return {row.patient_id: row for row in rows}
+
 @router.get("/doctor/dashboard", response_model=DashboardData)
 async def get_doctor_dashboard(
     db: Session = Depends(get_db),
@@ -108,18 +124,28 @@ async def get_doctor_dashboard(
     if current_user.role != "doctor":
         raise HTTPException(status_code=403, detail="没有权限访问医生工作台")
     
+    return build_doctor_dashboard(db, current_user)
+
+def build_doctor_dashboard(db: Session, current_user: User) -> dict:
     # 获取当前医生信息
     doctor = db.query(Doctor).filter(Doctor.user_id == current_user.id).first()
     if not doctor:
         raise HTTPException(status_code=404, detail="医生信息未找到")
     
-    # 获取医生负责的所有患者
-    patients = db.query(Patient).filter(Patient.doctor_id == doctor.id).all()
+    # 获取医生负责的所有患者（同时加载患者用户信息）
+    patients = db.query(Patient).options(joinedload(Patient.user)).filter(Patient.doctor_id == doctor.id).all()
+    patient_ids = [patient.id for patient in patients]
+    
+    # 每个患者最新的AI分析报告与机器人状态（各一次查询）
+    latest_analyses = latest_per_patient(db, AIAnalysisReport, AIAnalysisReport.analysis_date, patient_ids)
+    latest_statuses = latest_per_patient(db, RobotStatus, RobotStatus.check_time, patient_ids)
     
     # 获取今日提醒
     from datetime import date, datetime
     today = date.today()
-    reminders = db.query(DailyReminder).filter(
+    reminders = db.query(DailyReminder).options(
+        joinedload(DailyReminder.patient).joinedload(Patient.user)
+    ).filter(
         DailyReminder.reminder_date == today,
         DailyReminder.is_completed == False
     ).all()
@@ -127,17 +153,15 @@ async def get_doctor_dashboard(
     # 计算统计数据
     total_patients = len(patients)
     
-    # 计算今日完成的训练
-    training_completed_today = db.query(TrainingRecord).filter(
-        TrainingRecord.training_date == today
-    ).count()
+    # 计算今日完成的训练（按日汇总表）
+    training_completed_today = db.query(func.sum(TrainingDailyRollup.training_count)).filter(
+        TrainingDailyRollup.training_day == today
+    ).scalar() or 0
     
     # 计算需要关注的患者（康复进度低于50%或最近有高风险偏差）
     patients_need_attention = 0
     for patient in patients:
-        latest_analysis = db.query(AIAnalysisReport).filter(
-            AIAnalysisReport.patient_id == patient.id
-        ).order_by(AIAnalysisReport.analysis_date.desc()).first()
+        latest_analysis = latest_analyses.get(patient.id)
         
         if patient.recovery_progress < 50 or (
             latest_analysis and (
@@ -162,9 +186,7 @@ async def get_doctor_dashboard(
     # 获取动作偏差数据
     deviation_data = []
     for patient in patients:
-        latest_analysis = db.query(AIAnalysisReport).filter(
-            AIAnalysisReport.patient_id == patient.id
-        ).order_by(AIAnalysisReport.analysis_date.desc()).first()
+        latest_analysis = latest_analyses.get(patient.id)
         
         if latest_analysis:
             max_deviation = max(
@@ -189,9 +211,7 @@ async def get_doctor_dashboard(
     # 获取机器人状态
     robot_status_data = []
     for patient in patients:
-        latest_status = db.query(RobotStatus).filter(
-            RobotStatus.patient_id == patient.id
-        ).order_by(RobotStatus.check_time.desc()).first()
+        latest_status = latest_statuses.get(patient.id)
         
         if latest_status:
             status = "正常运行"
@@ -0,0 +1,194 @@
+"""
+时序推理：对逐帧特征流做窗口化/平滑处理，输出稳定的动作标签。
+
+- ProbabilitySmoother: 对逐帧概率做指数平滑，并带滞回（hysteresis）的标签切换
+- TemporalSessionManager: 按会话维护最近 N 帧特征窗口与平滑状态
+- create_temporal_model: 基于最近 N 帧的 1D 卷积分类模型
+- make_sequence_windows: 将逐帧数据切分为训练用的滑动窗口
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import numpy as np
+
+# 默认窗口长度（帧）
+DEFAULT_SEQUENCE_LENGTH = 10
+# 指数平滑系数：越大越跟随当前帧
+DEFAULT_SMOOTHING_ALPHA = 0.3
+# 新标签需要领先当前稳定标签的概率差
+DEFAULT_SWITCH_MARGIN = 0.1
+# 新标签需要连续领先的帧数
+DEFAULT_SWITCH_FRAMES = 3
+# 会话空闲超过该秒数即被清理
+SESSION_IDLE_SECONDS = 300
+MAX_SESSIONS = 1000
+
+
+class ProbabilitySmoother:
+    """概率指数平滑 + 滞回标签切换（单个会话的状态）"""
+
+    def __init__(self, alpha: float = DEFAULT_SMOOTHING_ALPHA,
+                 switch_margin: float = DEFAULT_SWITCH_MARGIN,
+                 switch_frames: int = DEFAULT_SWITCH_FRAMES):
+        self.alpha = alpha
+        self.switch_margin = switch_margin
+        self.switch_frames = switch_frames
+        self.smoothed: Optional[np.ndarray] = None
+        self.stable_class: int = -1
+        self.pending_class: int = -1
+        self.pending_count: int = 0
+
+    def update(self, probabilities) -> Dict:
+        """输入一帧概率，返回平滑后的概率与稳定标签"""
+        probs = np.asarray(probabilities, dtype=np.float32)
+        if self.smoothed is None or self.smoothed.shape != probs.shape:
+            # 首帧，或同一会话换了类别数不同的模型：旧的标签状态不再有效
+            self.smoothed = probs.copy()
+            self.stable_class = -1
+            self.pending_class = -1
+            self.pending_count = 0
+        else:
+            self.smoothed += self.alpha * (probs - self.smoothed)
+
+        candidate = int(np.argmax(self.smoothed))
+        if self.stable_class < 0:
+            self.stable_class = candidate
+        elif candidate != self.stable_class:
+            lead = self.smoothed[candidate] - self.smoothed[self.stable_class]
+            if lead >= self.switch_margin:
+                if candidate == self.pending_class:
+                    self.pending_count += 1
+                else:
+                    self.pending_class = candidate
+                    self.pending_count = 1
+                if self.pending_count >= self.switch_frames:
+                    self.stable_class = candidate
+                    self.pending_class = -1
+                    self.pending_count = 0
+            else:
+                self.pending_class = -1
+                self.pending_count = 0
+        else:
+            self.pending_class = -1
+            self.pending_count = 0
+
+        return {
+            'stable_class': self.stable_class,
+            'stable_confidence': float(self.smoothed[self.stable_class]),
+            'smoothed_probabilities': self.smoothed.tolist()
+        }
+
+
+class _SessionState:
+    def __init__(self, sequence_length: int, smoother_kwargs: Dict):
+        self.window: Deque[np.ndarray] = deque(maxlen=sequence_length)
+        self.smoother = ProbabilitySmoother(**smoother_kwargs)
+        self.last_seen = time.monotonic()
+
+
+class TemporalSessionManager:
+    """按会话维护滑动窗口与平滑器"""
+
+    def __init__(self, sequence_length: int = DEFAULT_SEQUENCE_LENGTH,
+                 idle_seconds: float = SESSION_IDLE_SECONDS,
+                 max_sessions: int = MAX_SESSIONS, **smoother_kwargs):
+        self.sequence_length = sequence_length
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self.smoother_kwargs = smoother_kwargs
+        self._sessions: Dict[str, _SessionState] = {}
+        self._lock = threading.Lock()
+
+    def _get_state(self, session_id: str, sequence_length: Optional[int] = None) -> _SessionState:
+        state = self._sessions.get(session_id)
+        if state is None or (sequence_length and state.window.maxlen != sequence_length):
+            if len(self._sessions) >= self.max_sessions:
+                self._evict_idle()
+            state = _SessionState(sequence_length or self.sequence_length, self.smoother_kwargs)
+            self._sessions[session_id] = state
+        state.last_seen = time.monotonic()
+        return state
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        expired = [sid for sid, s in self._sessions.items() if now - s.last_seen > self.idle_seconds]
+        for sid in expired:
+            del self._sessions[sid]
+        # 仍然超限时淘汰最久未使用的会话
+        while len(self._sessions) >= self.max_sessions:
+            oldest = min(self._sessions, key=lambda sid: self._sessions[sid].last_seen)
+            del self._sessions[oldest]
+
+    def push_frame(self, session_id: str, features: np.ndarray,
+                   sequence_length: Optional[int] = None) -> np.ndarray:
+        """
+        追加一帧特征，返回形状为 (sequence_length, dim) 的窗口。
+        窗口未填满时用最早的一帧向前补齐，保证会话开始即可推理。
+        """
+        seq_len = sequence_length or self.sequence_length
+        with self._lock:
+            state = self._get_state(session_id, seq_len)
+            state.window.append(np.asarray(features, dtype=np.float32))
+            frames = list(state.window)
+        if len(frames) < seq_len:
+            frames = [frames[0]] * (seq_len - len(frames)) + frames
+        return np.stack(frames)
+
+    def smooth(self, session_id: str, probabilities) -> Dict:
+        """对该会话的当前帧概率做平滑"""
+        with self._lock:
+            state = self._get_state(session_id)
+            return state.smoother.update(probabilities)
+
+    def reset(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+def make_sequence_windows(frames: np.ndarray, labels: np.ndarray, sequence_length: int):
+    """
+    将同一段录制中的逐帧特征切分为滑动窗口（步长1），窗口标签取最后一帧的标签。
+    帧数不足一个窗口时返回空数组。
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    labels = np.asarray(labels)
+    n = frames.shape[0]
+    if n < sequence_length:
+        return (np.empty((0, sequence_length, frames.shape[1] if frames.ndim == 2 else 0), dtype=np.float32),
+                labels[:0])
+    idx = np.arange(sequence_length)[None, :] + np.arange(n - sequence_length + 1)[:, None]
+    return frames[idx], labels[idx[:, -1]]
+
+
+def create_temporal_model(sequence_length: int = DEFAULT_SEQUENCE_LENGTH,
+                          input_dim: int = 128, num_classes: int = 2):
+    """创建基于最近 N 帧的 1D 卷积时序分类模型"""
+    import tensorflow as tf
+
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(sequence_length, input_dim)),
+        tf.keras.layers.Conv1D(32, kernel_size=3, padding='same', activation='relu'),
+        tf.keras.layers.Conv1D(32, kernel_size=3, padding='same', activation='relu'),
+        tf.keras.layers.GlobalAveragePooling1D(),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(num_classes, activation='softmax')
+    ])
+    return model
+
+
+def is_temporal_model(model) -> bool:
+    """模型输入为 (batch, time, features) 时视为时序模型"""
+    try:
+        return len(model.input_shape) == 3
+    except Exception:
+        return False
+
+
+def concat_sequence_datasets(parts: List[tuple]):
+    """合并多个录制文件切出的窗口"""
+    parts = [(x, y) for x, y in parts if len(x) > 0]
+    if not parts:
+        return None, None
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
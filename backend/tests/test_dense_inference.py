@@ -0,0 +1,64 @@
+"""
+NumPy Dense 推理（model_store.DenseNumpyModel）与 Keras model.predict 的数值一致性。
+
+构建一个小的 Dense/ReLU/Dropout/Softmax 模型，保存为 .h5 后经 read_dense_layers +
+pack_dense_layers 打包，在批大小 1、4096（等于单块上限）与 5000（跨块计算）下比较输出。
+性能对比见 benchmarks/bench_dense_inference.py。
+
+用法（在 backend 目录执行）:
+    python -m pytest tests/test_dense_inference.py
+"""
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("h5py")
+tf = pytest.importorskip("tensorflow")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from model_store import MAX_BATCH_ROWS, DenseNumpyModel, pack_dense_layers, read_dense_layers  # noqa: E402
+
+INPUT_DIM = 24
+NUM_CLASSES = 3
+ATOL = 1e-5
+
+
+@pytest.fixture(scope="module")
+def models(tmp_path_factory):
+    tf.keras.utils.set_random_seed(0)
+    keras_model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(INPUT_DIM,)),
+        tf.keras.layers.Dense(64, activation="relu"),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(32, activation="relu"),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(NUM_CLASSES, activation="softmax"),
+    ])
+    workdir = tmp_path_factory.mktemp("dense")
+    h5_path = str(workdir / "model.h5")
+    keras_model.save(h5_path)
+    packed_path = str(workdir / "model.bin")
+    pack_dense_layers(read_dense_layers(h5_path), packed_path)
+    return keras_model, DenseNumpyModel(packed_path)
+
+
+def test_shapes_match(models):
+    keras_model, dense_model = models
+    assert dense_model.input_shape == tuple(keras_model.input_shape)
+    assert dense_model.output_shape == tuple(keras_model.output_shape)
+
+
+@pytest.mark.parametrize("batch_size", [1, MAX_BATCH_ROWS, 5000])
+def test_predict_matches_keras(models, batch_size):
+    keras_model, dense_model = models
+    x = np.random.default_rng(batch_size).standard_normal((batch_size, INPUT_DIM)).astype(np.float32)
+
+    expected = keras_model.predict(x, verbose=0)
+    actual = dense_model.predict(x)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=ATOL, rtol=0)
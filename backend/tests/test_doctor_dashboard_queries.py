@@ -0,0 +1,118 @@
+"""
+医生工作台的查询次数不随患者数量增长（routers/patients.build_doctor_dashboard）。
+
+用内存 SQLite 建表，通过 before_cursor_execute 事件统计实际执行的 SQL 条数，
+分别为 1 个和多个患者（各带分析报告、机器人状态，其中一个有今日提醒）生成工作台，断言查询次数相同。
+
+用法（在 backend 目录执行）:
+    python -m pytest tests/test_doctor_dashboard_queries.py
+"""
+import os
+import sys
+import types
+from datetime import date, datetime, timedelta
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+pytest.importorskip("pydantic")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import declarative_base, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# 模型依赖的 database 模块与路由依赖的 routers.auth 不在本仓库中，这里提供 SQLite 版本
+if "database" not in sys.modules:
+    database = types.ModuleType("database")
+    database.Base = declarative_base()
+    database.get_db = lambda: None
+    sys.modules["database"] = database
+if "routers.auth" not in sys.modules:
+    auth = types.ModuleType("routers.auth")
+    auth.get_current_user = lambda: None
+    sys.modules["routers.auth"] = auth
+
+from database import Base  # noqa: E402
+from models.user import User  # noqa: E402
+from models.patient import Doctor, Patient  # noqa: E402
+from models.training import DailyReminder, RobotStatus, TrainingDailyRollup  # noqa: E402
+from models.analysis import AIAnalysisReport  # noqa: E402
+from routers.patients import build_doctor_dashboard  # noqa: E402
+
+
+def make_session(patient_count: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    doctor_user = User(username="doctor", password_hash="x", name="医生", role="doctor")
+    session.add(doctor_user)
+    session.flush()
+    doctor = Doctor(user_id=doctor_user.id, department="康复科", position="主治医师")
+    session.add(doctor)
+    session.flush()
+    doctor_user_id = doctor_user.id
+
+    today = date.today()
+    for i in range(patient_count):
+        user = User(username=f"patient{i}", password_hash="x", name=f"患者{i}", role="patient")
+        session.add(user)
+        session.flush()
+        patient = Patient(user_id=user.id, patient_id=f"P{i:04d}", doctor_id=doctor.id,
+                          register_date=today, recovery_progress=30 + i % 60)
+        session.add(patient)
+        session.flush()
+        for days_ago in (2, 1):
+            session.add(AIAnalysisReport(patient_id=patient.id, analysis_date=today - timedelta(days=days_ago),
+                                         left_hip_deviation=days_ago * 4, right_hip_deviation=1,
+                                         left_knee_deviation=2, right_knee_deviation=3))
+            session.add(RobotStatus(patient_id=patient.id,
+                                    check_time=datetime.now() - timedelta(days=days_ago)))
+        if i == 0:
+            # 只有一个患者有今日提醒，其余患者的用户信息不会随提醒一起加载
+            session.add(DailyReminder(patient_id=patient.id, reminder_date=today, title="提醒",
+                                      description="复诊", is_completed=False))
+        session.add(TrainingDailyRollup(patient_id=patient.id, training_day=today, training_count=2))
+    session.commit()
+    # 清空标识映射，统计时所有数据都要从库中取
+    session.expunge_all()
+    return engine, session, session.get(User, doctor_user_id)
+
+
+def count_dashboard_queries(patient_count: int):
+    engine, session, doctor_user = make_session(patient_count)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    try:
+        dashboard = build_doctor_dashboard(session, doctor_user)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        session.close()
+    return len(statements), dashboard
+
+
+def test_query_count_does_not_depend_on_patient_count():
+    single_queries, single = count_dashboard_queries(1)
+    many_queries, many = count_dashboard_queries(25)
+
+    assert single["statistics"]["total_patients"] == 1
+    assert many["statistics"]["total_patients"] == 25
+    assert len(many["reminders"]) == 1
+    assert many["statistics"]["training_completed_today"] == 50
+    assert single_queries == many_queries
+
+
+def test_latest_analysis_per_patient_is_used():
+    _, dashboard = count_dashboard_queries(3)
+
+    # 每个患者最新一条分析报告（1 天前）的最大偏差为 4，较早一条为 8
+    assert [item["deviation"] for item in dashboard["deviation_data"]] == [4, 4, 4]
+    assert dashboard["robot_status"]["正常运行"] == 3
@@ -0,0 +1,125 @@
+"""
+训练记录按日/按月汇总：TrainingDailyRollup / TrainingMonthlyRollup。
+
+患者累计统计、详情页训练统计、PatientSummary 补建、医生工作台今日训练数都从汇总表读取，
+不再在每次查看时对 TrainingRecords 做 COUNT / SUM。
+
+- 增量维护：TrainingRecords 上的触发器在写入时把增量合并进两张表
+  （训练记录由设备端直接写库，应用内没有写入口，只有触发器能覆盖所有写入路径）
+- 定期压缩：compact_rollups() 用原始记录重算最近 TRAINING_ROLLUP_COMPACT_DAYS 天及其所在月份，
+  修正触发器被禁用、批量导入等造成的偏差，并去掉删除记录后计数为 0 的行；
+  由 main_api 启动时的后台任务每 TRAINING_ROLLUP_COMPACT_INTERVAL 秒执行一次
+- 表结构、触发器与初始数据见 migrations/003_training_rollups.sql
+"""
+import asyncio
+import logging
+import os
+from datetime import date, timedelta
+from typing import Optional
+
+from db_access import run_blocking
+from db_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+# 压缩间隔（秒），0 表示不在进程内定期压缩
+TRAINING_ROLLUP_COMPACT_INTERVAL = float(os.getenv("TRAINING_ROLLUP_COMPACT_INTERVAL", "3600"))
+TRAINING_ROLLUP_COMPACT_DAYS = int(os.getenv("TRAINING_ROLLUP_COMPACT_DAYS", "7"))
+TRAINING_ROLLUP_COMPACT_TIMEOUT = float(os.getenv("TRAINING_ROLLUP_COMPACT_TIMEOUT", "300"))
+
+# 患者累计训练统计（列名与原 TrainingRecords 聚合一致）
+PATIENT_TRAINING_TOTALS_SQL = """
+    SELECT ISNULL(SUM(TrainingCount), 0) as TrainingCount,
+           SUM(TotalDuration) as TotalDuration,
+           SUM(TotalSteps) as TotalSteps
+    FROM TrainingMonthlyRollup
+    WHERE PatientID = ?
+"""
+
+# 重算 @Since 之后的日汇总及其所在月份的月汇总。
+# 先对两张汇总表加表锁再读原始记录，与触发器冲突时压缩任务作为死锁牺牲者，不影响设备端写入。
+COMPACT_ROLLUPS_SQL = """
+SET NOCOUNT ON;
+SET DEADLOCK_PRIORITY LOW;
+DECLARE @Since DATE = ?;
+DECLARE @MonthStart DATE = DATEFROMPARTS(YEAR(@Since), MONTH(@Since), 1);
+
+BEGIN TRANSACTION;
+
+DELETE FROM TrainingDailyRollup WITH (TABLOCKX) WHERE TrainingDay >= @MonthStart;
+DELETE FROM TrainingMonthlyRollup WITH (TABLOCKX) WHERE MonthStart >= @MonthStart;
+
+INSERT INTO TrainingDailyRollup (
+    PatientID, TrainingDay, TrainingCount, TotalDuration, TotalSteps,
+    CompletedCount, PartialCount, PendingCount
+)
+SELECT PatientID, CAST(TrainingDate AS DATE), COUNT(*),
+       ISNULL(SUM(Duration), 0), ISNULL(SUM(CAST(Steps AS BIGINT)), 0),
+       SUM(CASE WHEN PerformanceScore >= 80 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN PerformanceScore >= 60 AND PerformanceScore < 80 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN PerformanceScore IS NULL OR PerformanceScore < 60 THEN 1 ELSE 0 END)
+FROM TrainingRecords
+WHERE TrainingDate >= @MonthStart
+GROUP BY PatientID, CAST(TrainingDate AS DATE);
+
+INSERT INTO TrainingMonthlyRollup (
+    PatientID, MonthStart, TrainingCount, TotalDuration, TotalSteps,
+    CompletedCount, PartialCount, PendingCount
+)
+SELECT PatientID, DATEFROMPARTS(YEAR(TrainingDay), MONTH(TrainingDay), 1),
+       SUM(TrainingCount), SUM(TotalDuration), SUM(TotalSteps),
+       SUM(CompletedCount), SUM(PartialCount), SUM(PendingCount)
+FROM TrainingDailyRollup
+WHERE TrainingDay >= @MonthStart
+GROUP BY PatientID, DATEFROMPARTS(YEAR(TrainingDay), MONTH(TrainingDay), 1);
+
+COMMIT TRANSACTION;
+
+SELECT (SELECT COUNT(*) FROM TrainingDailyRollup WHERE TrainingDay >= @MonthStart) AS DailyRows,
+       (SELECT COUNT(*) FROM TrainingMonthlyRollup WHERE MonthStart >= @MonthStart) AS MonthlyRows;
+"""
+
+
+def fetch_training_totals(cursor, patient_id: int):
+    """患者累计训练次数/时长/步数（一行，列 TrainingCount / TotalDuration / TotalSteps）"""
+    cursor.execute(PATIENT_TRAINING_TOTALS_SQL, patient_id)
+    return cursor.fetchone()
+
+
+def compact_rollups(days: Optional[int] = TRAINING_ROLLUP_COMPACT_DAYS) -> dict:
+    """用原始记录重算最近 days 天（按整月对齐）的汇总；days 为 None 时全量重算"""
+    since = date(1900, 1, 1) if days is None else date.today() - timedelta(days=days)
+    pool = get_pool()
+    conn = pool.get_connection()
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(COMPACT_ROLLUPS_SQL, since)
+            row = cursor.fetchone()
+            conn.commit()
+        finally:
+            cursor.close()
+    except pool.driver.disconnect_errors:
+        conn.invalidate()
+        raise
+    finally:
+        conn.close()
+    return {
+        "since": since.replace(day=1).isoformat(),
+        "daily_rows": row.DailyRows,
+        "monthly_rows": row.MonthlyRows
+    }
+
+
+async def run_compaction_loop(interval: float = TRAINING_ROLLUP_COMPACT_INTERVAL,
+                              days: int = TRAINING_ROLLUP_COMPACT_DAYS):
+    """后台定期压缩；单次失败只记录日志，下个周期重试"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await run_blocking(compact_rollups, days, timeout=TRAINING_ROLLUP_COMPACT_TIMEOUT)
+            logger.info(f"训练汇总压缩完成: {result}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"训练汇总压缩失败: {e}")
@@ -0,0 +1,75 @@
+"""
+训练记录的月度统计（GET /api/patients/{id}/training-plans/monthly）。
+
+- 月份按半开区间 [当月 1 日, 下月 1 日) 过滤 TrainingDate，可以直接在
+  (PatientID, TrainingDate) 索引上做范围查找；原来的 YEAR(TrainingDate) = ? AND MONTH(TrainingDate) = ?
+  对每行求函数值，只能扫描该患者的全部记录
+- 记录与统计一次查询取回：统计值在格式化记录时顺带累加，不再对同一范围再查一遍
+- 索引见 migrations/002_training_records_patient_date.sql
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+COMPLETED_SCORE = 80
+PARTIAL_SCORE = 60
+
+MONTHLY_RECORDS_SQL = """
+    SELECT TrainingDate, ExerciseType as TrainingContent, Duration, Steps, PerformanceScore
+    FROM TrainingRecords
+    WHERE PatientID = ?
+      AND TrainingDate >= ?
+      AND TrainingDate < ?
+    ORDER BY TrainingDate DESC, RecordID DESC
+"""
+
+
+def month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+    """当月的半开区间 [start, end)"""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def completion_status(score: Optional[int]) -> str:
+    if score is not None and score >= COMPLETED_SCORE:
+        return "completed"
+    if score is not None and score >= PARTIAL_SCORE:
+        return "partial"
+    return "pending"
+
+
+def format_monthly_record(record) -> dict:
+    return {
+        "training_date": record.TrainingDate.strftime("%Y-%m-%d") if record.TrainingDate else "",
+        "training_content": record.TrainingContent or "康复训练",
+        "duration": record.Duration or 0,
+        "steps": record.Steps or 0,
+        "completion_status": completion_status(record.PerformanceScore)
+    }
+
+
+def summarize_month(rows) -> Tuple[List[dict], dict]:
+    """一次遍历同时得到记录列表与月度统计"""
+    records = []
+    total_duration = total_steps = completed = 0
+    for row in rows:
+        records.append(format_monthly_record(row))
+        total_duration += row.Duration or 0
+        total_steps += row.Steps or 0
+        if row.PerformanceScore is not None and row.PerformanceScore >= COMPLETED_SCORE:
+            completed += 1
+
+    count = len(records)
+    stats = {
+        "training_count": count,
+        "training_hours": round(total_duration / 60, 1),
+        "total_steps": total_steps,
+        "completion_rate": round(completed * 100 / count, 1) if count else 0
+    }
+    return records, stats
+
+
+def fetch_monthly_training(cursor, patient_id: int, year: int, month: int) -> Tuple[List[dict], dict]:
+    start, end = month_range(year, month)
+    cursor.execute(MONTHLY_RECORDS_SQL, patient_id, start, end)
+    return summarize_month(cursor.fetchall())
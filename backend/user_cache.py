@@ -0,0 +1,134 @@
+"""
+已认证用户缓存：避免每个请求都查询 Users 表。
+
+- 键为 (用户名, 令牌签发时间 iat)，条目在 AUTH_USER_CACHE_TTL 秒后过期，之后重新查库
+- 缓存在进程内：invalidate(username) 只清除当前进程的条目（清除前已开始的查库结果不会再写回，
+  按用户的版本号判断）。多 worker 部署时其他进程仍可能在最多 AUTH_USER_CACHE_TTL 秒内
+  接受已禁用或已修改的用户。应用内没有修改 Users 的接口，用户表在库中直接修改后
+  需调用 POST /api/auth/cache/invalidate，或等待条目过期
+- AUTH_TRUST_TOKEN_CLAIMS=true 时直接使用令牌中签名过的用户信息（uid/role 等），完全不查库；
+  签发时间早于最近一次 invalidate 的令牌仍回退到查库。撤销记录同样只在本进程内，
+  其他进程会一直接受到令牌过期为止，因此 WEB_CONCURRENCY（uvicorn --workers 的默认值）大于 1 时不启用
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() in ("1", "true", "yes")
+# uvicorn 以该变量作为 --workers 的默认值；多 worker 部署时须设置
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+logger = logging.getLogger(__name__)
+
+# 令牌中携带的用户信息：claim 名 -> 用户字典字段
+USER_CLAIMS = {"uid": "user_id", "name": "full_name", "email": "email", "role": "role"}
+
+
+def user_claims(user: dict) -> dict:
+    """签发令牌时附带的用户信息"""
+    return {claim: user[field] for claim, field in USER_CLAIMS.items()}
+
+
+class AuthUserCache:
+    """(用户名, iat) -> 用户信息的 TTL + LRU 缓存"""
+
+    def __init__(self, ttl_seconds: float = AUTH_USER_CACHE_TTL, max_entries: int = AUTH_USER_CACHE_SIZE,
+                 trust_claims: bool = AUTH_TRUST_TOKEN_CLAIMS, workers: int = WEB_CONCURRENCY):
+        if trust_claims and workers > 1:
+            # 撤销记录不跨进程，其他 worker 会一直信任已撤销的令牌
+            logger.warning(f"WEB_CONCURRENCY={workers}，多 worker 部署不支持 AUTH_TRUST_TOKEN_CLAIMS，已改为查库")
+            trust_claims = False
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.trust_claims = trust_claims
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._revoked_at: Dict[str, float] = {}
+        self._generation_all = 0
+        self._revoked_all_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.claim_hits = 0
+        self.invalidations = 0
+
+    def lookup(self, payload: dict) -> Optional[dict]:
+        """按已验证的令牌内容查找用户；需要查库时返回 None"""
+        username, iat = payload.get("sub"), payload.get("iat")
+        if self.trust_claims and iat is not None and all(c in payload for c in USER_CLAIMS):
+            with self._lock:
+                if iat >= max(self._revoked_at.get(username, 0.0), self._revoked_all_at):
+                    self.claim_hits += 1
+                    user = {"user_id": payload["uid"], "username": username}
+                    user.update({field: payload[claim] for claim, field in USER_CLAIMS.items() if claim != "uid"})
+                    return user
+
+        key = (username, iat)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def generation(self, username: str) -> tuple:
+        """查库前取得版本号，写回时用于判断期间是否发生过 invalidate/clear"""
+        with self._lock:
+            return self._generation_all, self._generations.get(username, 0)
+
+    def put(self, payload: dict, user: dict, generation: tuple):
+        username = payload.get("sub")
+        with self._lock:
+            if (self._generation_all, self._generations.get(username, 0)) != generation:
+                return
+            key = (username, payload.get("iat"))
+            self._entries[key] = (time.monotonic(), dict(user))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        """用户被禁用或信息变更后调用（只影响当前进程）"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == username]:
+                del self._entries[key]
+            self._generations[username] = self._generations.get(username, 0) + 1
+            self._revoked_at[username] = time.time()
+            self.invalidations += 1
+
+    def clear(self):
+        """清除所有用户（例如批量修改用户表之后；只影响当前进程）"""
+        with self._lock:
+            self._entries.clear()
+            self._generation_all += 1
+            self._revoked_all_at = time.time()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "trust_claims": self.trust_claims,
+                "hits": self.hits,
+                "misses": self.misses,
+                "claim_hits": self.claim_hits,
+                "hit_rate": round((self.hits + self.claim_hits) / (total + self.claim_hits), 4)
+                if total + self.claim_hits else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = AuthUserCache()
@@ -499,6 +499,29 @@ function showMessage(message, type = 'error') {
     }, 3000);
 }
 
+// 获取分页列表的全部记录：每页最多返回 API 默认条数，按响应头 X-Next-Cursor 继续请求下一页。
+// 返回 { response, items }，任一页失败时 response 为该页响应、items 为 null
+async function fetchAllPages(url, options = {}) {
+    const items = [];
+    let after = null;
+    while (true) {
+        const pageUrl = after ? `${url}${url.includes('?') ? '&' : '?'}after=${encodeURIComponent(after)}` : url;
+        const response = await fetch(pageUrl, options);
+        if (!response.ok) {
+            return { response, items: null };
+        }
+        const page = await response.json();
+        if (!Array.isArray(page)) {
+            return { response, items: page };
+        }
+        items.push(...page);
+        after = response.headers.get('X-Next-Cursor');
+        if (!after) {
+            return { response, items };
+        }
+    }
+}
+
 // 获取认证头
 function getAuthHeaders() {
     const token = localStorage.getItem('access_token');
@@ -363,13 +363,12 @@ function updateCurrentStageInfo(stages) {
 // 加载关节活动度数据
 async function loadJointROM(patientId) {
     try {
-        const response = await fetch(`${API_BASE_URL}/api/joint-rom/${patientId}`, {
+        const { response, items: result } = await fetchAllPages(`${API_BASE_URL}/api/joint-rom/${patientId}`, {
             headers: getAuthHeaders()
         });
         
         if (!response.ok) throw new Error(getText('loading_rom'));
         
-        const result = await response.json();
         if (Array.isArray(result)) {
             jointROMRecords = result;
             renderJointROM(jointROMRecords);
@@ -613,13 +612,12 @@ function initROMTrendChart() {
 // 加载康复进度数据
 async function loadRehabilitationProgress(patientId) {
     try {
-        const response = await fetch(`${API_BASE_URL}/api/rehabilitation-progress/${patientId}`, {
+        const { response, items: result } = await fetchAllPages(`${API_BASE_URL}/api/rehabilitation-progress/${patientId}`, {
             headers: getAuthHeaders()
         });
         
         if (!response.ok) throw new Error(getText('loading_progress'));
         
-        const result = await response.json();
         if (Array.isArray(result)) {
             progressRecords = result;
             renderRehabilitationProgress(progressRecords);